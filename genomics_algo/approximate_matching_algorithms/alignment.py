@@ -0,0 +1,635 @@
+import re
+
+import numpy as np
+
+from typing import List, NamedTuple, Optional, Tuple
+
+from genomics_algo.utilities.sequence_encoding import (
+    ALPHABET,
+    CODE_N,
+    encode_sequence,
+)
+
+DEFAULT_MATCH = 1
+DEFAULT_MISMATCH = -4
+DEFAULT_GAP_OPEN = 6
+DEFAULT_GAP_EXTEND = 1
+
+_NEGATIVE_INFINITY = float("-inf")
+_BATCH_NEGATIVE_INFINITY = -(2**30)
+_CIGAR_PATTERN = re.compile(r"(\d+)([MIDS])")
+
+
+class Alignment(NamedTuple):
+    """Result of a pairwise alignment of a `query` against a `reference`.
+    Coordinates are 0-based and half-open; the CIGAR string uses ``M`` for aligned
+    pairs, ``I`` for bases only in the query, ``D`` for bases only in the reference
+    and ``S`` for query bases clipped off by a local alignment
+    """
+
+    score: int
+    query_start: int
+    query_end: int
+    reference_start: int
+    reference_end: int
+    cigar: str
+
+
+def create_scoring_matrix(
+    match: int = DEFAULT_MATCH, mismatch: int = DEFAULT_MISMATCH
+) -> np.ndarray:
+    """Create a substitution scoring matrix indexed by base codes (see
+    `genomics_algo.utilities.sequence_encoding`), where ``N`` never scores as a match
+    >>> create_scoring_matrix(2, -3)
+    array([[ 2, -3, -3, -3, -3],
+           [-3,  2, -3, -3, -3],
+           [-3, -3,  2, -3, -3],
+           [-3, -3, -3,  2, -3],
+           [-3, -3, -3, -3, -3]])
+    """
+    scoring_matrix = np.full((len(ALPHABET), len(ALPHABET)), mismatch, dtype=np.int64)
+    np.fill_diagonal(scoring_matrix[:CODE_N, :CODE_N], match)
+    return scoring_matrix
+
+
+def ops_to_cigar(ops: List[str]) -> str:
+    """Run-length encode a list of alignment operations into a CIGAR string
+    >>> ops_to_cigar(["M", "M", "I", "M", "D", "D"])
+    '2M1I1M2D'
+    >>> ops_to_cigar([])
+    ''
+    """
+    cigar = []
+    run_length = 0
+    for index, op in enumerate(ops):
+        run_length += 1
+        if index == len(ops) - 1 or ops[index + 1] != op:
+            cigar.append(f"{run_length}{op}")
+            run_length = 0
+    return "".join(cigar)
+
+
+def score_cigar(
+    query: str,
+    reference: str,
+    cigar: str,
+    scoring_matrix: Optional[np.ndarray] = None,
+    gap_open: int = DEFAULT_GAP_OPEN,
+    gap_extend: int = DEFAULT_GAP_EXTEND,
+) -> int:
+    """Compute the score of the alignment described by `cigar`, where `query` and
+    `reference` are the aligned parts of both sequences (soft clipped query bases are
+    skipped). A gap of length ``k`` costs ``gap_open + k * gap_extend``
+    >>> score_cigar("ACGTACGT", "ACGTTACGT", "3M1D5M")
+    1
+    >>> score_cigar("AACGT", "ACGT", "1S4M")
+    4
+    """
+    if scoring_matrix is None:
+        scoring_matrix = create_scoring_matrix()
+    query_codes = encode_sequence(query)
+    reference_codes = encode_sequence(reference)
+    score = 0
+    query_index = 0
+    reference_index = 0
+    for length, op in _CIGAR_PATTERN.findall(cigar):
+        length = int(length)
+        if op == "M":
+            score += int(
+                scoring_matrix[
+                    query_codes[query_index : query_index + length],
+                    reference_codes[reference_index : reference_index + length],
+                ].sum()
+            )
+            query_index += length
+            reference_index += length
+        elif op == "I":
+            score -= gap_open + length * gap_extend
+            query_index += length
+        elif op == "D":
+            score -= gap_open + length * gap_extend
+            reference_index += length
+        else:
+            query_index += length
+    return score
+
+
+def _fill_affine_gap_matrices(
+    query_codes: List[int],
+    reference_codes: List[int],
+    substitution: List[List[int]],
+    gap_open: int,
+    gap_extend: int,
+    local: bool,
+) -> Tuple[List[List[float]], List[List[float]], List[List[float]]]:
+    """Helper function that fills the three matrices of Gotoh's algorithm: `H` holds the
+    best score of any alignment ending in a cell, `E` the best score ending with a gap
+    in the query (``D``) and `F` the best score ending with a gap in the reference (``I``)
+    """
+    len_query = len(query_codes)
+    len_reference = len(reference_codes)
+    gap_open_cost = gap_open + gap_extend
+
+    H = [[0] * (len_reference + 1) for _ in range(len_query + 1)]
+    E = [[_NEGATIVE_INFINITY] * (len_reference + 1) for _ in range(len_query + 1)]
+    F = [[_NEGATIVE_INFINITY] * (len_reference + 1) for _ in range(len_query + 1)]
+    if not local:
+        for i in range(1, len_query + 1):
+            H[i][0] = F[i][0] = -(gap_open + i * gap_extend)
+        for j in range(1, len_reference + 1):
+            H[0][j] = E[0][j] = -(gap_open + j * gap_extend)
+
+    for i in range(1, len_query + 1):
+        scores = substitution[query_codes[i - 1]]
+        H_above, H_row = H[i - 1], H[i]
+        F_above, F_row = F[i - 1], F[i]
+        E_row = E[i]
+        for j in range(1, len_reference + 1):
+            e = max(H_row[j - 1] - gap_open_cost, E_row[j - 1] - gap_extend)
+            f = max(H_above[j] - gap_open_cost, F_above[j] - gap_extend)
+            h = max(H_above[j - 1] + scores[reference_codes[j - 1]], e, f)
+            if local and h < 0:
+                h = 0
+            E_row[j] = e
+            F_row[j] = f
+            H_row[j] = h
+    return H, E, F
+
+
+def _traceback_affine_gap_matrices(
+    query_codes: List[int],
+    reference_codes: List[int],
+    substitution: List[List[int]],
+    gap_extend: int,
+    H: List[List[float]],
+    E: List[List[float]],
+    F: List[List[float]],
+    i: int,
+    j: int,
+    local: bool,
+) -> Tuple[List[str], int, int]:
+    """Helper function that traces an optimal alignment back from cell (`i`, `j`)
+
+    Returns:
+        Tuple[List[str], int, int]: alignment operations and the cell where the trace stopped
+    """
+    ops = []
+    state = "H"
+    while i > 0 or j > 0:
+        if state == "H":
+            h = H[i][j]
+            if local and h == 0:
+                break
+            if (
+                i > 0
+                and j > 0
+                and h
+                == H[i - 1][j - 1]
+                + substitution[query_codes[i - 1]][reference_codes[j - 1]]
+            ):
+                ops.append("M")
+                i -= 1
+                j -= 1
+            elif h == F[i][j]:
+                state = "F"
+            else:
+                state = "E"
+        elif state == "F":
+            ops.append("I")
+            state = "F" if F[i][j] == F[i - 1][j] - gap_extend else "H"
+            i -= 1
+        else:
+            ops.append("D")
+            state = "E" if E[i][j] == E[i][j - 1] - gap_extend else "H"
+            j -= 1
+    ops.reverse()
+    return ops, i, j
+
+
+def find_global_alignment(
+    query: str,
+    reference: str,
+    scoring_matrix: Optional[np.ndarray] = None,
+    gap_open: int = DEFAULT_GAP_OPEN,
+    gap_extend: int = DEFAULT_GAP_EXTEND,
+) -> Alignment:
+    """Align `query` end to end against `reference` (Needleman-Wunsch with affine gaps,
+    i.e. Gotoh's algorithm). Takes O(len(query) * len(reference)) time and memory; use
+    `find_global_alignment_linear_space` for long sequences
+    >>> find_global_alignment("ACGTACGT", "ACGTACGT")
+    Alignment(score=8, query_start=0, query_end=8, reference_start=0, reference_end=8, cigar='8M')
+    >>> find_global_alignment("ACGTACGT", "ACGTTACGT")
+    Alignment(score=1, query_start=0, query_end=8, reference_start=0, reference_end=9, cigar='3M1D5M')
+    """
+    if scoring_matrix is None:
+        scoring_matrix = create_scoring_matrix()
+    substitution = scoring_matrix.tolist()
+    query_codes = encode_sequence(query).tolist()
+    reference_codes = encode_sequence(reference).tolist()
+    H, E, F = _fill_affine_gap_matrices(
+        query_codes, reference_codes, substitution, gap_open, gap_extend, local=False
+    )
+    ops, _, _ = _traceback_affine_gap_matrices(
+        query_codes,
+        reference_codes,
+        substitution,
+        gap_extend,
+        H,
+        E,
+        F,
+        len(query),
+        len(reference),
+        local=False,
+    )
+    return Alignment(
+        int(H[-1][-1]), 0, len(query), 0, len(reference), ops_to_cigar(ops)
+    )
+
+
+def find_local_alignment(
+    query: str,
+    reference: str,
+    scoring_matrix: Optional[np.ndarray] = None,
+    gap_open: int = DEFAULT_GAP_OPEN,
+    gap_extend: int = DEFAULT_GAP_EXTEND,
+) -> Alignment:
+    """Find the best scoring local alignment between `query` and `reference`
+    (Smith-Waterman with affine gaps). Unaligned ends of the query are soft clipped
+    >>> find_local_alignment("CCACGTACGTCC", "TTTTACGTACGTTTTT")
+    Alignment(score=8, query_start=2, query_end=10, reference_start=4, reference_end=12, cigar='2S8M2S')
+    >>> find_local_alignment("AAAA", "CCCC")
+    Alignment(score=0, query_start=0, query_end=0, reference_start=0, reference_end=0, cigar='4S')
+    """
+    if scoring_matrix is None:
+        scoring_matrix = create_scoring_matrix()
+    substitution = scoring_matrix.tolist()
+    query_codes = encode_sequence(query).tolist()
+    reference_codes = encode_sequence(reference).tolist()
+    H, E, F = _fill_affine_gap_matrices(
+        query_codes, reference_codes, substitution, gap_open, gap_extend, local=True
+    )
+
+    best_score, query_end, reference_end = 0, 0, 0
+    for i, row in enumerate(H):
+        row_max = max(row)
+        if row_max > best_score:
+            best_score, query_end, reference_end = row_max, i, row.index(row_max)
+
+    ops, query_start, reference_start = _traceback_affine_gap_matrices(
+        query_codes,
+        reference_codes,
+        substitution,
+        gap_extend,
+        H,
+        E,
+        F,
+        query_end,
+        reference_end,
+        local=True,
+    )
+    ops = ["S"] * query_start + ops + ["S"] * (len(query) - query_end)
+    return Alignment(
+        int(best_score),
+        query_start,
+        query_end,
+        reference_start,
+        reference_end,
+        ops_to_cigar(ops),
+    )
+
+
+def _gap_cost(length: int, gap_open: int, gap_extend: int) -> int:
+    return 0 if length == 0 else gap_open + length * gap_extend
+
+
+def _align_linear_space(
+    query_codes: List[int],
+    query_start: int,
+    query_end: int,
+    reference_codes: List[int],
+    reference_start: int,
+    reference_end: int,
+    start_gap_open: int,
+    end_gap_open: int,
+    costs: List[List[int]],
+    gap_open: int,
+    gap_extend: int,
+    ops: List[str],
+):
+    """Helper function implementing Hirschberg's divide and conquer for affine gaps
+    (Myers and Miller, 1988) on costs, i.e. negated scores. `start_gap_open` and
+    `end_gap_open` are the costs to open a gap in the reference (``I``) at the start and
+    end of the sub-problem, which are zero when such a gap continues a neighbouring one
+    """
+    len_query = query_end - query_start
+    len_reference = reference_end - reference_start
+    if len_reference == 0:
+        ops.extend("I" * len_query)
+        return
+    if len_query == 0:
+        ops.extend("D" * len_reference)
+        return
+
+    if len_query == 1:
+        base_costs = costs[query_codes[query_start]]
+        # either the single query base is a gap and the whole reference is deleted ...
+        best_cost = (
+            min(start_gap_open, end_gap_open)
+            + gap_extend
+            + _gap_cost(len_reference, gap_open, gap_extend)
+        )
+        best_j = 0
+        # ... or it is aligned to one of the reference bases
+        for j in range(1, len_reference + 1):
+            cost = (
+                _gap_cost(j - 1, gap_open, gap_extend)
+                + base_costs[reference_codes[reference_start + j - 1]]
+                + _gap_cost(len_reference - j, gap_open, gap_extend)
+            )
+            if cost < best_cost:
+                best_cost, best_j = cost, j
+        if best_j == 0:
+            # keep the gap next to the neighbouring gap it is continuing
+            if start_gap_open <= end_gap_open:
+                ops.extend("I" + "D" * len_reference)
+            else:
+                ops.extend("D" * len_reference + "I")
+        else:
+            ops.extend("D" * (best_j - 1) + "M" + "D" * (len_reference - best_j))
+        return
+
+    middle = len_query // 2
+
+    # forward pass over the upper half: CC holds the cost of the best alignment
+    # ending in each column of the middle row, DD the cost of one ending with an ``I``
+    CC = [0] * (len_reference + 1)
+    DD = [0] * (len_reference + 1)
+    t = gap_open
+    for j in range(1, len_reference + 1):
+        t += gap_extend
+        CC[j] = t
+        DD[j] = t + gap_open
+    t = start_gap_open
+    for i in range(query_start, query_start + middle):
+        base_costs = costs[query_codes[i]]
+        s = CC[0]
+        t += gap_extend
+        c = t
+        CC[0] = c
+        e = t + gap_open
+        for j in range(1, len_reference + 1):
+            e = min(e, c + gap_open) + gap_extend
+            d = min(DD[j], CC[j] + gap_open) + gap_extend
+            DD[j] = d
+            c = min(d, e, s + base_costs[reference_codes[reference_start + j - 1]])
+            s = CC[j]
+            CC[j] = c
+    DD[0] = CC[0]
+
+    # reverse pass over the lower half, RR and SS mirror CC and DD
+    RR = [0] * (len_reference + 1)
+    SS = [0] * (len_reference + 1)
+    t = gap_open
+    for j in range(len_reference - 1, -1, -1):
+        t += gap_extend
+        RR[j] = t
+        SS[j] = t + gap_open
+    t = end_gap_open
+    for i in range(query_end - 1, query_start + middle - 1, -1):
+        base_costs = costs[query_codes[i]]
+        s = RR[len_reference]
+        t += gap_extend
+        c = t
+        RR[len_reference] = c
+        e = t + gap_open
+        for j in range(len_reference - 1, -1, -1):
+            e = min(e, c + gap_open) + gap_extend
+            d = min(SS[j], RR[j] + gap_open) + gap_extend
+            SS[j] = d
+            c = min(d, e, s + base_costs[reference_codes[reference_start + j]])
+            s = RR[j]
+            RR[j] = c
+    SS[len_reference] = RR[len_reference]
+
+    # an optimal path either crosses the middle row at a column (type 1) or with a
+    # gap spanning the two middle query bases (type 2)
+    best_cost = CC[0] + RR[0]
+    best_j = 0
+    spans_gap = False
+    for j in range(len_reference + 1):
+        cost = CC[j] + RR[j]
+        if cost < best_cost:
+            best_cost, best_j, spans_gap = cost, j, False
+        cost = DD[j] + SS[j] - gap_open
+        if cost < best_cost:
+            best_cost, best_j, spans_gap = cost, j, True
+
+    query_middle = query_start + middle
+    reference_middle = reference_start + best_j
+    if not spans_gap:
+        _align_linear_space(
+            query_codes,
+            query_start,
+            query_middle,
+            reference_codes,
+            reference_start,
+            reference_middle,
+            start_gap_open,
+            gap_open,
+            costs,
+            gap_open,
+            gap_extend,
+            ops,
+        )
+        _align_linear_space(
+            query_codes,
+            query_middle,
+            query_end,
+            reference_codes,
+            reference_middle,
+            reference_end,
+            gap_open,
+            end_gap_open,
+            costs,
+            gap_open,
+            gap_extend,
+            ops,
+        )
+    else:
+        _align_linear_space(
+            query_codes,
+            query_start,
+            query_middle - 1,
+            reference_codes,
+            reference_start,
+            reference_middle,
+            start_gap_open,
+            0,
+            costs,
+            gap_open,
+            gap_extend,
+            ops,
+        )
+        ops.extend("II")
+        _align_linear_space(
+            query_codes,
+            query_middle + 1,
+            query_end,
+            reference_codes,
+            reference_middle,
+            reference_end,
+            0,
+            end_gap_open,
+            costs,
+            gap_open,
+            gap_extend,
+            ops,
+        )
+
+
+def find_global_alignment_linear_space(
+    query: str,
+    reference: str,
+    scoring_matrix: Optional[np.ndarray] = None,
+    gap_open: int = DEFAULT_GAP_OPEN,
+    gap_extend: int = DEFAULT_GAP_EXTEND,
+) -> Alignment:
+    """Align `query` end to end against `reference` in O(len(reference)) memory using
+    Hirschberg's divide and conquer traceback extended to affine gaps (Myers-Miller).
+    The score is the same as `find_global_alignment`, equally optimal alignments may
+    however be reported with a different CIGAR string
+    >>> find_global_alignment_linear_space("ACGTACGT", "ACGTACGT")
+    Alignment(score=8, query_start=0, query_end=8, reference_start=0, reference_end=8, cigar='8M')
+    >>> find_global_alignment_linear_space("ACGTACGT", "ACGTTACGT").score
+    1
+    """
+    if scoring_matrix is None:
+        scoring_matrix = create_scoring_matrix()
+    costs = (-scoring_matrix).tolist()
+    query_codes = encode_sequence(query).tolist()
+    reference_codes = encode_sequence(reference).tolist()
+    ops = []
+    _align_linear_space(
+        query_codes,
+        0,
+        len(query_codes),
+        reference_codes,
+        0,
+        len(reference_codes),
+        gap_open,
+        gap_open,
+        costs,
+        gap_open,
+        gap_extend,
+        ops,
+    )
+    cigar = ops_to_cigar(ops)
+    score = score_cigar(query, reference, cigar, scoring_matrix, gap_open, gap_extend)
+    return Alignment(score, 0, len(query), 0, len(reference), cigar)
+
+
+def _encode_batch(sequences: List[str], length: int) -> np.ndarray:
+    """Helper function that encodes sequences into the rows of a matrix padded with ``N``"""
+    codes = np.full((len(sequences), length), CODE_N, dtype=np.uint8)
+    for row, sequence in enumerate(sequences):
+        codes[row, : len(sequence)] = encode_sequence(sequence)
+    return codes
+
+
+def find_alignment_scores_batch(
+    queries: List[str],
+    references: List[str],
+    scoring_matrix: Optional[np.ndarray] = None,
+    gap_open: int = DEFAULT_GAP_OPEN,
+    gap_extend: int = DEFAULT_GAP_EXTEND,
+    local: bool = False,
+) -> np.ndarray:
+    """Compute the global (or local) alignment score of each query against the
+    reference window at the same index, without traceback. The matrices of the whole
+    batch are filled one anti-diagonal at a time, so every NumPy operation covers all
+    cells of a diagonal across all pairs and memory stays O(batch * query length)
+    >>> find_alignment_scores_batch(["ACGTACGT", "ACGT"], ["ACGTTACGT", "ACGA"])
+    array([ 1, -1])
+    >>> find_alignment_scores_batch(["CCACGTACGTCC"], ["TTTTACGTACGTTTTT"], local=True)
+    array([8])
+    """
+    assert len(queries) == len(references)
+    if scoring_matrix is None:
+        scoring_matrix = create_scoring_matrix()
+    substitution = scoring_matrix.astype(np.int32)
+    gap_open_cost = gap_open + gap_extend
+    batch_size = len(queries)
+    query_lengths = np.array([len(query) for query in queries], dtype=np.int64)
+    reference_lengths = np.array([len(ref) for ref in references], dtype=np.int64)
+    len_query = int(query_lengths.max(initial=0))
+    len_reference = int(reference_lengths.max(initial=0))
+    query_codes = _encode_batch(queries, len_query)
+    reference_codes = _encode_batch(references, len_reference)
+
+    # diagonals are indexed by the query position i, so that cell (i, j) of diagonal
+    # d = i + j depends on cells i and i - 1 of diagonal d - 1 and i - 1 of d - 2
+    shape = (batch_size, len_query + 1)
+    H_previous = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+    H_current = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+    E_current = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+    F_current = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+    rows = np.arange(1, len_query + 1)
+    scores = np.zeros(batch_size, dtype=np.int64)
+    ends_on_diagonal = query_lengths + reference_lengths
+
+    for diagonal in range(len_query + len_reference + 1):
+        columns = diagonal - rows
+        valid = (columns >= 1) & (columns <= len_reference)
+        H_next = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+        E_next = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+        F_next = np.full(shape, _BATCH_NEGATIVE_INFINITY, dtype=np.int32)
+        if valid.any():
+            first, last = rows[valid][0], rows[valid][-1]
+            cells = slice(first, last + 1)
+            above = slice(first - 1, last)
+            reference_bases = reference_codes[:, columns[valid] - 1]
+            E = np.maximum(
+                H_current[:, cells] - gap_open_cost, E_current[:, cells] - gap_extend
+            )
+            F = np.maximum(
+                H_current[:, above] - gap_open_cost, F_current[:, above] - gap_extend
+            )
+            H = np.maximum(
+                H_previous[:, above]
+                + substitution[query_codes[:, first - 1 : last], reference_bases],
+                np.maximum(E, F),
+            )
+            if local:
+                np.maximum(H, 0, out=H)
+            H_next[:, cells] = H
+            E_next[:, cells] = E
+            F_next[:, cells] = F
+
+        # first row and first column of the matrices
+        boundary = 0 if local else -(gap_open + diagonal * gap_extend)
+        if diagonal == 0:
+            H_next[:, 0] = 0
+        else:
+            if diagonal <= len_reference:
+                H_next[:, 0] = boundary
+                if not local:
+                    E_next[:, 0] = boundary
+            if diagonal <= len_query:
+                H_next[:, diagonal] = boundary
+                if not local:
+                    F_next[:, diagonal] = boundary
+
+        if local and len_query > 0:
+            inside = (rows[None, :] <= query_lengths[:, None]) & (
+                (diagonal - rows)[None, :] <= reference_lengths[:, None]
+            )
+            np.maximum(
+                scores, np.where(inside, H_next[:, 1:], 0).max(axis=1), out=scores
+            )
+        else:
+            finished = np.nonzero(ends_on_diagonal == diagonal)[0]
+            scores[finished] = H_next[finished, query_lengths[finished]]
+
+        H_previous, H_current = H_current, H_next
+        E_current, F_current = E_next, F_next
+    return scores
@@ -1,10 +1,18 @@
 import doctest
 
-from typing import List
+import numpy as np
 
+from typing import Iterator, List, Optional, Tuple
 
+from genomics_algo.approximate_matching_algorithms.alignment import ops_to_cigar
+from genomics_algo.utilities import kernels
+from genomics_algo.utilities.low_complexity import get_masked_counts
+from genomics_algo.utilities.profiling import profiled
+
+
+@profiled
 def get_occurences_with_dynamic_programming(
-    pattern: str, text: str, max_mismatches: int
+    pattern: str, text: str, max_mismatches: int, mask: Optional[np.ndarray] = None
 ) -> List[int]:
     """Get indices of all occurences of the string `pattern` in the string `text` using
     approximate matching (Levenshtein distance is used to count the number of mismatches i.e.,
@@ -16,8 +24,17 @@ def get_occurences_with_dynamic_programming(
     [5]
     >>> get_occurences_with_dynamic_programming("ACT", "GACTACGGAGACT", 0)
     [1, 10]
+
+    Occurences overlapping a base masked in `mask` (e.g. from
+    `find_low_complexity_mask`) are skipped, those ending in a masked base before
+    they are traced back
+    >>> mask = np.array([False] * 9 + [True] * 4)
+    >>> get_occurences_with_dynamic_programming("ACT", "GACTACGGAGACT", 0, mask)
+    [1]
     """
     assert len(pattern) <= len(text)
+    if kernels.BACKEND == "numba":
+        return _get_occurences_with_kernel(pattern, text, max_mismatches, mask)
 
     # initializing a matrix for with `len(pattern) + 1` rows and `len(text) + 1` columns
     D = [[0 for x in range(len(text) + 1)] for y in range(len(pattern) + 1)]
@@ -48,13 +65,97 @@ def get_occurences_with_dynamic_programming(
             if mismatch_count <= max_mismatches:
                 occurence_end_indices.append(end_index)
 
+        if mask is not None:
+            masked_counts = get_masked_counts(mask).tolist()
+            occurence_end_indices = [
+                end_index
+                for end_index in occurence_end_indices
+                if masked_counts[end_index] == masked_counts[max(end_index - 1, 0)]
+            ]
         occurences = _backtrace_approximate_match(
             pattern=pattern, text=text, D=D, occurence_end_indices=occurence_end_indices
         )
+        if mask is not None:
+            occurences = [
+                start
+                for start, end_index in zip(occurences, occurence_end_indices)
+                if masked_counts[end_index] == masked_counts[start]
+            ]
 
     return occurences
 
 
+def _get_occurences_with_kernel(
+    pattern: str, text: str, max_mismatches: int, mask: Optional[np.ndarray]
+) -> List[int]:
+    """Compiled version of `get_occurences_with_dynamic_programming`, which finds the
+    starts of the occurences while filling the matrix instead of backtracing"""
+    ends, starts = kernels.find_approximate_occurences(
+        kernels.encode_characters(pattern),
+        kernels.encode_characters(text),
+        max_mismatches,
+    )
+    if mask is not None:
+        masked_counts = get_masked_counts(mask)
+        unmasked = (masked_counts[ends] == masked_counts[np.maximum(ends - 1, 0)]) & (
+            masked_counts[ends] == masked_counts[starts]
+        )
+        starts = starts[unmasked]
+    return starts.tolist()
+
+
+def iterate_occurences_with_dynamic_programming(
+    pattern: str, text: str, max_mismatches: int, mask: Optional[np.ndarray] = None
+) -> Iterator[int]:
+    """Lazily yield the same occurences as `get_occurences_with_dynamic_programming`,
+    in the same order, without building the matrix: it is filled column by column
+    along `text`, keeping only the last column and, for each of its cells, the start
+    of the occurence the backtrace from that cell would lead to (the backtrace rules
+    are applied while filling). Only `len(pattern) + 1` cells are held at any time and
+    `text` is scanned only as far as the occurences are consumed
+    >>> next(iterate_occurences_with_dynamic_programming("GCGTATGC", "TATTGGCTATACGGTT", 2))
+    5
+    >>> list(iterate_occurences_with_dynamic_programming("ACT", "GACTACGGAGACT", 0))
+    [1, 10]
+    """
+    assert len(pattern) <= len(text)
+    masked_counts = get_masked_counts(mask).tolist() if mask is not None else None
+    len_pattern = len(pattern)
+
+    # first column, all edits are insertions in pattern
+    column = list(range(len_pattern + 1))
+    starts = [0] * (len_pattern + 1)
+    if column[-1] <= max_mismatches:
+        yield 0
+    for j in range(1, len(text) + 1):
+        previous_column = column
+        previous_starts = starts
+        column = [0] * (len_pattern + 1)
+        starts = [j] * (len_pattern + 1)
+        text_base = text[j - 1]
+        for i in range(1, len_pattern + 1):
+            distance_left = previous_column[i] + 1  # deletion in pattern
+            distance_above = column[i - 1] + 1  # insertion in pattern
+            distance_diagonal = previous_column[i - 1] + (
+                pattern[i - 1] != text_base
+            )  # substitution
+            distance = min(distance_left, distance_above, distance_diagonal)
+            column[i] = distance
+            # same order of preference as `_backtrace_approximate_match`
+            if distance == distance_above:
+                starts[i] = starts[i - 1]
+            elif distance == distance_left:
+                starts[i] = previous_starts[i]
+            else:
+                starts[i] = previous_starts[i - 1]
+        # like the list version, skip occurences ending in a masked base, even empty
+        if column[-1] <= max_mismatches and (
+            masked_counts is None
+            or masked_counts[j] == masked_counts[min(starts[-1], j - 1)]
+        ):
+            yield starts[-1]
+
+
 def _backtrace_approximate_match(
     pattern: str, text: str, D: List[List[int]], occurence_end_indices: List[int]
 ) -> List[int]:
@@ -91,3 +192,93 @@ def _backtrace_approximate_match(
                 j -= 1
         occurence_start_indices.append(j)
     return occurence_start_indices
+
+
+@profiled
+def get_best_approximate_match(
+    pattern: str, text: str, max_mismatches: int
+) -> Optional[Tuple[int, int, int, str]]:
+    """Find the approximate occurence of `pattern` in `text` with the fewest edits
+    (Levenshtein distance), if there is one with at most `max_mismatches` edits.
+    Only the band of the matrix such an occurence can pass through is filled and the
+    search stops as soon as a whole row exceeds `max_mismatches`, so this is cheap for
+    verifying a candidate window of a read mapper
+    >>> get_best_approximate_match("GCGTATGC", "TATTGGCTATACGGTT", 2)
+    (5, 12, 2, '2M1I5M')
+    >>> get_best_approximate_match("ACT", "GACTACGGAGACT", 0)
+    (1, 4, 0, '3M')
+    >>> get_best_approximate_match("GCGTATGC", "TATTGGCTATACGGTT", 1) is None
+    True
+
+    Returns:
+        Optional[Tuple[int, int, int, str]]: start and end index of the occurence in
+            `text`, the number of edits and the alignment as a CIGAR string, or None
+    """
+    len_pattern = len(pattern)
+    len_text = len(text)
+    if len_pattern - len_text > max_mismatches:
+        return None
+
+    # cell (i, j) of the full matrix is stored at D[i][j - i - lowest_diagonal]
+    lowest_diagonal = -max_mismatches
+    band_width = len_text - len_pattern + 2 * max_mismatches + 1
+    too_many = max_mismatches + 1
+    D = [[too_many] * band_width for _ in range(len_pattern + 1)]
+    for b in range(max_mismatches, band_width):
+        D[0][b] = 0
+
+    for i in range(1, len_pattern + 1):
+        row_above = D[i - 1]
+        row = D[i]
+        pattern_base = pattern[i - 1]
+        row_minimum = too_many
+        for b in range(band_width):
+            j = i + lowest_diagonal + b
+            if j < 0:
+                continue
+            if j > len_text:
+                break
+            distance = too_many
+            if j > 0:
+                distance = row_above[b] + (pattern_base != text[j - 1])  # substitution
+                if b > 0 and row[b - 1] + 1 < distance:
+                    distance = row[b - 1] + 1  # deletion in pattern
+            if b + 1 < band_width and row_above[b + 1] + 1 < distance:
+                distance = row_above[b + 1] + 1  # insertion in pattern
+            if distance > too_many:
+                distance = too_many
+            row[b] = distance
+            if distance < row_minimum:
+                row_minimum = distance
+        if row_minimum > max_mismatches:
+            return None
+
+    # leftmost end with the fewest edits in the last row
+    best_b = None
+    for b in range(band_width):
+        j = len_pattern + lowest_diagonal + b
+        if 0 <= j <= len_text and D[-1][b] <= max_mismatches:
+            if best_b is None or D[-1][b] < D[-1][best_b]:
+                best_b = b
+    if best_b is None:
+        return None
+
+    ops = []
+    i, b = len_pattern, best_b
+    while i > 0:
+        j = i + lowest_diagonal + b
+        distance = D[i][b]
+        if j > 0 and distance == D[i - 1][b] + (pattern[i - 1] != text[j - 1]):
+            ops.append("M")
+            i -= 1
+        elif b + 1 < band_width and distance == D[i - 1][b + 1] + 1:
+            ops.append("I")
+            i -= 1
+            b += 1
+        else:
+            ops.append("D")
+            b -= 1
+    ops.reverse()
+    end = len_pattern + lowest_diagonal + best_b
+    start = lowest_diagonal + b
+    return start, end, D[-1][best_b], ops_to_cigar(ops)
@@ -0,0 +1,182 @@
+import numpy as np
+
+from typing import Iterable, List, Optional, Tuple
+
+from genomics_algo.utilities.kmer_counting import (
+    DEFAULT_CHUNK_SIZE,
+    count_kmers,
+    kmer_dtype,
+)
+from genomics_algo.utilities.sequence_encoding import (
+    ALPHABET,
+    decode_kmer,
+    encode_kmer,
+)
+
+MAX_ABUNDANCE = np.iinfo(np.uint16).max
+
+
+class DeBruijnGraph:
+    """De Bruijn graph of order `k`: nodes are the (k-1)-mers and every distinct k-mer
+    of the reads is an edge from its prefix to its suffix. Only the sorted 2-bit packed
+    k-mer codes and their abundances (saturating at `MAX_ABUNDANCE`) are stored, i.e.
+    6 bytes per k-mer for ``k <= 16`` and 10 bytes otherwise. Since the k-mers are
+    sorted, the edges leaving a node are a contiguous range found by binary search
+    >>> graph = DeBruijnGraph.from_reads(["ACGTCA", "GTCAGG"], 3)
+    >>> len(graph)
+    6
+    >>> graph.get_unitigs()
+    ['ACGTCAGG']
+    """
+
+    def __init__(self, k: int, kmers: np.ndarray, abundances: np.ndarray):
+        assert 1 < k <= 32
+        assert len(kmers) == len(abundances)
+        self.k = k
+        self.kmers = np.asarray(kmers, dtype=kmer_dtype(k))
+        self.abundances = np.minimum(abundances, MAX_ABUNDANCE).astype(np.uint16)
+
+    @classmethod
+    def from_reads(
+        cls,
+        reads: Iterable[str],
+        k: int,
+        min_abundance: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> "DeBruijnGraph":
+        """Build the graph of all k-mers occurring at least `min_abundance` times in
+        the reads, which can be streamed e.g. from `iterate_fastq`"""
+        kmers, abundances = count_kmers(reads, k, chunk_size)
+        return cls(k, kmers, abundances).prune(min_abundance)
+
+    def __len__(self) -> int:
+        return len(self.kmers)
+
+    @property
+    def nbytes(self) -> int:
+        return self.kmers.nbytes + self.abundances.nbytes
+
+    def prune(self, min_abundance: int) -> "DeBruijnGraph":
+        """Get the graph without the k-mers seen less than `min_abundance` times, which
+        mostly stem from sequencing errors"""
+        keep = self.abundances >= min_abundance
+        return DeBruijnGraph(self.k, self.kmers[keep], self.abundances[keep])
+
+    def get_successors(self, node: str) -> List[str]:
+        """Get the (k-1)-mers following a (k-1)-mer in the graph"""
+        assert len(node) == self.k - 1
+        start, end = self._get_out_edges(np.array([encode_kmer(node)]))
+        return [
+            node[1:] + ALPHABET[int(kmer) & 3] for kmer in self.kmers[start[0] : end[0]]
+        ]
+
+    def _get_out_edges(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the ranges of `kmers` holding the edges leaving each of the nodes"""
+        first = nodes.astype(self.kmers.dtype) << self.kmers.dtype.type(2)
+        starts = np.searchsorted(self.kmers, first, side="left")
+        ends = np.searchsorted(self.kmers, first + self.kmers.dtype.type(3), "right")
+        return starts, ends
+
+    def _get_edge_nodes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the source and target (k-1)-mer of every edge"""
+        node_mask = self.kmers.dtype.type((1 << (2 * (self.k - 1))) - 1)
+        return self.kmers >> self.kmers.dtype.type(2), self.kmers & node_mask
+
+    def _get_in_degrees(self, nodes: np.ndarray) -> np.ndarray:
+        """Get the number of edges entering each of the nodes"""
+        _, targets = self._get_edge_nodes()
+        targets, counts = np.unique(targets, return_counts=True)
+        indices = np.minimum(np.searchsorted(targets, nodes), max(len(targets) - 1, 0))
+        if len(targets) == 0:
+            return np.zeros(len(nodes), dtype=np.int64)
+        return np.where(targets[indices] == nodes, counts[indices], 0)
+
+    def _get_path_sequence(self, edges: List[int]) -> str:
+        """Spell the sequence of a path given as indices of consecutive edges"""
+        return decode_kmer(self.kmers[edges[0]], self.k) + "".join(
+            ALPHABET[code] for code in (self.kmers[edges[1:]] & 3).tolist()
+        )
+
+    def get_unitigs(self) -> List[str]:
+        """Compact the graph into unitigs, the maximal paths whose inner nodes have
+        exactly one incoming and one outgoing edge. Every k-mer is part of exactly one
+        unitig; isolated cycles are spelled starting from their smallest k-mer. The
+        successor of every edge on such a path is computed with vectorized binary
+        searches, so only the final walks are done edge by edge"""
+        sources, targets = self._get_edge_nodes()
+        successor_starts, successor_ends = self._get_out_edges(targets)
+        is_internal_target = (successor_ends - successor_starts == 1) & (
+            self._get_in_degrees(targets) == 1
+        )
+        next_edges = np.where(is_internal_target, successor_starts, -1).tolist()
+
+        source_starts, source_ends = self._get_out_edges(sources)
+        is_internal_source = (source_ends - source_starts == 1) & (
+            self._get_in_degrees(sources) == 1
+        )
+        visited = [False] * len(self.kmers)
+        unitigs = []
+        start_edges = np.nonzero(~is_internal_source)[0].tolist()
+        for start_edge in start_edges + list(range(len(self.kmers))):
+            if visited[start_edge]:
+                continue
+            path = [start_edge]
+            visited[start_edge] = True
+            next_edge = next_edges[start_edge]
+            while next_edge != -1 and not visited[next_edge]:
+                path.append(next_edge)
+                visited[next_edge] = True
+                next_edge = next_edges[next_edge]
+            unitigs.append(self._get_path_sequence(path))
+        return unitigs
+
+    def find_eulerian_path(self) -> Optional[List[int]]:
+        """Find a path using every k-mer exactly once with Hierholzer's algorithm
+
+        Returns:
+            Optional[List[int]]: indices of the k-mers along the path, or None if the
+                graph has no Eulerian path
+        """
+        if len(self.kmers) == 0:
+            return []
+        sources, targets = self._get_edge_nodes()
+        nodes = np.unique(np.concatenate((sources, targets)))
+        out_starts, out_ends = self._get_out_edges(nodes)
+        balances = (out_ends - out_starts) - self._get_in_degrees(nodes)
+        if np.abs(balances).sum() > 2:
+            return None
+        start_nodes = np.nonzero(balances == 1)[0]
+        start = (
+            start_nodes[0] if len(start_nodes) > 0 else np.argmax(out_ends > out_starts)
+        )
+
+        successor_starts, successor_ends = self._get_out_edges(targets)
+        successor_starts = successor_starts.tolist()
+        successor_ends = successor_ends.tolist()
+        # the next unused edge leaving a node, keyed by its first edge
+        next_unused = {}
+        stack = [(int(out_starts[start]), int(out_ends[start]), -1)]
+        path = []
+        while stack:
+            first_edge, end, edge = stack[-1]
+            next_edge = next_unused.get(first_edge, first_edge)
+            if next_edge < end:
+                next_unused[first_edge] = next_edge + 1
+                stack.append(
+                    (successor_starts[next_edge], successor_ends[next_edge], next_edge)
+                )
+            else:
+                stack.pop()
+                if edge != -1:
+                    path.append(edge)
+        if len(path) != len(self.kmers):
+            return None
+        return path[::-1]
+
+    def assemble_eulerian(self) -> Optional[str]:
+        """Spell the sequence of an Eulerian path, which for error free reads covering a
+        genome without repeated (k-1)-mers is the genome itself"""
+        path = self.find_eulerian_path()
+        if path is None or len(path) == 0:
+            return None
+        return self._get_path_sequence(path)
@@ -0,0 +1,162 @@
+import numpy as np
+
+from typing import List, NamedTuple, Optional, Tuple
+
+from genomics_algo.utilities.sequence_encoding import encode_kmers, encode_sequence
+
+MAX_SEED_LENGTH = 32
+
+
+class OverlapGraph(NamedTuple):
+    """Directed graph of reads in compressed sparse row (CSR) form: the edges leaving
+    read ``i`` go to ``targets[offsets[i]:offsets[i + 1]]``, where a suffix of read
+    ``i`` of length ``overlap_lengths[...]`` equals a prefix of the target read"""
+
+    offsets: np.ndarray
+    targets: np.ndarray
+    overlap_lengths: np.ndarray
+
+    @property
+    def number_of_reads(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def number_of_edges(self) -> int:
+        return len(self.targets)
+
+    def get_successors(self, read_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the reads overlapping the end of a read and the overlap lengths"""
+        edges = slice(self.offsets[read_index], self.offsets[read_index + 1])
+        return self.targets[edges], self.overlap_lengths[edges]
+
+    def get_edges(self) -> List[Tuple[int, int, int]]:
+        """Get all edges as (source, target, overlap length)"""
+        sources = np.repeat(np.arange(self.number_of_reads), np.diff(self.offsets))
+        return list(
+            zip(sources.tolist(), self.targets.tolist(), self.overlap_lengths.tolist())
+        )
+
+
+def _get_candidate_overlaps(
+    reads: List[str], min_overlap: int, seed_length: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Helper function finding (source, target, start in source) for every position of
+    a source read where the seed at the start of a target read occurs, far enough from
+    the end of the source for an overlap of at least `min_overlap`. Reads are joined
+    with ``N`` so that the k-mers of all reads are encoded in one pass"""
+    read_lengths = np.array([len(read) for read in reads], dtype=np.int64)
+    read_starts = np.concatenate(([0], np.cumsum(read_lengths + 1)[:-1]))
+    kmers, valid = encode_kmers(encode_sequence("N".join(reads)), seed_length)
+
+    # seeds: the first k-mer of every read, sorted so they can be binary searched
+    has_seed = (read_lengths >= seed_length) & (read_starts < len(valid))
+    has_seed[has_seed] = valid[read_starts[has_seed]]
+    seed_reads = np.nonzero(has_seed)[0]
+    seed_codes = kmers[read_starts[seed_reads]]
+    order = np.argsort(seed_codes, kind="stable")
+    seed_reads, seed_codes = seed_reads[order], seed_codes[order]
+
+    positions = np.nonzero(valid)[0]
+    sources = np.searchsorted(read_starts, positions, side="right") - 1
+    starts_in_source = positions - read_starts[sources]
+    # an overlap starts after the first base and is at least `min_overlap` long
+    keep = (starts_in_source > 0) & (
+        read_lengths[sources] - starts_in_source >= min_overlap
+    )
+    positions, sources, starts_in_source = (
+        positions[keep],
+        sources[keep],
+        starts_in_source[keep],
+    )
+    first = np.searchsorted(seed_codes, kmers[positions], side="left")
+    last = np.searchsorted(seed_codes, kmers[positions], side="right")
+    hits = last - first
+    candidate_sources = np.repeat(sources, hits)
+    candidate_starts = np.repeat(starts_in_source, hits)
+    # index of each candidate within the range of seeds matched by its position
+    within_range = np.arange(hits.sum()) - np.repeat(np.cumsum(hits) - hits, hits)
+    candidate_targets = seed_reads[np.repeat(first, hits) + within_range]
+    return candidate_sources, candidate_targets, candidate_starts
+
+
+def build_overlap_graph(
+    reads: List[str], min_overlap: int, seed_length: Optional[int] = None
+) -> OverlapGraph:
+    """Build the graph of maximal suffix-prefix overlaps of at least `min_overlap`
+    bases between all pairs of distinct reads. Instead of comparing all pairs, only
+    pairs where the first `seed_length` bases of one read occur in the other are
+    verified, any overlap of at least `min_overlap` >= `seed_length` bases contains
+    such a seed. Overlaps spanning the whole source read are not reported
+    >>> graph = build_overlap_graph(["ACGTTGCA", "TTGCATGG", "CATGGAAC"], 3)
+    >>> graph.get_edges()
+    [(0, 1, 5), (1, 2, 5)]
+    """
+    assert min_overlap > 0
+    if seed_length is None:
+        seed_length = min(min_overlap, MAX_SEED_LENGTH)
+    assert 0 < seed_length <= min(min_overlap, MAX_SEED_LENGTH)
+
+    sources, targets, starts = _get_candidate_overlaps(reads, min_overlap, seed_length)
+    # verify the candidates of each pair from the longest possible overlap on, and keep
+    # only the longest one that verifies
+    order = np.lexsort((starts, targets, sources))
+    edges = {}
+    for source, target, start in zip(
+        sources[order].tolist(), targets[order].tolist(), starts[order].tolist()
+    ):
+        if source == target or (source, target) in edges:
+            continue
+        source_read = reads[source]
+        if reads[target].startswith(source_read[start:]):
+            edges[(source, target)] = len(source_read) - start
+
+    edge_sources = np.array([source for source, _ in edges], dtype=np.int64)
+    offsets = np.zeros(len(reads) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_sources, minlength=len(reads)), out=offsets[1:])
+    return OverlapGraph(
+        offsets=offsets,
+        targets=np.array([target for _, target in edges], dtype=np.int64),
+        overlap_lengths=np.array(list(edges.values()), dtype=np.int64),
+    )
+
+
+def assemble_greedy(reads: List[str], graph: OverlapGraph) -> List[str]:
+    """Assemble contigs by greedily joining the reads with the longest overlaps first,
+    as long as every read keeps at most one successor and predecessor and no cycle is
+    formed
+    >>> reads = ["ACGTTGCA", "TTGCATGG", "CATGGAAC"]
+    >>> assemble_greedy(reads, build_overlap_graph(reads, 3))
+    ['ACGTTGCATGGAAC']
+    """
+    successor = {}
+    predecessor = {}
+    # the first read of the chain each read belongs to, to detect cycles
+    chain_start = list(range(len(reads)))
+
+    def find_chain_start(read_index):
+        while chain_start[read_index] != read_index:
+            chain_start[read_index] = chain_start[chain_start[read_index]]
+            read_index = chain_start[read_index]
+        return read_index
+
+    for source, target, overlap_length in sorted(
+        graph.get_edges(), key=lambda edge: -edge[2]
+    ):
+        if source in successor or target in predecessor:
+            continue
+        if find_chain_start(source) == find_chain_start(target):
+            continue
+        successor[source] = (target, overlap_length)
+        predecessor[target] = source
+        chain_start[find_chain_start(target)] = find_chain_start(source)
+
+    contigs = []
+    for read_index in range(len(reads)):
+        if read_index in predecessor:
+            continue
+        contig = [reads[read_index]]
+        while read_index in successor:
+            read_index, overlap_length = successor[read_index]
+            contig.append(reads[read_index][overlap_length:])
+        contigs.append("".join(contig))
+    return contigs
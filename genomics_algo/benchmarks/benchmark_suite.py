@@ -0,0 +1,257 @@
+import json
+import math
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
+    get_occurences_with_dynamic_programming,
+)
+from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
+    get_occurences_with_boyer_moore_exact_matching,
+)
+from genomics_algo.exact_matching_algorithms.kmer_index import KmerIndex
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_naive_match,
+)
+from genomics_algo.miscellaneous_algorithms.misc_algos import (
+    find_most_freq_k_substring,
+)
+from genomics_algo.read_mapping.mapper import ReadMapper
+from genomics_algo.utilities.misc_utilities import (
+    generate_artificial_reads,
+    get_frequency_map,
+)
+from genomics_algo.utilities.sequence_encoding import decode_sequence
+
+DEFAULT_GENOME_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_NUMBER_OF_READS = 20
+DEFAULT_REPEAT = 3
+PATTERN_LENGTH = 20
+READ_LENGTH = 100
+KMER_LENGTH = 8
+# the dynamic programming matcher fills a len(pattern) x len(genome) matrix in pure
+# Python, so it is only timed on the smaller genomes
+MAX_DYNAMIC_PROGRAMMING_GENOME_SIZE = 10_000
+
+
+class BenchmarkResult(NamedTuple):
+    """Timing of one engine on one genome size: `throughput` is `items` (patterns,
+    reads or bases, see `unit`) per second of the fastest of the repeated runs"""
+
+    benchmark: str
+    engine: str
+    genome_size: int
+    items: int
+    unit: str
+    seconds: float
+    throughput: float
+    peak_memory_bytes: int
+
+
+def generate_random_genome(length: int, seed: int) -> str:
+    """Generate a reproducible random genome with uniformly distributed bases
+    >>> generate_random_genome(12, seed=0) == generate_random_genome(12, seed=0)
+    True
+    >>> len(generate_random_genome(12, seed=0))
+    12
+    """
+    rng = np.random.default_rng(seed)
+    return decode_sequence(rng.integers(0, 4, size=length, dtype=np.uint8))
+
+
+def measure(function: Callable[[], object], repeat: int) -> Tuple[float, int]:
+    """Time `function` as the fastest of `repeat` runs, then run it once more under
+    ``tracemalloc`` to find the peak memory it allocates
+
+    Returns:
+        Tuple[float, int]: seconds and peak allocated bytes (-1 if ``tracemalloc`` was
+            already tracing, to not disturb the caller's measurement)
+    """
+    seconds = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    if tracemalloc.is_tracing():
+        return seconds, -1
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak_memory
+
+
+def _get_benchmarks(
+    genome: str, patterns: List[str], reads: List[str]
+) -> List[Tuple[str, str, int, str, Callable[[], object]]]:
+    """Helper function listing benchmark name, engine, number of items, unit of the
+    items and the function to time for one genome"""
+
+    def match_all(matching_algo):
+        return lambda: [matching_algo(pattern, genome) for pattern in patterns]
+
+    def index_and_match_all():
+        index = KmerIndex(genome, 12)
+        return [index.get_occurences(pattern) for pattern in patterns]
+
+    def map_all():
+        mapper = ReadMapper(genome)
+        return [mapper.map_read(read) for read in reads]
+
+    benchmarks = [
+        (
+            "exact_matching",
+            "naive",
+            len(patterns),
+            "patterns",
+            match_all(get_occurences_with_naive_match),
+        ),
+        (
+            "exact_matching",
+            "boyer_moore",
+            len(patterns),
+            "patterns",
+            match_all(get_occurences_with_boyer_moore_exact_matching),
+        ),
+        (
+            "exact_matching",
+            "kmer_index",
+            len(patterns),
+            "patterns",
+            index_and_match_all,
+        ),
+        (
+            "kmer_counting",
+            "get_frequency_map",
+            len(genome),
+            "bases",
+            lambda: (get_frequency_map(genome, KMER_LENGTH)),
+        ),
+        (
+            "kmer_counting",
+            "find_most_freq_k_substring",
+            len(genome),
+            "bases",
+            lambda: (find_most_freq_k_substring(genome, KMER_LENGTH)),
+        ),
+        ("read_mapping", "read_mapper", len(reads), "reads", map_all),
+    ]
+    if len(genome) <= MAX_DYNAMIC_PROGRAMMING_GENOME_SIZE:
+        benchmarks.append(
+            (
+                "approximate_matching",
+                "dynamic_programming",
+                1,
+                "patterns",
+                lambda: (
+                    get_occurences_with_dynamic_programming(patterns[0], genome, 2)
+                ),
+            )
+        )
+    return benchmarks
+
+
+def run_benchmarks(
+    genome_sizes: Sequence[int] = DEFAULT_GENOME_SIZES,
+    number_of_reads: int = DEFAULT_NUMBER_OF_READS,
+    seed: int = 0,
+    repeat: int = DEFAULT_REPEAT,
+) -> List[BenchmarkResult]:
+    """Time the matching engines, k-mer counting and read mapping on random genomes of
+    each size, with patterns and reads sampled from the genome. The same `seed` always
+    yields the same inputs, so results of different releases can be compared
+    """
+    results = []
+    for genome_size in genome_sizes:
+        genome = generate_random_genome(genome_size, seed)
+        patterns = generate_artificial_reads(
+            genome, number_of_reads, PATTERN_LENGTH, seed=seed
+        )
+        reads = generate_artificial_reads(
+            genome, number_of_reads, min(READ_LENGTH, genome_size - 1), seed=seed
+        )
+        for benchmark, engine, items, unit, function in _get_benchmarks(
+            genome, patterns, reads
+        ):
+            seconds, peak_memory = measure(function, repeat)
+            results.append(
+                BenchmarkResult(
+                    benchmark=benchmark,
+                    engine=engine,
+                    genome_size=genome_size,
+                    items=items,
+                    unit=unit,
+                    seconds=seconds,
+                    throughput=items / seconds if seconds > 0 else math.inf,
+                    peak_memory_bytes=peak_memory,
+                )
+            )
+    return results
+
+
+def write_benchmark_results(
+    results: List[BenchmarkResult], filename: str, seed: int = 0
+):
+    """Write benchmark results together with the environment they ran in as JSON"""
+    metadata = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+    }
+    with open(filename, "w") as f:
+        json.dump(
+            {"metadata": metadata, "results": [r._asdict() for r in results]},
+            f,
+            indent=2,
+        )
+
+
+def read_benchmark_results(filename: str) -> List[BenchmarkResult]:
+    """Read benchmark results written by `write_benchmark_results`"""
+    with open(filename) as f:
+        return [BenchmarkResult(**result) for result in json.load(f)["results"]]
+
+
+def compare_benchmark_results(
+    baseline: List[BenchmarkResult], current: List[BenchmarkResult]
+) -> Dict[Tuple[str, str, int], float]:
+    """Compare the runtime of every benchmark present in both sets of results
+
+    Returns:
+        Dict[Tuple[str, str, int], float]: ratio of current to baseline seconds for each
+            (benchmark, engine, genome size), i.e. values above 1 are regressions
+    """
+    baseline_seconds = {
+        (r.benchmark, r.engine, r.genome_size): r.seconds for r in baseline
+    }
+    return {
+        (r.benchmark, r.engine, r.genome_size): r.seconds
+        / baseline_seconds[(r.benchmark, r.engine, r.genome_size)]
+        for r in current
+        if (r.benchmark, r.engine, r.genome_size) in baseline_seconds
+        and baseline_seconds[(r.benchmark, r.engine, r.genome_size)] > 0
+    }
+
+
+def format_benchmark_results(results: List[BenchmarkResult]) -> str:
+    """Format benchmark results as a human readable table"""
+    lines = [
+        f"{'benchmark':<22}{'engine':<28}{'size':>9}{'seconds':>11}"
+        f"{'throughput':>26}{'peak MiB':>10}"
+    ]
+    for r in results:
+        throughput = f"{r.throughput:.1f} {r.unit}/s"
+        lines.append(
+            f"{r.benchmark:<22}{r.engine:<28}{r.genome_size:>9}{r.seconds:>11.4f}"
+            f"{throughput:>26}{r.peak_memory_bytes / 2 ** 20:>10.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,270 @@
+import argparse
+import sys
+import time
+
+from typing import List, Optional
+
+from genomics_algo.benchmarks import benchmark_suite
+from genomics_algo.read_mapping import mapper
+from genomics_algo.service import server
+from genomics_algo.utilities import ingestion, read_cache, read_simulation
+from genomics_algo.utilities.read_files import read_genome
+
+
+def _run_map(args: argparse.Namespace) -> int:
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        stats = mapper.map_reads(
+            genome_filename=args.reference,
+            reads_filename=args.reads,
+            output=output,
+            output_format=args.format,
+            seed_length=args.seed_length,
+            max_mismatches=args.max_mismatches,
+            max_seed_hits=args.max_seed_hits,
+            mask_low_complexity=args.mask_low_complexity,
+            result_cache_size=args.result_cache_size,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"indexed reference in {stats.index_seconds:.2f}s, mapped "
+        f"{stats.mapped_reads} of {stats.reads} reads in {stats.mapping_seconds:.2f}s "
+        f"({stats.reads_per_second:.1f} reads/sec)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _add_map_parser(subparsers):
+    parser = subparsers.add_parser(
+        "map", help="map sequencing reads of a .fastq file to a reference genome"
+    )
+    parser.add_argument("reference", help="reference genome (.fa)")
+    parser.add_argument("reads", help="sequencing reads (.fastq)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=mapper.OUTPUT_FORMATS, default="tsv")
+    parser.add_argument(
+        "-k", "--seed-length", type=int, default=mapper.DEFAULT_SEED_LENGTH
+    )
+    parser.add_argument(
+        "-e",
+        "--max-mismatches",
+        type=int,
+        default=mapper.DEFAULT_MAX_MISMATCHES,
+        help="maximum edit distance of a hit",
+    )
+    parser.add_argument(
+        "--max-seed-hits",
+        type=int,
+        default=mapper.DEFAULT_MAX_SEED_HITS,
+        help="seeds occurring more often in the reference are ignored",
+    )
+    parser.add_argument(
+        "--mask-low-complexity",
+        action="store_true",
+        help="do not seed in low complexity regions of the reference (DUST)",
+    )
+    parser.add_argument(
+        "--result-cache-size",
+        type=int,
+        default=0,
+        help="map duplicate reads once, caching the hits of that many reads",
+    )
+    parser.set_defaults(func=_run_map)
+
+
+def _run_benchmark(args: argparse.Namespace) -> int:
+    results = benchmark_suite.run_benchmarks(
+        genome_sizes=args.sizes,
+        number_of_reads=args.number_of_reads,
+        seed=args.seed,
+        repeat=args.repeat,
+    )
+    print(benchmark_suite.format_benchmark_results(results))
+    if args.output:
+        benchmark_suite.write_benchmark_results(results, args.output, seed=args.seed)
+    if args.compare:
+        baseline = benchmark_suite.read_benchmark_results(args.compare)
+        ratios = benchmark_suite.compare_benchmark_results(baseline, results)
+        for (benchmark, engine, genome_size), ratio in ratios.items():
+            print(f"{benchmark} {engine} {genome_size}: {ratio:.2f}x baseline time")
+    return 0
+
+
+def _add_benchmark_parser(subparsers):
+    parser = subparsers.add_parser(
+        "benchmark", help="time the algorithms on reproducible synthetic genomes"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(benchmark_suite.DEFAULT_GENOME_SIZES),
+        help="genome sizes to benchmark",
+    )
+    parser.add_argument(
+        "--number-of-reads", type=int, default=benchmark_suite.DEFAULT_NUMBER_OF_READS
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=benchmark_suite.DEFAULT_REPEAT)
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument(
+        "--compare", help="JSON results of an earlier run to compare against"
+    )
+    parser.set_defaults(func=_run_benchmark)
+
+
+def _run_simulate(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    reads_written = read_simulation.write_simulated_fastq(
+        genome=read_genome(args.reference),
+        filename=args.output,
+        number_of_reads=args.number_of_reads,
+        read_length=args.read_length,
+        substitution_rate=args.substitution_rate,
+        insertion_rate=args.insertion_rate,
+        deletion_rate=args.deletion_rate,
+        reverse_strand_probability=args.reverse_strand_probability,
+        seed=args.seed,
+    )
+    seconds = time.perf_counter() - start
+    print(
+        f"simulated {reads_written} reads in {seconds:.2f}s "
+        f"({reads_written / seconds if seconds > 0 else 0:.1f} reads/sec)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _add_simulate_parser(subparsers):
+    parser = subparsers.add_parser(
+        "simulate", help="simulate sequencing reads with errors from a genome"
+    )
+    parser.add_argument("reference", help="reference genome (.fa)")
+    parser.add_argument("output", help="output .fastq file, gzipped if it ends in .gz")
+    parser.add_argument("-n", "--number-of-reads", type=int, required=True)
+    parser.add_argument("-l", "--read-length", type=int, default=100)
+    parser.add_argument("--substitution-rate", type=float, default=0.0)
+    parser.add_argument("--insertion-rate", type=float, default=0.0)
+    parser.add_argument("--deletion-rate", type=float, default=0.0)
+    parser.add_argument("--reverse-strand-probability", type=float, default=0.5)
+    parser.add_argument("--seed", type=int)
+    parser.set_defaults(func=_run_simulate)
+
+
+def _run_cache(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    reads_written = read_cache.write_read_cache(
+        args.reads, args.output, batch_size=args.batch_size
+    )
+    print(
+        f"cached {reads_written} reads in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _add_cache_parser(subparsers):
+    parser = subparsers.add_parser(
+        "cache", help="convert a .fastq file into a binary read cache"
+    )
+    parser.add_argument("reads", help="sequencing reads (.fastq)")
+    parser.add_argument("output", help="output read cache file")
+    parser.add_argument("--batch-size", type=int, default=read_cache.DEFAULT_BATCH_SIZE)
+    parser.set_defaults(func=_run_cache)
+
+
+def _run_qc(args: argparse.Namespace) -> int:
+    print("file\treads\tgc_content\tmean_quality")
+    for filename, qc in ingestion.run_ingestion_pipeline(
+        args.files, processes=args.processes, reader_threads=args.reader_threads
+    ):
+        print(
+            f"{filename}\t{qc.number_of_reads}\t{qc.gc_content:.4f}\t"
+            f"{qc.mean_quality:.2f}"
+        )
+    return 0
+
+
+def _add_qc_parser(subparsers):
+    parser = subparsers.add_parser(
+        "qc", help="summarize many .fastq files, reading and computing in parallel"
+    )
+    parser.add_argument("files", nargs="+", help="sequencing reads (.fastq[.gz])")
+    parser.add_argument(
+        "--processes", type=int, default=None, help="worker processes (all CPUs)"
+    )
+    parser.add_argument(
+        "--reader-threads", type=int, default=ingestion.DEFAULT_READER_THREADS
+    )
+    parser.set_defaults(func=_run_qc)
+
+
+def _run_serve(args: argparse.Namespace) -> int:
+    query_server = server.QueryServer(
+        args.reference,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        seed_length=args.seed_length,
+        max_mismatches=args.max_mismatches,
+    )
+    host, port = query_server.server_address[:2]
+    print(
+        f"loaded {args.reference} in {query_server.load_seconds:.2f}s, serving "
+        f"queries on http://{host}:{port}",
+        file=sys.stderr,
+    )
+    try:
+        query_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        query_server.server_close()
+    return 0
+
+
+def _add_serve_parser(subparsers):
+    parser = subparsers.add_parser(
+        "serve", help="serve pattern queries against a reference kept in memory"
+    )
+    parser.add_argument("reference", help="reference genome (.fa)")
+    parser.add_argument("--host", default=server.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="worker processes running the queries"
+    )
+    parser.add_argument(
+        "-k", "--seed-length", type=int, default=mapper.DEFAULT_SEED_LENGTH
+    )
+    parser.add_argument(
+        "-e",
+        "--max-mismatches",
+        type=int,
+        default=mapper.DEFAULT_MAX_MISMATCHES,
+        help="default maximum edit distance of approximate queries",
+    )
+    parser.set_defaults(func=_run_serve)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="genomics-algo",
+        description="Algorithms relevant for DNA sequencing",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+    _add_map_parser(subparsers)
+    _add_benchmark_parser(subparsers)
+    _add_simulate_parser(subparsers)
+    _add_cache_parser(subparsers)
+    _add_qc_parser(subparsers)
+    _add_serve_parser(subparsers)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
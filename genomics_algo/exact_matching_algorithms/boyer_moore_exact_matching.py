@@ -1,6 +1,15 @@
-from typing import Dict, List
+import time
 
-from genomics_algo.utilities.string_cmp import longest_common_suffix
+import numpy as np
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from genomics_algo.exact_matching_algorithms.match_statistics import MatchStatistics
+from genomics_algo.utilities.low_complexity import (
+    filter_masked_occurences,
+    get_masked_counts,
+)
+from genomics_algo.utilities.profiling import profiled
 
 
 def _get_alignments_skipped_bad_char_rule(
@@ -42,11 +51,12 @@ def _get_alignments_skipped_good_suffix_rule(matched_suffix: str, pattern: str)
     3
     """
     len_pattern = len(pattern)
+    len_matched_suffix = len(matched_suffix)
     for i in range(len_pattern - 1, 0, -1):
-        len_smaller_substr = min(i, len(matched_suffix))
-        if (
-            longest_common_suffix(pattern[:i], matched_suffix)
-            == matched_suffix[-len_smaller_substr::]
+        # does `pattern[:i]` end with the matched suffix (or its last i characters)?
+        len_smaller_substr = min(i, len_matched_suffix)
+        if pattern.endswith(
+            matched_suffix[len_matched_suffix - len_smaller_substr :], 0, i
         ):
             return len_pattern - i - 1
     return len_pattern - 1
@@ -85,35 +95,184 @@ def _get_alignments_skipped_bc_lookup(pattern: str) -> Dict[str, Dict[str, int]]
     return bc_lookup
 
 
+def _get_common_suffix_lengths(pattern: str) -> List[int]:
+    """Get the length of the longest common suffix of `pattern` and each of its
+    prefixes ``pattern[: j + 1]``, in linear time with the Z algorithm on the reversed
+    pattern
+    >>> _get_common_suffix_lengths("CTTACTTAC")
+    [1, 0, 0, 0, 5, 0, 0, 0, 9]
+    """
+    reversed_pattern = pattern[::-1]
+    len_pattern = len(pattern)
+    z = [0] * len_pattern
+    if len_pattern:
+        z[0] = len_pattern
+    left = right = 0
+    for k in range(1, len_pattern):
+        if k < right:
+            z[k] = min(right - k, z[k - left])
+        while (
+            k + z[k] < len_pattern
+            and reversed_pattern[z[k]] == reversed_pattern[k + z[k]]
+        ):
+            z[k] += 1
+        if k + z[k] > right:
+            left, right = k, k + z[k]
+    return z[::-1]
+
+
+@profiled
+def _get_skip_tables(pattern: str) -> Tuple[Dict[str, List[int]], List[int]]:
+    """Precompute the alignments that can be skipped by the bad character and good
+    suffix rules for a mismatch at each offset of the pattern, so that scanning does
+    not have to slice the pattern. Both tables are built in time linear in the length
+    of the pattern (times its number of distinct characters for the bad character
+    one), and hold the same skips as `_get_alignments_skipped_bc_lookup` and
+    `_get_alignments_skipped_gs_lookup`
+    >>> _get_skip_tables("GTAG")
+    ({'A': [0, 1, 2, 0], 'G': [0, 0, 1, 2], 'T': [0, 1, 0, 1]}, [2, 2, 2, 0])
+    """
+    len_pattern = len(pattern)
+
+    # bad character rule: distance to the last occurence of the character before
+    # the offset, or the offset itself if there is none
+    bc_skips = {}
+    for character in sorted(set(pattern)):
+        skips = []
+        last_occurence = -1
+        for offset in range(len_pattern):
+            skips.append(offset - 1 - last_occurence)
+            if pattern[offset] == character:
+                last_occurence = offset
+        bc_skips[character] = skips
+
+    # good suffix rule: the pattern is moved until a prefix `pattern[:i]` ends with
+    # the matched suffix, or with its last i characters for the prefixes shorter
+    # than it, i being as large as possible
+    common_suffix_lengths = _get_common_suffix_lengths(pattern)
+    # largest prefix end i ending with a suffix of each length
+    largest_ends = [0] * (len_pattern + 1)
+    for j in range(len_pattern - 1):
+        length = common_suffix_lengths[j]
+        largest_ends[length] = max(largest_ends[length], j + 1)
+    for length in range(len_pattern - 1, -1, -1):
+        largest_ends[length] = max(largest_ends[length], largest_ends[length + 1])
+    gs_skips = []
+    # largest prefix shorter than the matched suffix which is also a suffix
+    largest_border = 0
+    for offset in range(len_pattern - 1, -1, -1):
+        len_matched_suffix = len_pattern - 1 - offset
+        i = largest_ends[len_matched_suffix]
+        if i == 0:
+            i = largest_border
+        gs_skips.append(len_pattern - i - 1 if i else len_pattern - 1)
+        # the prefix of the matched suffix's length, for the next (longer) one
+        if (
+            0 < len_matched_suffix < len_pattern
+            and common_suffix_lengths[len_matched_suffix - 1] == len_matched_suffix
+        ):
+            largest_border = len_matched_suffix
+    return bc_skips, gs_skips[::-1]
+
+
+@profiled
 def get_occurences_with_boyer_moore_exact_matching(
-    pattern: str, text: str
+    pattern: str,
+    text: str,
+    statistics: Optional[MatchStatistics] = None,
+    mask: Optional[np.ndarray] = None,
 ) -> List[int]:
     """Get indices of all occurences of the string `pattern` in the
     string `text` using boyer-moore's exact matching
+
+    If a `MatchStatistics` object is passed as `statistics`, an instrumented version
+    of the algorithm records the work done in it; otherwise there is no overhead.
+    Occurences overlapping a base masked in `mask` are skipped
     """
-    occurences = []
+    if statistics is not None:
+        return filter_masked_occurences(
+            _get_occurences_with_boyer_moore_exact_matching_instrumented(
+                pattern, text, statistics
+            ),
+            len(pattern),
+            mask,
+        )
+    return list(iterate_occurences_with_boyer_moore_exact_matching(pattern, text, mask))
+
+
+def iterate_occurences_with_boyer_moore_exact_matching(
+    pattern: str, text: str, mask: Optional[np.ndarray] = None
+) -> Iterator[int]:
+    """Lazily yield the indices of the occurences of the string `pattern` in the
+    string `text` using boyer-moore's exact matching, scanning only as far as the
+    occurences are consumed (see `genomics_algo.utilities.occurences` for helpers)
+    >>> next(iterate_occurences_with_boyer_moore_exact_matching("ACT", "GACTACGGAGACT"))
+    1
+    """
+    masked_counts = get_masked_counts(mask).tolist() if mask is not None else None
     len_pattern = len(pattern)
     len_text = len(text)
     if len_pattern <= len_text:
+        bc_skips, gs_skips = _get_skip_tables(pattern)
         index = 0
         while index < (len_text - len_pattern + 1):
             match = True
             for offset in range(len_pattern - 1, -1, -1):
-                if pattern[offset] != text[index + offset]:
+                mismatched_char = text[index + offset]
+                if pattern[offset] != mismatched_char:
                     match = False
-                    alignments_to_skip_bc = _get_alignments_skipped_bad_char_rule(
-                        mismatched_char=text[index + offset],
-                        pattern_prefix=pattern[:offset],
+                    # a character not in the pattern lets the pattern move past it
+                    alignments_to_skip_bc = (
+                        bc_skips[mismatched_char][offset]
+                        if mismatched_char in bc_skips
+                        else offset
                     )
-                    alignments_to_skip_gs = _get_alignments_skipped_good_suffix_rule(
-                        matched_suffix=pattern[offset + 1 :], pattern=pattern
-                    )
-                    alignments_to_skip = max(
-                        alignments_to_skip_bc, alignments_to_skip_gs
+                    index += max(alignments_to_skip_bc, gs_skips[offset])
+                    break
+            if match and (
+                masked_counts is None
+                or masked_counts[index + len_pattern] == masked_counts[index]
+            ):
+                yield index
+            index += 1
+
+
+def _get_occurences_with_boyer_moore_exact_matching_instrumented(
+    pattern: str, text: str, statistics: MatchStatistics
+) -> List[int]:
+    """Same as `get_occurences_with_boyer_moore_exact_matching`, additionally counting
+    alignments, comparisons and skips in `statistics`"""
+    occurences = []
+    len_pattern = len(pattern)
+    len_text = len(text)
+    if len_pattern <= len_text:
+        preprocessing_start = time.perf_counter()
+        bc_skips, gs_skips = _get_skip_tables(pattern)
+        scanning_start = time.perf_counter()
+        statistics.preprocessing_seconds += scanning_start - preprocessing_start
+        index = 0
+        while index < (len_text - len_pattern + 1):
+            statistics.alignments += 1
+            match = True
+            for offset in range(len_pattern - 1, -1, -1):
+                statistics.character_comparisons += 1
+                mismatched_char = text[index + offset]
+                if pattern[offset] != mismatched_char:
+                    match = False
+                    alignments_to_skip_bc = (
+                        bc_skips[mismatched_char][offset]
+                        if mismatched_char in bc_skips
+                        else offset
                     )
-                    index += alignments_to_skip
+                    alignments_to_skip_gs = gs_skips[offset]
+                    if alignments_to_skip_bc >= alignments_to_skip_gs:
+                        statistics.bad_character_skips += alignments_to_skip_bc
+                    else:
+                        statistics.good_suffix_skips += alignments_to_skip_gs
+                    index += max(alignments_to_skip_bc, alignments_to_skip_gs)
                     break
             if match:
                 occurences.append(index)
             index += 1
+        statistics.scanning_seconds += time.perf_counter() - scanning_start
     return occurences
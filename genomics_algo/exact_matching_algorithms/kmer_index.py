@@ -0,0 +1,89 @@
+import numpy as np
+
+from typing import List, Optional, Tuple
+
+from genomics_algo.utilities.low_complexity import (
+    filter_masked_occurences,
+    get_masked_counts,
+)
+from genomics_algo.utilities.sequence_encoding import (
+    CODE_N,
+    encode_kmer,
+    encode_kmers,
+    encode_sequence,
+)
+
+
+class KmerIndex:
+    """Index of all positions of every k-mer in a `text`, stored as a sorted array of
+    2-bit packed k-mer codes and a parallel array of positions, so that looking up a
+    k-mer is a binary search. k-mers containing ``N`` or overlapping a base masked in
+    `mask` (e.g. from `find_low_complexity_mask`) are not indexed
+    >>> index = KmerIndex("GACTACGGAGACT", 3)
+    >>> index.get_positions("ACT").tolist()
+    [1, 10]
+    >>> index.get_occurences("GAC")
+    [0, 9]
+    >>> index.get_occurences("GA")
+    [0, 7, 9]
+    """
+
+    def __init__(self, text: str, k: int, mask: Optional[np.ndarray] = None):
+        assert 0 < k <= 32
+        self.text = text
+        self.k = k
+        self.mask = mask
+        kmers, valid = encode_kmers(encode_sequence(text), k)
+        if mask is not None:
+            masked_counts = get_masked_counts(mask)
+            valid &= masked_counts[k:] == masked_counts[: len(valid)]
+        positions = np.nonzero(valid)[0]
+        kmers = kmers[positions]
+        # stable sort keeps the positions of each k-mer in increasing order
+        order = np.argsort(kmers, kind="stable")
+        self.kmers = kmers[order]
+        self.positions = positions[order]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def get_positions(self, kmer: str) -> np.ndarray:
+        """Get the sorted positions of a k-mer of length `k` in the text"""
+        assert len(kmer) == self.k
+        if CODE_N in encode_sequence(kmer):
+            return self.positions[:0]
+        code = np.uint64(encode_kmer(kmer))
+        start = np.searchsorted(self.kmers, code, side="left")
+        end = np.searchsorted(self.kmers, code, side="right")
+        return self.positions[start:end]
+
+    def get_ranges(self, kmer_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the ranges of `positions` holding each of the packed `kmer_codes`, so
+        that the positions of the i-th k-mer are ``positions[starts[i]:ends[i]]``"""
+        kmer_codes = np.asarray(kmer_codes, dtype=np.uint64)
+        starts = np.searchsorted(self.kmers, kmer_codes, side="left")
+        ends = np.searchsorted(self.kmers, kmer_codes, side="right")
+        return starts, ends
+
+    def get_occurences(self, pattern: str) -> List[int]:
+        """Get indices of all occurences of the string `pattern` in the indexed text.
+        Patterns are looked up by their first k-mer and verified, patterns shorter than
+        `k` or starting with a k-mer that is not indexed fall back to scanning the text.
+        Occurences overlapping a masked base are skipped
+        """
+        if len(pattern) >= self.k and CODE_N not in encode_sequence(pattern[: self.k]):
+            return filter_masked_occurences(
+                [
+                    index
+                    for index in self.get_positions(pattern[: self.k]).tolist()
+                    if self.text.startswith(pattern, index)
+                ],
+                len(pattern),
+                self.mask,
+            )
+        occurences = []
+        index = self.text.find(pattern)
+        while index != -1 and len(pattern) > 0:
+            occurences.append(index)
+            index = self.text.find(pattern, index + 1)
+        return filter_masked_occurences(occurences, len(pattern), self.mask)
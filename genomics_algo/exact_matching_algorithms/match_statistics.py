@@ -0,0 +1,34 @@
+from typing import Dict
+
+
+class MatchStatistics:
+    """Counters collected by the exact matchers when passed a `statistics` object.
+    Counts accumulate over calls, so one object can summarise a whole workload
+
+    alignments: number of alignments of the pattern against the text that were tried
+    character_comparisons: number of pattern characters compared against the text
+    bad_character_skips: alignments skipped because of the bad character rule
+    good_suffix_skips: alignments skipped because of the good suffix rule (only when
+        it skips more alignments than the bad character rule)
+    preprocessing_seconds: time spent preprocessing the pattern
+    scanning_seconds: time spent scanning the text
+    """
+
+    def __init__(self):
+        self.alignments = 0
+        self.character_comparisons = 0
+        self.bad_character_skips = 0
+        self.good_suffix_skips = 0
+        self.preprocessing_seconds = 0.0
+        self.scanning_seconds = 0.0
+
+    @property
+    def alignments_skipped(self) -> int:
+        return self.bad_character_skips + self.good_suffix_skips
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(vars(self), alignments_skipped=self.alignments_skipped)
+
+    def __repr__(self) -> str:
+        counters = ", ".join(f"{key}={value}" for key, value in vars(self).items())
+        return f"MatchStatistics({counters})"
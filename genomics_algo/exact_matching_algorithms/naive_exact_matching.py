@@ -1,13 +1,51 @@
-from typing import List
+import time
 
+import numpy as np
+
+from typing import Iterator, List, Optional
+
+from genomics_algo.exact_matching_algorithms.match_statistics import MatchStatistics
+from genomics_algo.utilities.low_complexity import (
+    filter_masked_occurences,
+    get_masked_counts,
+)
 from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.profiling import profiled
 
 
-def get_occurences_with_naive_match(pattern: str, text: str) -> List[int]:
+@profiled
+def get_occurences_with_naive_match(
+    pattern: str,
+    text: str,
+    statistics: Optional[MatchStatistics] = None,
+    mask: Optional[np.ndarray] = None,
+) -> List[int]:
     """Get indices of all occurences of the string `pattern` in the
     string `text` using naive matching
+
+    If a `MatchStatistics` object is passed as `statistics`, an instrumented version
+    of the algorithm records the work done in it; otherwise there is no overhead.
+    Occurences overlapping a base masked in `mask` are skipped
     """
-    occurences = []
+    if statistics is not None:
+        return filter_masked_occurences(
+            _get_occurences_with_naive_match_instrumented(pattern, text, statistics),
+            len(pattern),
+            mask,
+        )
+    return list(iterate_occurences_with_naive_match(pattern, text, mask))
+
+
+def iterate_occurences_with_naive_match(
+    pattern: str, text: str, mask: Optional[np.ndarray] = None
+) -> Iterator[int]:
+    """Lazily yield the indices of the occurences of the string `pattern` in the
+    string `text` using naive matching, scanning only as far as the occurences are
+    consumed (see `genomics_algo.utilities.occurences` for helpers)
+    >>> next(iterate_occurences_with_naive_match("ACT", "GACTACGGAGACT"))
+    1
+    """
+    masked_counts = get_masked_counts(mask).tolist() if mask is not None else None
     len_pattern = len(pattern)
     len_text = len(text)
     if len_pattern <= len_text:
@@ -16,22 +54,53 @@ def get_occurences_with_naive_match(pattern: str, text: str) -> List[int]:
                 pattern[offset] == text[index + offset] for offset in range(len_pattern)
             )
 
+            if match and (
+                masked_counts is None
+                or masked_counts[index + len_pattern] == masked_counts[index]
+            ):
+                yield index
+
+
+def _get_occurences_with_naive_match_instrumented(
+    pattern: str, text: str, statistics: MatchStatistics
+) -> List[int]:
+    """Same as `get_occurences_with_naive_match`, additionally counting alignments
+    and comparisons in `statistics`"""
+    occurences = []
+    len_pattern = len(pattern)
+    len_text = len(text)
+    scanning_start = time.perf_counter()
+    if len_pattern <= len_text:
+        for index in range(len_text - len_pattern + 1):
+            statistics.alignments += 1
+            match = True
+            for offset in range(len_pattern):
+                statistics.character_comparisons += 1
+                if pattern[offset] != text[index + offset]:
+                    match = False
+                    break
+
             if match:
                 occurences.append(index)
 
+    statistics.scanning_seconds += time.perf_counter() - scanning_start
     return occurences
 
 
+@profiled
 def get_occurences_with_exact_match_with_reverse_complement(
-    pattern: str, text: str, exact_matching_algo: callable
+    pattern: str,
+    text: str,
+    exact_matching_algo: callable,
+    mask: Optional[np.ndarray] = None,
 ) -> List[int]:
     """Get indices of all occurences of the DNA strand string `pattern` in the
     string `text` using naive matching considering reverse complement of the
-    `pattern` string also
+    `pattern` string also. Occurences overlapping a base masked in `mask` are skipped
     """
     occurences = []
     occurences += exact_matching_algo(pattern, text)
     pattern_reverse_complement = reverse_complement(pattern)
     if pattern_reverse_complement != pattern:
         occurences += exact_matching_algo(pattern_reverse_complement, text)
-    return occurences
+    return filter_masked_occurences(occurences, len(pattern), mask)
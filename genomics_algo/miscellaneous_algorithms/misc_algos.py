@@ -1,20 +1,49 @@
-from itertools import product
+from itertools import combinations, product
 import numpy as np
 
-from typing import List, Set, Tuple
+from typing import Iterator, List, Set, Tuple
 
+from genomics_algo.utilities import kernels
+from genomics_algo.utilities.kmer_counting import (
+    DEFAULT_MEMORY_BYTES,
+    count_frequent_kmers,
+    count_kmer_chunks,
+    count_kmers,
+    get_chunk_size,
+    iterate_kmer_chunks,
+    kmer_dtype,
+)
 from genomics_algo.utilities.misc_utilities import (
     get_frequency_map,
     validate_bases_in_genome,
 )
+from genomics_algo.utilities.profiling import profiled
+from genomics_algo.utilities.sequence_encoding import (
+    CODE_N,
+    decode_kmer,
+    encode_canonical_kmers,
+    encode_kmers,
+    encode_sequence,
+    reverse_complement_kmers,
+)
 from genomics_algo.utilities.string_cmp import find_hamming_distance
 
 
+@profiled
 def find_most_freq_k_substring(
-    text: str, substring_length: int
+    text: str,
+    substring_length: int,
+    approximate: bool = False,
+    memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    canonical: bool = False,
 ) -> Tuple[List[str], int]:
     """
-    Find the most frequent substring of length in a given text
+    Find the most frequent substring of length in a given text.
+    With `approximate`, k-mers are counted within a memory budget of `memory_bytes`
+    (see `count_frequent_kmers`), the result stays exact but substrings with bases
+    other than ACGT are skipped. With `canonical`, a substring and its reverse
+    complement are counted together, and the lexicographically smaller of the two is
+    returned, in sorted order
     >>> find_most_freq_k_substring("GTACGTACC", 1)
     (['C'], 3)
     >>> find_most_freq_k_substring("GTACGTACC", 2)
@@ -23,24 +52,105 @@ def find_most_freq_k_substring(
     (['GTAC'], 2)
     >>> find_most_freq_k_substring("GTACGTACC", 6)
     (['GTACGT', 'TACGTA', 'ACGTAC', 'CGTACC'], 1)
+    >>> find_most_freq_k_substring("GTACGTACC", 2, approximate=True)
+    (['GT', 'TA', 'AC'], 2)
+    >>> find_most_freq_k_substring("GTACGTACC", 2, canonical=True)
+    (['AC'], 4)
     """
+    if approximate or canonical:
+        if approximate:
+            codes, counts = count_frequent_kmers(
+                lambda: iterate_kmer_chunks(
+                    [text], substring_length, get_chunk_size(memory_bytes), canonical
+                ),
+                None,
+                memory_bytes,
+            )
+        else:
+            codes, counts = count_kmers([text], substring_length, canonical=True)
+            codes = codes[counts == counts.max()] if len(counts) > 0 else codes
+            counts = counts[counts == counts.max()] if len(counts) > 0 else counts
+        frequent_substrings = [
+            decode_kmer(code, substring_length) for code in codes.tolist()
+        ]
+        if not canonical:
+            # same order as the exact mode, by first occurence
+            frequent_substrings.sort(key=text.find)
+        return frequent_substrings, int(counts[0]) if len(counts) > 0 else 0
+
     freq_map = get_frequency_map(text=text, substring_length=substring_length)
     frequency = max(freq_map.values())
     frequent_substrings = [key for key, value in freq_map.items() if value == frequency]
     return frequent_substrings, frequency
 
 
+@profiled
+def find_clump_kmers(
+    codes: np.ndarray,
+    substring_length: int,
+    window_length: int,
+    minimum_frequency: int,
+    canonical: bool = False,
+) -> np.ndarray:
+    """Find the packed k-mers of an encoded sequence forming clumps (see
+    `find_pattern_clumps`). Instead of counting every window, the start positions of
+    the k-mers are sorted by k-mer, and a k-mer forms a clump if, for some occurence,
+    its `minimum_frequency` - 1 th next occurence still ends within `window_length`
+    of it. k-mers containing ``N`` are skipped
+    >>> from genomics_algo.utilities.sequence_encoding import encode_sequence
+    >>> kmers = find_clump_kmers(encode_sequence("GACAGAC"), 3, 7, 2)
+    >>> [decode_kmer(kmer, 3) for kmer in kmers]
+    ['GAC']
+    """
+    assert minimum_frequency > 0
+    if len(codes) < window_length or window_length < substring_length:
+        return np.array([], dtype=kmer_dtype(substring_length))
+    if canonical:
+        kmers, valid = encode_canonical_kmers(codes, substring_length)
+    else:
+        kmers, valid = encode_kmers(codes, substring_length)
+    positions = np.nonzero(valid)[0]
+    kmers = kmers[positions].astype(kmer_dtype(substring_length))
+    # stable sort by k-mer keeps the positions of each k-mer in increasing order
+    order = np.argsort(kmers, kind="stable")
+    kmers, positions = kmers[order], positions[order]
+    lag = minimum_frequency - 1
+    if lag >= len(kmers):
+        return kmers[:0]
+    is_clump = (kmers[lag:] == kmers[: len(kmers) - lag]) & (
+        positions[lag:] - positions[: len(positions) - lag]
+        <= window_length - substring_length
+    )
+    return np.unique(kmers[lag:][is_clump])
+
+
+@profiled
 def find_pattern_clumps(
-    text: str, substring_length: int, window_length: int, minimum_frequency: int
+    text: str,
+    substring_length: int,
+    window_length: int,
+    minimum_frequency: int,
+    canonical: bool = False,
 ) -> Set[str]:
     """Find patterns forming clumps in a `text`, i.e., returns all the substrings of
     length `substring_length` in `text` which occurred at least `minimum_frequency` times
     in a window of fixed length `window_length` along the `text`, essentially looking for
-    a region where a k-mer appears several times in short succession
+    a region where a k-mer appears several times in short succession. Texts made of
+    uppercase ACGT only are searched with `find_clump_kmers`, other texts keep their
+    case. With `canonical`, a substring and its reverse complement are counted together,
+    and the lexicographically smaller of the two is returned in uppercase
 
     Returns:
         Set[str]: set of strings
     """
+    codes = encode_sequence(text)
+    # bases other than ACGT are encoded as N, and lowercase bases as uppercase ones
+    is_acgt = text.isupper() and not np.any(codes == CODE_N)
+    if (canonical or is_acgt) and substring_length <= 32:
+        kmers = find_clump_kmers(
+            codes, substring_length, window_length, minimum_frequency, canonical
+        )
+        return {decode_kmer(kmer, substring_length) for kmer in kmers.tolist()}
     patterns = set()
     for index in range(len(text) - window_length + 1):
         window = text[index : index + window_length]
@@ -51,28 +161,88 @@ def find_pattern_clumps(
     return patterns
 
 
+@profiled
+def compute_gc_skew(genome: str) -> np.ndarray:
+    """Compute the GC skew of every prefix of `genome`, i.e. the number of ``G`` minus
+    the number of ``C`` among its first ``i`` bases, for ``i`` from 0 to ``len(genome)``
+    >>> compute_gc_skew("CATGGGCATCGG").tolist()
+    [0, -1, -1, -1, 0, 1, 2, 1, 1, 1, 0, 1, 2]
+    """
+    codes = encode_sequence(genome)
+    steps = (codes == 2).astype(np.int64) - (codes == 1)
+    return np.concatenate(([0], np.cumsum(steps)))
+
+
+@profiled
 def find_minimum_gc_skew_location(genome: str) -> int:
-    """TODO: [summary]
+    """Find the locations where the GC skew of `genome` (see `compute_gc_skew`) is
+    minimal, the replication origin of bacterial genomes being typically close to it
 
     Returns:
-        [type]: [description]
+        np.ndarray: indices of the last base of the prefixes with minimal skew
     """
     assert set(genome) - {"A", "C", "G", "T"} == set()
-    gc_skew = np.zeros(len(genome) + 1)
-    for index in range(len(genome)):
-        gc_skew[index + 1] = gc_skew[index]
-        gc_skew[index + 1] += genome[index] == "G"
-        gc_skew[index + 1] -= genome[index] == "C"
+    if kernels.BACKEND == "numba":
+        return kernels.find_minimum_skew_prefixes(encode_sequence(genome)) - 1
+    gc_skew = compute_gc_skew(genome)
     return np.where(gc_skew == gc_skew.min())[0] - 1
 
 
-def find_frequent_kmers_with_mismatches(genome: str, k: int, d: int) -> Set[str]:
+def _get_mismatch_masks(k: int, d: int) -> np.ndarray:
+    """Get the masks which, XOR-ed with a 2-bit packed k-mer, give every k-mer within
+    Hamming distance `d` of it, including itself
+    >>> _get_mismatch_masks(2, 1).tolist()
+    [0, 4, 8, 12, 1, 2, 3]
+    """
+    masks = [0]
+    for number_of_mismatches in range(1, d + 1):
+        for positions in combinations(range(k), number_of_mismatches):
+            # XOR-ing a base code with 1, 2 or 3 gives each of the other bases
+            for substitutions in product((1, 2, 3), repeat=number_of_mismatches):
+                masks.append(
+                    sum(
+                        substitution << (2 * (k - 1 - position))
+                        for position, substitution in zip(positions, substitutions)
+                    )
+                )
+    return np.array(masks, dtype=kmer_dtype(k))
+
+
+def _iterate_mismatch_neighbour_chunks(
+    genome: str, k: int, d: int, memory_bytes: int, canonical: bool = False
+) -> Iterator[np.ndarray]:
+    """Yield the packed k-mers within Hamming distance `d` of every k-mer of `genome`,
+    so that the number of times a k-mer is yielded is its number of occurences with at
+    most `d` mismatches. With `canonical`, the smaller of each yielded k-mer and its
+    reverse complement is yielded, counting occurences on both strands"""
+    masks = _get_mismatch_masks(k, d)
+    chunk_size = max(get_chunk_size(memory_bytes) // len(masks), 1)
+    for kmers in iterate_kmer_chunks([genome], k, chunk_size):
+        neighbours = (kmers[:, None] ^ masks[None, :]).ravel()
+        if canonical:
+            neighbours = np.minimum(neighbours, reverse_complement_kmers(neighbours, k))
+        yield neighbours
+
+
+@profiled
+def find_frequent_kmers_with_mismatches(
+    genome: str,
+    k: int,
+    d: int,
+    approximate: bool = False,
+    memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    canonical: bool = False,
+) -> Set[str]:
     """Determine most frequent k-mers with at most `d` mismatches.
     A most frequent k-mer with up to `d` mismatches in `genome` is simply a string pattern maximising
     the total number of occurrences of said pattern in `genome` with at most `d` mismatches.
     Note that the pattern does not need to actually appear as a substring of `genome`.
     >>> find_frequent_kmers_with_mismatches('ACGTTGCATGTCGCATGATGCATGAGAGCT', 4, 1)-{'ATGC', 'GATG', 'ATGT'}
     set()
+    >>> sorted(find_frequent_kmers_with_mismatches('ACGTTGCATGTCGCATGATGCATGAGAGCT', 4, 1, approximate=True))
+    ['ATGC', 'ATGT', 'GATG']
+    >>> find_frequent_kmers_with_mismatches('ACGTTGCATGTCGCATGATGCATGAGAGCT', 4, 1, canonical=True)
+    {'ACAT'}
 
     Parameters
     ----------
@@ -82,6 +252,17 @@ def find_frequent_kmers_with_mismatches(genome: str, k: int, d: int) -> Set[str]
         Length of kmers to find.
     d: int
         Number of allowed mismatches in kmers.
+    approximate: bool
+        Count the k-mers within `d` mismatches of each position within a memory
+        budget of `memory_bytes` (see `count_frequent_kmers`) instead of comparing
+        every position to all possible k-mers; the result is the same.
+    memory_bytes: int
+        Memory budget of the approximate mode.
+    canonical: bool
+        Count the occurrences of a pattern and of its reverse complement together,
+        returning the lexicographically smaller of the two. The k-mers within `d`
+        mismatches of each position are counted as in the approximate mode, but
+        exactly if `approximate` is False.
 
     Returns
     -------
@@ -97,6 +278,16 @@ def find_frequent_kmers_with_mismatches(genome: str, k: int, d: int) -> Set[str]
         raise ValueError(
             f"The input values for genome, k and d don't make sense. It must hold: len(genome)>=k, k>=d, d>=0. Received: len(genome)={n}, k={k}, d={d}."
         )
+    if approximate or canonical:
+        get_chunks = lambda: _iterate_mismatch_neighbour_chunks(
+            genome, k, d, memory_bytes, canonical
+        )
+        if approximate:
+            codes, _ = count_frequent_kmers(get_chunks, None, memory_bytes)
+        else:
+            codes, counts = count_kmer_chunks(get_chunks())
+            codes = codes[counts == counts.max()]
+        return {decode_kmer(code, k) for code in codes.tolist()}
     if k > 12 or d > 3:
         raise Warning(
             f"The large input values k={k} and/or d={d} might cause long run times."
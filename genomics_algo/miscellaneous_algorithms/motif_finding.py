@@ -0,0 +1,275 @@
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from genomics_algo.utilities.kmer_counting import kmer_dtype
+from genomics_algo.utilities.misc_utilities import validate_bases_in_genome
+from genomics_algo.utilities.sequence_encoding import (
+    decode_kmer,
+    decode_sequence,
+    encode_kmer,
+    encode_kmers,
+    encode_sequence,
+)
+
+MOTIF_SEARCH_METHODS = ("randomized", "gibbs")
+DEFAULT_NUMBER_OF_RESTARTS = 20
+DEFAULT_NUMBER_OF_ITERATIONS = 1000
+# upper bound of the number of k-mers compared at once by `find_median_strings`
+_MAX_COMPARISONS = 2**21
+# the low bit of every 2-bit base of a packed k-mer, and the number of set bits of
+# every 16 bit integer
+_LOW_BITS = 0x5555555555555555
+_BIT_COUNTS = np.array([bin(value).count("1") for value in range(2**16)], np.uint8)
+
+
+def _get_windows(sequences: List[str], k: int) -> np.ndarray:
+    """Helper function encoding sequences of equal length into a
+    ``(number of sequences, number of k-mers, k)`` array of base codes, holding every
+    k-mer of every sequence"""
+    assert len(sequences) > 0
+    assert len({len(sequence) for sequence in sequences}) == 1
+    assert 0 < k <= len(sequences[0])
+    for sequence in sequences:
+        validate_bases_in_genome(sequence)
+    codes = np.stack([encode_sequence(sequence) for sequence in sequences])
+    return np.lib.stride_tricks.sliding_window_view(codes, k, axis=1)
+
+
+def create_profile(motifs: np.ndarray, pseudocounts: bool = True) -> np.ndarray:
+    """Create the profile of encoded motifs, a ``(4, k)`` matrix holding the frequency
+    of each base at each position of the motifs. With `pseudocounts` (Laplace's rule of
+    succession) every base is counted once more, so no probability is zero
+    >>> create_profile(encode_sequence("AC"), pseudocounts=False)
+    array([[1., 0.],
+           [0., 1.],
+           [0., 0.],
+           [0., 0.]])
+    """
+    motifs = np.atleast_2d(motifs)
+    counts = (motifs[None, :, :] == np.arange(4)[:, None, None]).sum(axis=1)
+    counts = counts + pseudocounts
+    return counts / counts.sum(axis=0)
+
+
+def score_motifs(motifs: np.ndarray) -> int:
+    """Score encoded motifs as the number of bases differing from the most frequent
+    base of their position
+    >>> score_motifs(np.stack([encode_sequence("ACG"), encode_sequence("ACT")]))
+    1
+    """
+    motifs = np.atleast_2d(motifs)
+    counts = (motifs[None, :, :] == np.arange(4)[:, None, None]).sum(axis=1)
+    return int(motifs.size - counts.max(axis=0).sum())
+
+
+def _get_log_probabilities(windows: np.ndarray, profile: np.ndarray) -> np.ndarray:
+    """Log-probability of every k-mer window (along the last axis) given a profile"""
+    with np.errstate(divide="ignore"):
+        log_profile = np.log(profile)
+    return log_profile[windows, np.arange(windows.shape[-1])].sum(axis=-1)
+
+
+def find_profile_most_probable_kmer(text: str, k: int, profile: np.ndarray) -> str:
+    """Find the k-mer of `text` with the highest probability given a ``(4, k)``
+    profile matrix, the first one in case of ties
+    >>> profile = create_profile(encode_sequence("GAT"), pseudocounts=False)
+    >>> find_profile_most_probable_kmer("CCGATTA", 3, profile)
+    'GAT'
+    """
+    windows = _get_windows([text], k)[0]
+    return decode_sequence(windows[np.argmax(_get_log_probabilities(windows, profile))])
+
+
+def _count_mismatches(first: np.ndarray, second: np.ndarray, k: int) -> np.ndarray:
+    """Count the bases differing between 2-bit packed k-mers (broadcast against each
+    other): a base differs if either of its bits differs, and the differing bases are
+    counted 16 bits at a time with a lookup table
+    >>> first = np.array([encode_kmer("ACGT"), encode_kmer("TTTT")], dtype=np.uint64)
+    >>> _count_mismatches(first, np.uint64(encode_kmer("AGGA")), 4).tolist()
+    [2, 4]
+    """
+    different = np.bitwise_xor(first, second)
+    unsigned = different.dtype.type
+    different = (different | (different >> unsigned(1))) & unsigned(
+        _LOW_BITS & np.iinfo(different.dtype).max
+    )
+    mismatches = _BIT_COUNTS[different & unsigned(0xFFFF)]
+    for shift in range(16, 2 * k, 16):
+        mismatches = (
+            mismatches + _BIT_COUNTS[(different >> unsigned(shift)) & unsigned(0xFFFF)]
+        )
+    return mismatches
+
+
+def find_median_strings(sequences: List[str], k: int) -> Tuple[List[str], int]:
+    """Find the k-mers minimizing the sum over all sequences of their minimum Hamming
+    distance to a k-mer of the sequence. All ``4 ** k`` patterns are compared to all
+    packed k-mers of the sequences at once, in chunks of patterns bounding the memory
+
+    Returns:
+        Tuple[List[str], int]: the median strings in lexicographic order and their
+            total distance
+    >>> find_median_strings(["AAATTGACGCAT", "GACGACCACGTT", "CGTCAGCGCCTG", "GCTGAGCACCGG", "AGTACGGGACAG"], 3)
+    (['ACG', 'GAC'], 2)
+    """
+    _get_windows(sequences, k)
+    kmers = np.stack(
+        [encode_kmers(encode_sequence(sequence), k)[0] for sequence in sequences]
+    )
+    chunk_size = max(_MAX_COMPARISONS // kmers.size, 1)
+    all_patterns = np.arange(4**k, dtype=np.uint64)
+    distances = np.concatenate(
+        [
+            _count_mismatches(patterns[:, None, None], kmers[None, :, :], k)
+            .min(axis=2)
+            .sum(axis=1, dtype=np.int64)
+            for patterns in np.split(
+                all_patterns, range(chunk_size, len(all_patterns), chunk_size)
+            )
+        ]
+    )
+    best_distance = distances.min()
+    return (
+        [
+            decode_kmer(pattern, k)
+            for pattern in np.nonzero(distances == best_distance)[0]
+        ],
+        int(best_distance),
+    )
+
+
+def find_motifs_greedy(
+    sequences: List[str], k: int, pseudocounts: bool = True
+) -> Tuple[List[str], int]:
+    """Greedy motif search: every k-mer of the first sequence starts a motif set which
+    is extended by the profile-most probable k-mer of each following sequence, given
+    the profile of the motifs chosen so far. All starting k-mers are extended at once,
+    so the work per sequence is a handful of array operations
+
+    Returns:
+        Tuple[List[str], int]: the best motifs (the first found on ties) and their score
+    >>> find_motifs_greedy(["GGCGTTCAGGCA", "AAGAATCAGTCA", "CAAGGAGTTCGC", "CACGTCAATCAC", "CAATAATATTCG"], 3, pseudocounts=False)
+    (['CAG', 'CAG', 'CAA', 'CAA', 'CAA'], 2)
+    >>> find_motifs_greedy(["GGCGTTCAGGCA", "AAGAATCAGTCA", "CAAGGAGTTCGC", "CACGTCAATCAC", "CAATAATATTCG"], 3)
+    (['TTC', 'ATC', 'TTC', 'ATC', 'TTC'], 2)
+    """
+    windows = _get_windows(sequences, k)
+    number_of_windows = windows.shape[1]
+    starts = np.arange(number_of_windows)
+    positions = np.arange(k)
+    # motifs[c, i] is the motif chosen in sequence i when starting with the c-th k-mer
+    # and counts[c] holds the base counts of the motifs chosen so far for it
+    motifs = np.empty((number_of_windows, len(sequences), k), dtype=np.uint8)
+    motifs[:, 0] = windows[0]
+    counts = np.zeros((number_of_windows, 4, k), dtype=np.int64)
+    counts[starts[:, None], windows[0], positions] += 1
+    for index in range(1, len(sequences)):
+        with np.errstate(divide="ignore"):
+            log_profiles = np.log((counts + pseudocounts) / (index + 4 * pseudocounts))
+        # log_profiles[c, windows[w, j], j] summed over j for every start c, window w
+        log_probabilities = log_profiles[:, windows[index], positions].sum(axis=2)
+        motifs[:, index] = windows[index][np.argmax(log_probabilities, axis=1)]
+        counts[starts[:, None], motifs[:, index], positions] += 1
+    scores = [score_motifs(candidate) for candidate in motifs]
+    best = int(np.argmin(scores))
+    return [decode_sequence(motif) for motif in motifs[best]], scores[best]
+
+
+def _search_motifs_randomized(
+    windows: np.ndarray, rng: np.random.Generator
+) -> Tuple[np.ndarray, int]:
+    """One run of randomized motif search: starting from random motifs, replace all
+    motifs by the profile-most probable k-mers of the current motifs' profile until
+    the score stops improving"""
+    sequence_indices = np.arange(windows.shape[0])
+    starts = rng.integers(0, windows.shape[1], windows.shape[0])
+    best_motifs = windows[sequence_indices, starts]
+    best_score = score_motifs(best_motifs)
+    while True:
+        profile = create_profile(best_motifs)
+        starts = np.argmax(_get_log_probabilities(windows, profile), axis=1)
+        motifs = windows[sequence_indices, starts]
+        score = score_motifs(motifs)
+        if score >= best_score:
+            return best_motifs, best_score
+        best_motifs, best_score = motifs, score
+
+
+def _search_motifs_gibbs(
+    windows: np.ndarray, rng: np.random.Generator, number_of_iterations: int
+) -> Tuple[np.ndarray, int]:
+    """One run of Gibbs sampling: repeatedly drop the motif of a random sequence and
+    draw a new one with probability proportional to its probability given the profile
+    (with pseudocounts) of the other motifs. The base counts of the motifs are updated
+    in place, so an iteration only touches the windows of one sequence"""
+    number_of_sequences, number_of_windows, k = windows.shape
+    positions = np.arange(k)
+    starts = rng.integers(0, number_of_windows, number_of_sequences)
+    motifs = windows[np.arange(number_of_sequences), starts]
+    counts = (motifs[None, :, :] == np.arange(4)[:, None, None]).sum(axis=1)
+    best_motifs, best_score = motifs.copy(), score_motifs(motifs)
+    for _ in range(number_of_iterations):
+        index = rng.integers(number_of_sequences)
+        counts[motifs[index], positions] -= 1
+        log_profile = np.log((counts + 1) / (number_of_sequences + 3))
+        log_probabilities = log_profile[windows[index], positions].sum(axis=1)
+        cumulative = np.cumsum(np.exp(log_probabilities - log_probabilities.max()))
+        start = np.searchsorted(cumulative, rng.random() * cumulative[-1], "right")
+        motifs[index] = windows[index, min(start, number_of_windows - 1)]
+        counts[motifs[index], positions] += 1
+        score = motifs.size - int(counts.max(axis=0).sum())
+        if score < best_score:
+            best_motifs, best_score = motifs.copy(), score
+    return best_motifs, best_score
+
+
+def _run_motif_search(
+    arguments: Tuple[str, np.ndarray, int, np.random.SeedSequence],
+) -> Tuple[np.ndarray, int]:
+    method, windows, number_of_iterations, seed_sequence = arguments
+    rng = np.random.default_rng(seed_sequence)
+    if method == "gibbs":
+        return _search_motifs_gibbs(windows, rng, number_of_iterations)
+    return _search_motifs_randomized(windows, rng)
+
+
+def find_motifs_sampling(
+    sequences: List[str],
+    k: int,
+    method: str = "randomized",
+    number_of_restarts: int = DEFAULT_NUMBER_OF_RESTARTS,
+    number_of_iterations: int = DEFAULT_NUMBER_OF_ITERATIONS,
+    seed: Optional[int] = None,
+    processes: Optional[int] = 1,
+) -> Tuple[List[str], int]:
+    """Find motifs with randomized motif search or Gibbs sampling (see
+    `MOTIF_SEARCH_METHODS`), keeping the best of `number_of_restarts` independent runs.
+    Runs get their own random streams spawned from `seed`, so the result does not
+    depend on how they are spread over the pool of `processes` worker processes (all
+    CPUs if None, no pool if 1). Gibbs sampling runs `number_of_iterations` iterations
+
+    Returns:
+        Tuple[List[str], int]: the best motifs and their score
+    >>> motifs, score = find_motifs_sampling(["GGCGTTCAGGCA", "AAGAATCAGTCA", "CAAGGAGTTCGC"], 3, seed=0)
+    >>> len(motifs), score <= 3
+    (3, True)
+    """
+    if method not in MOTIF_SEARCH_METHODS:
+        raise ValueError(
+            f"Unknown method {method}, expected one of {MOTIF_SEARCH_METHODS}"
+        )
+    assert number_of_restarts > 0
+    windows = _get_windows(sequences, k)
+    arguments = [
+        (method, windows, number_of_iterations, seed_sequence)
+        for seed_sequence in np.random.SeedSequence(seed).spawn(number_of_restarts)
+    ]
+    if processes == 1:
+        results = [_run_motif_search(argument) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            results = list(executor.map(_run_motif_search, arguments))
+    best_motifs, best_score = min(results, key=lambda result: result[1])
+    return [decode_sequence(motif) for motif in best_motifs], best_score
@@ -0,0 +1,173 @@
+import numpy as np
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from genomics_algo.utilities.translation import (
+    REVERSE_COMPLEMENT_CODONS,
+    START_CODONS,
+    STOP_CODONS,
+    encode_codons,
+    get_codon_codes,
+    translate_codons,
+)
+
+DEFAULT_MIN_PROTEIN_LENGTH = 100
+
+_START_CODES = get_codon_codes(START_CODONS)
+_STOP_CODES = get_codon_codes(STOP_CODONS)
+# the start and stop codons of the reverse strand, as read on the forward strand
+_REVERSE_START_CODES = REVERSE_COMPLEMENT_CODONS[_START_CODES]
+_REVERSE_STOP_CODES = REVERSE_COMPLEMENT_CODONS[_STOP_CODES]
+
+
+class OpenReadingFrame(NamedTuple):
+    """An open reading frame, from a start codon to a stop codon included. `start` and
+    `end` (excluded) are forward strand positions whatever the `strand`, ``"-"`` ORFs
+    being read from `end` back to `start`. The `protein` leaves out the stop codon"""
+
+    start: int
+    end: int
+    strand: str
+    protein: str
+
+
+def _find_forward_orfs(
+    codons: np.ndarray, last_stop: int, min_protein_length: int
+) -> Tuple[List[Tuple[int, int]], int]:
+    """Find the ORFs ending at the stop codons after the `last_stop`-th codon of a
+    frame, each starting at the first start codon after the previous stop codon, and
+    the index of the new last stop codon"""
+    stops = np.flatnonzero(np.isin(codons, _STOP_CODES))
+    stops = stops[stops > last_stop]
+    # a start past the end of the frame stands for a missing start
+    starts = np.append(np.flatnonzero(np.isin(codons, _START_CODES)), len(codons))
+    previous_stops = np.concatenate(([last_stop], stops[:-1]))
+    orf_starts = starts[np.searchsorted(starts, previous_stops, side="right")]
+    found = stops - orf_starts >= max(min_protein_length, 0)
+    orfs = list(zip(orf_starts[found].tolist(), stops[found].tolist()))
+    return orfs, int(stops[-1]) if len(stops) else last_stop
+
+
+def _find_reverse_orfs(
+    codons: np.ndarray,
+    last_stop: Optional[int],
+    min_protein_length: int,
+    final: bool,
+) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """Find the reverse strand ORFs between consecutive reverse stop codons of a frame
+    after its `last_stop`-th codon, each starting (on the reverse strand) at the last
+    reverse start codon before the next stop codon. The last stop codon is followed
+    by the end of the genome if `final`. The index of the new last stop codon is
+    returned along with the ORFs"""
+    stops = np.flatnonzero(np.isin(codons, _REVERSE_STOP_CODES))
+    if last_stop is not None:
+        stops = np.concatenate(([last_stop], stops[stops > last_stop]))
+    new_last_stop = int(stops[-1]) if len(stops) else None
+    if final and len(stops):
+        stops = np.append(stops, len(codons))
+    # a start before the frame stands for a missing start
+    starts = np.concatenate(
+        ([-1], np.flatnonzero(np.isin(codons, _REVERSE_START_CODES)))
+    )
+    orf_starts = starts[np.searchsorted(starts, stops[1:]) - 1]
+    found = orf_starts - stops[:-1] >= max(min_protein_length, 1)
+    orfs = list(zip(stops[:-1][found].tolist(), orf_starts[found].tolist()))
+    return orfs, new_last_stop
+
+
+def iterate_orfs(
+    chunks: Iterable[str], min_protein_length: int = DEFAULT_MIN_PROTEIN_LENGTH
+) -> Iterator[OpenReadingFrame]:
+    """Find the open reading frames on both strands of a genome given in consecutive
+    chunks (e.g. by `iterate_genome_chunks`), with proteins of at least
+    `min_protein_length` amino acids. Start and stop codons are located with array
+    operations over the codons of each chunk, and only the bases from the last stop
+    codon of every frame are carried over to the next chunk. The frame of a codon is
+    its forward strand position modulo 3 on both strands, so that it does not depend
+    on the length of the genome. On the forward strand an ORF may start before any
+    stop codon, and likewise on the reverse strand an ORF may end at the end of the
+    genome. ORFs are yielded chunk by chunk, sorted within a chunk only
+    >>> list(iterate_orfs(["CCATGAAATT", "TTAGGTTACATCCATTAA"], 2))
+    [OpenReadingFrame(start=2, end=14, strand='+', protein='MKF'), \
+OpenReadingFrame(start=10, end=25, strand='-', protein='MDVT')]
+    """
+    # per frame, the position of the last stop codon whose ORF was already reported,
+    # that of a stop codon just before the genome on the forward strand
+    last_forward_stops: Dict[int, int] = {frame: frame - 3 for frame in range(3)}
+    last_reverse_stops: Dict[int, Optional[int]] = {frame: None for frame in range(3)}
+    buffer = ""
+    offset = 0
+    chunks = iter(chunks)
+    chunk = next(chunks, None)
+    while chunk is not None:
+        buffer += chunk
+        chunk = next(chunks, None)
+        final = chunk is None
+        codons = encode_codons(buffer)
+        orfs = []
+        for frame in range(3):
+            first = (frame - offset) % 3
+            frame_codons = codons[first::3]
+            # forward strand position of the first codon of the frame
+            first_position = offset + first
+            forward_orfs, last_stop = _find_forward_orfs(
+                frame_codons,
+                (last_forward_stops[frame] - first_position) // 3,
+                min_protein_length,
+            )
+            for start, stop in forward_orfs:
+                protein = translate_codons(frame_codons[start:stop])
+                orfs.append(
+                    OpenReadingFrame(
+                        first_position + 3 * start,
+                        first_position + 3 * stop + 3,
+                        "+",
+                        protein,
+                    )
+                )
+            last_forward_stops[frame] = first_position + 3 * last_stop
+
+            last_stop = last_reverse_stops[frame]
+            reverse_orfs, last_stop = _find_reverse_orfs(
+                frame_codons,
+                None if last_stop is None else (last_stop - first_position) // 3,
+                min_protein_length,
+                final,
+            )
+            for stop, start in reverse_orfs:
+                protein = translate_codons(
+                    REVERSE_COMPLEMENT_CODONS[frame_codons[stop + 1 : start + 1][::-1]]
+                )
+                orfs.append(
+                    OpenReadingFrame(
+                        first_position + 3 * stop,
+                        first_position + 3 * start + 3,
+                        "-",
+                        protein,
+                    )
+                )
+            if last_stop is not None:
+                last_reverse_stops[frame] = first_position + 3 * last_stop
+        yield from sorted(orfs)
+
+        # keep the bases from the last stop codons on, and those of the codons not
+        # yet complete
+        carry = min(
+            [max(stop, 0) for stop in last_forward_stops.values()]
+            + [stop for stop in last_reverse_stops.values() if stop is not None]
+            + [offset + max(len(buffer) - 2, 0)]
+        )
+        buffer = buffer[carry - offset :]
+        offset = carry
+
+
+def find_orfs(
+    genome: str, min_protein_length: int = DEFAULT_MIN_PROTEIN_LENGTH
+) -> List[OpenReadingFrame]:
+    """Find the open reading frames on both strands of a genome (see `iterate_orfs`),
+    sorted by position
+    >>> find_orfs("ATGCCCTAGCTACATTT", 1)
+    [OpenReadingFrame(start=0, end=9, strand='+', protein='MP'), \
+OpenReadingFrame(start=9, end=15, strand='-', protein='M')]
+    """
+    return sorted(iterate_orfs([genome], min_protein_length))
@@ -0,0 +1,114 @@
+import numpy as np
+import time
+
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from genomics_algo.miscellaneous_algorithms.misc_algos import (
+    compute_gc_skew,
+    find_clump_kmers,
+    find_frequent_kmers_with_mismatches,
+)
+from genomics_algo.utilities.sequence_encoding import decode_kmer, encode_sequence
+
+DEFAULT_ORI_WINDOW_LENGTH = 1000
+DEFAULT_DNAA_BOX_LENGTH = 9
+
+
+class OriCandidate(NamedTuple):
+    """A window around one or more neighbouring GC skew minima"""
+
+    start: int
+    end: int
+    skew_minima: List[int]
+    clumps: Set[str]
+    dnaa_boxes: Set[str]
+
+
+class OriFinderResult(NamedTuple):
+    skew_minima: List[int]
+    candidates: List[OriCandidate]
+    timings: Dict[str, float]
+
+
+def get_ori_windows(
+    skew_minima: List[int], genome_length: int, window_length: int
+) -> List[Tuple[int, int, List[int]]]:
+    """Get the windows of `window_length` bases centered on the skew minima, clipped to
+    the genome, overlapping windows being merged into one
+    >>> get_ori_windows([10, 12, 500], 600, 100)
+    [(0, 62, [10, 12]), (450, 550, [500])]
+    """
+    windows = []
+    for minimum in sorted(skew_minima):
+        start = max(minimum - window_length // 2, 0)
+        end = min(minimum + window_length - window_length // 2, genome_length)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], end, windows[-1][2] + [minimum])
+        else:
+            windows.append((start, end, [minimum]))
+    return windows
+
+
+def find_ori(
+    genome: str,
+    window_length: int = DEFAULT_ORI_WINDOW_LENGTH,
+    dnaa_box_length: int = DEFAULT_DNAA_BOX_LENGTH,
+    max_mismatches: int = 1,
+    clump_window_length: int = 500,
+    minimum_frequency: int = 3,
+) -> OriFinderResult:
+    """Look for the replication origin (ori) of a bacterial genome: the GC skew is
+    computed once over the whole genome, and the clumps and the candidate DnaA boxes
+    (the most frequent k-mers with up to `max_mismatches` mismatches) are searched only
+    within windows of `window_length` bases around its minima. Both searches count a
+    k-mer and its reverse complement together, since DnaA boxes occur on both strands,
+    and report the lexicographically smaller of the two.
+    >>> result = find_ori("GGGGTTATCCACAAATGTGGATAAAACCCC", 40, 9, 0, 20, 2)
+    >>> result.skew_minima
+    [0, 30]
+    >>> candidate = result.candidates[0]
+    >>> candidate.start, candidate.end, candidate.clumps, candidate.dnaa_boxes
+    (0, 30, {'TGTGGATAA'}, {'TGTGGATAA'})
+
+    Args:
+        genome (str): genome to search, made of ACGT only
+        window_length (int): length of the windows around the skew minima
+        dnaa_box_length (int): length of the DnaA boxes
+        max_mismatches (int): number of mismatches allowed in the DnaA boxes
+        clump_window_length (int): length of the windows of the clump search
+        minimum_frequency (int): number of occurences of a clump k-mer
+
+    Returns:
+        OriFinderResult: the skew minima (length of the genome prefixes with minimal
+            skew), a candidate per window and the time spent in the ``skew``,
+            ``clumps`` and ``dnaa_boxes`` stages in seconds
+    """
+    timings = {"skew": 0.0, "clumps": 0.0, "dnaa_boxes": 0.0}
+    start_time = time.perf_counter()
+    codes = encode_sequence(genome)
+    skew = compute_gc_skew(genome)
+    skew_minima = np.nonzero(skew == skew.min())[0].tolist()
+    timings["skew"] += time.perf_counter() - start_time
+
+    candidates = []
+    for start, end, minima in get_ori_windows(skew_minima, len(genome), window_length):
+        start_time = time.perf_counter()
+        clump_kmers = find_clump_kmers(
+            codes[start:end],
+            dnaa_box_length,
+            min(clump_window_length, end - start),
+            minimum_frequency,
+            canonical=True,
+        )
+        clumps = {decode_kmer(kmer, dnaa_box_length) for kmer in clump_kmers.tolist()}
+        timings["clumps"] += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        dnaa_boxes = set()
+        if end - start >= dnaa_box_length:
+            dnaa_boxes = find_frequent_kmers_with_mismatches(
+                genome[start:end], dnaa_box_length, max_mismatches, canonical=True
+            )
+        timings["dnaa_boxes"] += time.perf_counter() - start_time
+        candidates.append(OriCandidate(start, end, minima, clumps, dnaa_boxes))
+    return OriFinderResult(skew_minima, candidates, timings)
@@ -0,0 +1,210 @@
+import numpy as np
+
+from itertools import product
+from typing import Dict, List, NamedTuple, Tuple
+
+from genomics_algo.utilities.sequence_encoding import (
+    CODE_N,
+    COMPLEMENT_CODES,
+    encode_kmer,
+    encode_kmers,
+    encode_sequence,
+)
+
+# bases matched by each IUPAC nucleotide code
+IUPAC_CODES = {
+    "A": "A",
+    "C": "C",
+    "G": "G",
+    "T": "T",
+    "R": "AG",
+    "Y": "CT",
+    "S": "CG",
+    "W": "AT",
+    "K": "GT",
+    "M": "AC",
+    "B": "CGT",
+    "D": "AGT",
+    "H": "ACT",
+    "V": "ACG",
+    "N": "ACGT",
+}
+IUPAC_COMPLEMENTS = dict(zip("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN"))
+# a few common restriction enzymes and their recognition sites
+RESTRICTION_SITES = {
+    "BamHI": "GGATCC",
+    "EcoRI": "GAATTC",
+    "EcoRV": "GATATC",
+    "HindIII": "AAGCTT",
+    "HinfI": "GANTC",
+    "NotI": "GCGGCCGC",
+    "PstI": "CTGCAG",
+    "XhoI": "CTCGAG",
+}
+
+DEFAULT_MIN_ARM_LENGTH = 6
+DEFAULT_MAX_ARM_LENGTH = 30
+DEFAULT_MAX_SPACER_LENGTH = 10
+
+
+class SiteOccurence(NamedTuple):
+    """Occurence of the site of a panel named `name` at the forward strand `position`,
+    on the reverse strand if its reverse complement occurs there"""
+
+    position: int
+    name: str
+    strand: str
+
+
+class InvertedRepeat(NamedTuple):
+    """Two arms of `arm_length` bases, the right one ending at `end` (excluded) being
+    the reverse complement of the left one starting at `start`, separated by a spacer
+    of `spacer_length` bases"""
+
+    start: int
+    end: int
+    arm_length: int
+    spacer_length: int
+
+
+def reverse_complement_iupac(site: str) -> str:
+    """Reverse complement a site written with IUPAC nucleotide codes
+    >>> reverse_complement_iupac("GRCGYC")
+    'GRCGYC'
+    >>> reverse_complement_iupac("CCTNAGC")
+    'GCTNAGG'
+    """
+    try:
+        return "".join(IUPAC_COMPLEMENTS[code] for code in reversed(site))
+    except KeyError as error:
+        raise ValueError(f"{error.args[0]!r} is not an IUPAC nucleotide code")
+
+
+def expand_iupac(site: str) -> List[str]:
+    """Get all the sequences of bases matched by a site written with IUPAC nucleotide
+    codes
+    >>> expand_iupac("GANTC")
+    ['GAATC', 'GACTC', 'GAGTC', 'GATTC']
+    """
+    try:
+        return ["".join(bases) for bases in product(*(IUPAC_CODES[c] for c in site))]
+    except KeyError as error:
+        raise ValueError(f"{error.args[0]!r} is not an IUPAC nucleotide code")
+
+
+def _build_site_lookup(
+    sites: List[str],
+) -> Tuple[np.ndarray, Tuple[int, ...], Tuple[str, ...]]:
+    """Sorted codes of the k-mers matched by sites of the same length on either
+    strand, with the index of the matched site and the strand of each code"""
+    kmers = []
+    for i, site in enumerate(sites):
+        strands = [("+", site)]
+        site_reverse_complement = reverse_complement_iupac(site)
+        if site_reverse_complement != site:
+            strands.append(("-", site_reverse_complement))
+        for strand, strand_site in strands:
+            kmers += [
+                (encode_kmer(kmer), i, strand) for kmer in expand_iupac(strand_site)
+            ]
+    kmers.sort()
+    codes, site_indices, strands = zip(*kmers)
+    return np.array(codes, dtype=np.uint64), site_indices, strands
+
+
+def find_sites(genome: str, sites: Dict[str, str]) -> List[SiteOccurence]:
+    """Find the occurences on both strands of a panel of sites written with IUPAC
+    nucleotide codes, e.g. restriction sites, in one pass per site length instead of
+    two passes per site: the degenerate sites and their reverse complements are
+    expanded into the 2-bit packed codes of the k-mers they match, which every k-mer
+    of the genome is looked up among at once. Sites equal to their own reverse
+    complement are reported once, on the forward strand
+    >>> find_sites("GGAATTCAGGACTCC", {"EcoRI": "GAATTC", "HinfI": "GANTC"})
+    [SiteOccurence(position=1, name='EcoRI', strand='+'), \
+SiteOccurence(position=9, name='HinfI', strand='+')]
+    >>> find_sites("TTCTCAGA", {"site": "TCTGA"})
+    [SiteOccurence(position=3, name='site', strand='-')]
+    """
+    names = list(sites)
+    lengths = {len(site) for site in sites.values()}
+    if not all(0 < length <= 32 for length in lengths):
+        raise ValueError("Sites must have between 1 and 32 bases")
+    codes = encode_sequence(genome)
+    occurences = []
+    for length in sorted(lengths):
+        panel = [name for name in names if len(sites[name]) == length]
+        lookup, site_indices, strands = _build_site_lookup(
+            [sites[name] for name in panel]
+        )
+        kmers, valid = encode_kmers(codes, length)
+        first_matches = np.searchsorted(lookup, kmers, side="left")
+        number_of_matches = np.searchsorted(lookup, kmers, side="right") - first_matches
+        number_of_matches[~valid] = 0
+        # one entry per match of a k-mer of the genome with a k-mer of the lookup
+        positions = np.repeat(np.arange(len(kmers)), number_of_matches)
+        entries = np.repeat(
+            first_matches - np.cumsum(number_of_matches) + number_of_matches,
+            number_of_matches,
+        ) + np.arange(len(positions))
+        occurences += [
+            SiteOccurence(position, panel[site_indices[entry]], strands[entry])
+            for position, entry in zip(positions.tolist(), entries.tolist())
+        ]
+    return sorted(occurences)
+
+
+def find_inverted_repeats(
+    genome: str,
+    min_arm_length: int = DEFAULT_MIN_ARM_LENGTH,
+    max_arm_length: int = DEFAULT_MAX_ARM_LENGTH,
+    min_spacer_length: int = 0,
+    max_spacer_length: int = DEFAULT_MAX_SPACER_LENGTH,
+) -> List[InvertedRepeat]:
+    """Find the inverted repeats of a genome, such as hairpins or (with no spacer)
+    reverse complement palindromes, comparing the genome with its complement on whole
+    arrays: for every spacer length, the arms of all the candidate repeats are
+    extended outwards together one base at a time, candidates being dropped as soon
+    as their next bases are not complementary. Arms are as long as possible, up to
+    `max_arm_length`, and spacers as short as possible, so that a repeat is reported
+    once; ``N`` bases do not pair
+    >>> find_inverted_repeats("TTGAATTCAA", 3, 10, 0, 0)
+    [InvertedRepeat(start=0, end=10, arm_length=5, spacer_length=0)]
+    >>> find_inverted_repeats("CGATCCAAAGGATCGA", 4, 10, 0, 5)
+    [InvertedRepeat(start=0, end=15, arm_length=6, spacer_length=3)]
+    """
+    if not 0 < min_arm_length <= max_arm_length:
+        raise ValueError("Arm lengths must satisfy 0 < min <= max")
+    if not 0 <= min_spacer_length <= max_spacer_length:
+        raise ValueError("Spacer lengths must satisfy 0 <= min <= max")
+    codes = encode_sequence(genome)
+    # an N has no complement
+    complements = np.where(codes == CODE_N, CODE_N + 1, COMPLEMENT_CODES[codes])
+    repeats = []
+    for spacer_length in range(min_spacer_length, max_spacer_length + 1):
+        # candidates are given by the last base of their left arm
+        arm_ends = np.arange(max(len(codes) - spacer_length - 1, 0))
+        arm_lengths = np.zeros(len(arm_ends), dtype=np.int64)
+        candidates = arm_ends
+        for extension in range(max_arm_length):
+            lefts = candidates - extension
+            rights = candidates + spacer_length + 1 + extension
+            inside = (lefts >= 0) & (rights < len(codes))
+            candidates, lefts, rights = (
+                candidates[inside],
+                lefts[inside],
+                rights[inside],
+            )
+            candidates = candidates[codes[lefts] == complements[rights]]
+            if not len(candidates):
+                break
+            arm_lengths[candidates] += 1
+        found = arm_lengths >= min_arm_length
+        if spacer_length - 2 >= min_spacer_length:
+            # the repeat is found with a shorter spacer if the spacer ends pair
+            found &= codes[arm_ends + 1] != complements[arm_ends + spacer_length]
+        for arm_end in np.flatnonzero(found).tolist():
+            arm_length = int(arm_lengths[arm_end])
+            start = arm_end - arm_length + 1
+            end = arm_end + spacer_length + arm_length + 1
+            repeats.append(InvertedRepeat(start, end, arm_length, spacer_length))
+    return sorted(repeats)
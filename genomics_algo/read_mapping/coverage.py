@@ -0,0 +1,223 @@
+import re
+
+import numpy as np
+
+from itertools import islice
+from typing import List, Optional, Sequence, Union
+
+from genomics_algo.read_mapping.mapper import ReadHit, ReadMapper
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import iterate_fastq
+from genomics_algo.utilities.sequence_encoding import (
+    ALPHABET,
+    CODE_N,
+    decode_sequence,
+    encode_sequence,
+)
+
+DEFAULT_BATCH_SIZE = 100_000
+
+_CIGAR_PATTERN = re.compile(r"(\d+)([MIDS])")
+
+
+def get_reference_length(cigar: str) -> int:
+    """Number of reference bases covered by an alignment
+    >>> get_reference_length("3M1D5M1I2S")
+    9
+    """
+    return sum(
+        int(length) for length, op in _CIGAR_PATTERN.findall(cigar) if op in "MD"
+    )
+
+
+def _add_counts(counts: np.ndarray, indices: np.ndarray, value: int = 1) -> None:
+    """Add `value` to `counts` at every index, repeated indices adding up, with
+    `np.add.at`, or with a much faster `np.bincount` over the range of the indices when
+    there are at least as many indices as the range is long
+    """
+    if len(indices) == 0:
+        return
+    low = int(indices.min())
+    high = int(indices.max()) + 1
+    if len(indices) >= high - low:
+        counts[low:high] += (
+            value * np.bincount(indices - low, minlength=high - low)
+        ).astype(counts.dtype)
+    else:
+        np.add.at(counts, indices, value)
+
+
+def compute_coverage(
+    starts: Sequence[int], lengths: Union[int, Sequence[int]], genome_length: int
+) -> np.ndarray:
+    """Compute the number of hits covering every position of a genome, e.g. from the
+    occurences of a pattern of length `lengths` returned by a matcher
+    >>> compute_coverage([0, 2], 3, 6).tolist()
+    [1, 1, 2, 1, 1, 0]
+    """
+    accumulator = CoverageAccumulator(genome_length, pileup=False)
+    accumulator.add_intervals(starts, lengths)
+    return accumulator.get_coverage()
+
+
+class CoverageAccumulator:
+    """Coverage and pileup of a genome accumulated over batches of hits, so that the
+    memory used depends on the length of the genome and of a batch only. The coverage
+    is kept as a difference array, +1 where a hit starts and -1 where it ends, which
+    is updated for a whole batch at once and turned into the coverage by a cumulative
+    sum. With `pileup`, the number of reads showing each of the bases ``ACGTN``
+    at every position is counted too (``genome_length`` x 5 counts), for consensus
+    calling
+    >>> accumulator = CoverageAccumulator(8)
+    >>> accumulator.add_reads([0, 2, 3], ["ACGT", "GTAC", "TAAC"])
+    >>> accumulator.get_coverage().tolist()
+    [1, 1, 2, 3, 2, 2, 1, 0]
+    >>> accumulator.get_consensus()
+    'ACGTAACN'
+    """
+
+    def __init__(self, genome_length: int, pileup: bool = True):
+        self.genome_length = genome_length
+        self.number_of_hits = 0
+        self._coverage_changes = np.zeros(genome_length + 1, dtype=np.int64)
+        self.pileup = None
+        if pileup:
+            self.pileup = np.zeros((genome_length, len(ALPHABET)), dtype=np.uint32)
+
+    def add_intervals(
+        self, starts: Sequence[int], lengths: Union[int, Sequence[int]]
+    ) -> None:
+        """Add hits covering the positions ``[start, start + length)``, clipped to the
+        genome"""
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.clip(
+            starts + np.asarray(lengths, dtype=np.int64), 0, self.genome_length
+        )
+        starts = np.clip(starts, 0, self.genome_length)
+        _add_counts(self._coverage_changes, starts, 1)
+        _add_counts(self._coverage_changes, ends, -1)
+        self.number_of_hits += len(starts)
+
+    def add_reads(
+        self,
+        starts: Sequence[int],
+        reads: List[str],
+        cigars: Optional[List[str]] = None,
+    ) -> None:
+        """Add reads aligned to the forward strand at `starts` to the coverage and to
+        the pileup. Without `cigars` (as for exact matches), reads are aligned without
+        gaps, otherwise only their ``M`` bases are counted in the pileup and the
+        coverage spans the deleted bases too
+        """
+        assert self.pileup is not None, "The accumulator has no pileup"
+        assert len(starts) == len(reads)
+        starts = np.asarray(starts, dtype=np.int64)
+        read_lengths = np.array([len(read) for read in reads], dtype=np.int64)
+        gapped = np.zeros(len(reads), dtype=bool)
+        reference_lengths = read_lengths.copy()
+        if cigars is not None:
+            assert len(cigars) == len(reads)
+            gapped = np.array(
+                [cigar != f"{len(read)}M" for read, cigar in zip(reads, cigars)],
+                dtype=bool,
+            )
+            for i in np.nonzero(gapped)[0]:
+                reference_lengths[i] = get_reference_length(cigars[i])
+        self.add_intervals(starts, reference_lengths)
+
+        # bases of the reads without gaps, all at once
+        ungapped = np.nonzero(~gapped)[0]
+        codes = [encode_sequence("".join(reads[i] for i in ungapped))]
+        lengths = read_lengths[ungapped]
+        read_offsets = np.concatenate(([0], np.cumsum(lengths)))[:-1]
+        positions = [
+            np.repeat(starts[ungapped] - read_offsets, lengths)
+            + np.arange(int(lengths.sum()), dtype=np.int64)
+        ]
+        # bases of the reads with gaps, one aligned block after the other
+        for i in np.nonzero(gapped)[0]:
+            read_codes = encode_sequence(reads[i])
+            read_index = 0
+            reference_index = int(starts[i])
+            for length, op in _CIGAR_PATTERN.findall(cigars[i]):
+                length = int(length)
+                if op == "M":
+                    codes.append(read_codes[read_index : read_index + length])
+                    positions.append(
+                        np.arange(reference_index, reference_index + length)
+                    )
+                if op in "MIS":
+                    read_index += length
+                if op in "MD":
+                    reference_index += length
+        codes = np.concatenate(codes)
+        positions = np.concatenate(positions)
+        inside = (positions >= 0) & (positions < self.genome_length)
+        _add_counts(
+            self.pileup.reshape(-1),
+            positions[inside] * len(ALPHABET) + codes[inside],
+        )
+
+    def add_mapped_reads(self, reads: List[str], hits: List[List[ReadHit]]) -> None:
+        """Add reads at the location of their best hit (see `ReadMapper.map_read`),
+        unmapped reads being skipped"""
+        assert len(reads) == len(hits)
+        mapped = [
+            (read, read_hits[0]) for read, read_hits in zip(reads, hits) if read_hits
+        ]
+        self.add_reads(
+            [hit.position for _, hit in mapped],
+            [
+                read if hit.strand == "+" else reverse_complement(read)
+                for read, hit in mapped
+            ],
+            [hit.cigar for _, hit in mapped],
+        )
+
+    def merge(self, other: "CoverageAccumulator") -> None:
+        """Add the hits of another accumulator of the same genome, e.g. one filled by
+        another process"""
+        assert other.genome_length == self.genome_length
+        self._coverage_changes += other._coverage_changes
+        self.number_of_hits += other.number_of_hits
+        if self.pileup is not None:
+            assert other.pileup is not None
+            self.pileup += other.pileup
+
+    def get_coverage(self) -> np.ndarray:
+        return np.cumsum(self._coverage_changes[:-1])
+
+    def get_consensus(self, min_depth: int = 1) -> str:
+        """Most frequent base of the pileup at every position, ``N`` where less than
+        `min_depth` reads show one of ``ACGT``. Ties go to the first base in ``ACGT``
+        """
+        assert self.pileup is not None, "The accumulator has no pileup"
+        base_counts = self.pileup[:, :CODE_N]
+        codes = np.argmax(base_counts, axis=1).astype(np.uint8)
+        codes[base_counts.sum(axis=1) < max(min_depth, 1)] = CODE_N
+        return decode_sequence(codes)
+
+
+def compute_read_pileup(
+    mapper: ReadMapper,
+    reads_filename: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pileup: bool = True,
+) -> CoverageAccumulator:
+    """Map the reads of a .fastq file and accumulate the coverage and pileup of their
+    best hits on the genome of `mapper`, `batch_size` reads at a time"""
+    accumulator = CoverageAccumulator(len(mapper.genome), pileup)
+    records = iterate_fastq(reads_filename)
+    while True:
+        reads = [read for _, read, _ in islice(records, batch_size)]
+        if len(reads) == 0:
+            return accumulator
+        hits = [mapper.map_read(read) for read in reads]
+        if pileup:
+            accumulator.add_mapped_reads(reads, hits)
+        else:
+            best_hits = [read_hits[0] for read_hits in hits if read_hits]
+            accumulator.add_intervals(
+                [hit.position for hit in best_hits],
+                [get_reference_length(hit.cigar) for hit in best_hits],
+            )
@@ -0,0 +1,282 @@
+import os
+import time
+
+import numpy as np
+
+from typing import IO, Dict, List, NamedTuple, Optional
+
+from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
+    get_best_approximate_match,
+)
+from genomics_algo.exact_matching_algorithms.kmer_index import KmerIndex
+from genomics_algo.utilities.deduplication import MatchCache
+from genomics_algo.utilities.low_complexity import find_low_complexity_mask
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.profiling import profiled
+from genomics_algo.utilities.read_files import iterate_fastq, read_genome
+from genomics_algo.utilities.sequence_encoding import encode_kmers, encode_sequence
+
+DEFAULT_SEED_LENGTH = 12
+DEFAULT_MAX_MISMATCHES = 3
+DEFAULT_MAX_SEED_HITS = 256
+# shorter seeds hit too many locations of a genome to be verified quickly
+MIN_SEED_LENGTH = 8
+OUTPUT_FORMATS = ("tsv", "sam")
+
+_SAM_FLAG_REVERSE = 16
+_SAM_FLAG_UNMAPPED = 4
+_UNIQUE_MAPPING_QUALITY = 60
+
+
+class ReadHit(NamedTuple):
+    """Location of a read on the reference; `position` is the 0-based start on the
+    forward strand and `cigar` describes the read (reverse complemented on the ``-``
+    strand) against the reference"""
+
+    position: int
+    strand: str
+    edit_distance: int
+    cigar: str
+
+
+class MappingStats(NamedTuple):
+    reads: int
+    mapped_reads: int
+    index_seconds: float
+    mapping_seconds: float
+
+    @property
+    def reads_per_second(self) -> float:
+        if self.mapping_seconds == 0:
+            return 0.0
+        return self.reads / self.mapping_seconds
+
+
+class ReadMapper:
+    """Maps reads to a reference genome with the seed, filter and verify strategy:
+    every read is cut into non-overlapping seeds of length `seed_length` which are
+    looked up in a `KmerIndex` of the genome, seeds occurring more than `max_seed_hits`
+    times are dropped as repeats, and every candidate location is verified against
+    a window of the genome with a banded edit distance of at most `max_mismatches`.
+    As long as a read has more seeds than `max_mismatches`, at least one of them
+    is free of errors, so no location within the edit distance bound is missed;
+    reads too short for that can be mapped with shorter seeds (see `get_seed_length`).
+    Seeds overlapping a base masked in `mask`, typically the low complexity regions
+    of the genome, are not indexed, so hits need a seed outside of them
+    """
+
+    def __init__(
+        self,
+        genome: str,
+        seed_length: int = DEFAULT_SEED_LENGTH,
+        max_mismatches: int = DEFAULT_MAX_MISMATCHES,
+        max_seed_hits: int = DEFAULT_MAX_SEED_HITS,
+        mask: Optional[np.ndarray] = None,
+    ):
+        self.genome = genome
+        self.index = KmerIndex(genome, seed_length, mask)
+        self.max_mismatches = max_mismatches
+        self.max_seed_hits = max_seed_hits
+        self.mask = mask
+        # indexes of shorter seeds, built on first use
+        self._indexes: Dict[int, KmerIndex] = {seed_length: self.index}
+
+    def _get_index(self, seed_length: int) -> KmerIndex:
+        if seed_length not in self._indexes:
+            self._indexes[seed_length] = KmerIndex(self.genome, seed_length, self.mask)
+        return self._indexes[seed_length]
+
+    def _get_candidate_starts(self, read: str, index: KmerIndex) -> np.ndarray:
+        """Get the sorted start positions in the genome implied by the read's seeds"""
+        seed_length = index.k
+        kmers, valid = encode_kmers(encode_sequence(read), seed_length)
+        offsets = np.arange(0, len(read) - seed_length + 1, seed_length)
+        offsets = offsets[valid[offsets]]
+        starts, ends = index.get_ranges(kmers[offsets])
+        hit_counts = ends - starts
+        candidates = [
+            index.positions[start:end] - offset
+            for start, end, offset, count in zip(starts, ends, offsets, hit_counts)
+            if 0 < count <= self.max_seed_hits
+        ]
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(candidates))
+
+    def get_seed_length(
+        self, read_length: int, max_mismatches: Optional[int] = None
+    ) -> int:
+        """Get the length of the seeds a read of `read_length` bases needs to have more
+        seeds than `max_mismatches` (the mapper's by default), so that seeding finds
+        all its hits: the mapper's seed length, or a shorter one for short reads.
+        Raises a ValueError if it would be shorter than `MIN_SEED_LENGTH`, or than the
+        mapper's seed length if that is shorter
+        >>> mapper = ReadMapper("GACTACGGAGACTAGT", seed_length=12, max_mismatches=1)
+        >>> mapper.get_seed_length(30), mapper.get_seed_length(20)
+        (12, 10)
+        """
+        if max_mismatches is None:
+            max_mismatches = self.max_mismatches
+        seed_length = min(self.index.k, read_length // (max_mismatches + 1))
+        min_seed_length = min(self.index.k, MIN_SEED_LENGTH)
+        if seed_length < min_seed_length:
+            raise ValueError(
+                f"Reads of {read_length} bases are too short to be mapped with "
+                f"{max_mismatches} mismatches, which needs at least "
+                f"{min_seed_length * (max_mismatches + 1)} bases"
+            )
+        return seed_length
+
+    def _verify_candidates(
+        self, read: str, candidate_starts: np.ndarray, strand: str, max_mismatches: int
+    ) -> List[ReadHit]:
+        """Verify windows around clusters of candidate starts lying within
+        `max_mismatches` of each other"""
+        hits = []
+        clusters = np.split(
+            candidate_starts,
+            np.nonzero(np.diff(candidate_starts) > max_mismatches)[0] + 1,
+        )
+        for cluster in clusters:
+            if len(cluster) == 0:
+                continue
+            window_start = max(int(cluster[0]) - max_mismatches, 0)
+            window_end = min(
+                int(cluster[-1]) + len(read) + max_mismatches, len(self.genome)
+            )
+            window = self.genome[window_start:window_end]
+            exact_start = window.find(read)
+            if exact_start != -1:
+                hits.append(
+                    ReadHit(window_start + exact_start, strand, 0, f"{len(read)}M")
+                )
+                continue
+            match = get_best_approximate_match(read, window, max_mismatches)
+            if match is not None:
+                start, _, edit_distance, cigar = match
+                hits.append(ReadHit(window_start + start, strand, edit_distance, cigar))
+        return hits
+
+    @profiled
+    def map_read(
+        self,
+        read: str,
+        max_mismatches: Optional[int] = None,
+        seed_length: Optional[int] = None,
+    ) -> List[ReadHit]:
+        """Find all locations of `read` on both strands of the genome, within an edit
+        distance of `max_mismatches` if given instead of the one of the mapper, and
+        with seeds of `seed_length` bases if given instead of those of the mapper
+
+        Returns:
+            List[ReadHit]: hits sorted by edit distance, then position
+        """
+        if max_mismatches is None:
+            max_mismatches = self.max_mismatches
+        index = self.index if seed_length is None else self._get_index(seed_length)
+        hits = set()
+        for strand, sequence in (("+", read), ("-", reverse_complement(read))):
+            hits.update(
+                self._verify_candidates(
+                    sequence,
+                    self._get_candidate_starts(sequence, index),
+                    strand,
+                    max_mismatches,
+                )
+            )
+        return sorted(hits, key=lambda hit: (hit.edit_distance, hit.position))
+
+
+def _read_reference_name(filename: str) -> str:
+    """Name of a reference: first word of the .fa header, or the file name if missing"""
+    with open(filename) as f:
+        header = f.readline()
+    if header.startswith(">") and len(header[1:].split()) > 0:
+        return header[1:].split()[0]
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _format_tsv_record(read_name: str, hits: List[ReadHit]) -> str:
+    if len(hits) == 0:
+        return f"{read_name}\t*\t*\t*\t*\t0\n"
+    best = hits[0]
+    number_of_best_hits = sum(hit.edit_distance == best.edit_distance for hit in hits)
+    return (
+        f"{read_name}\t{best.strand}\t{best.position}\t{best.edit_distance}\t"
+        f"{best.cigar}\t{number_of_best_hits}\n"
+    )
+
+
+def _format_sam_record(
+    read_name: str, read: str, qualities: str, hits: List[ReadHit], reference: str
+) -> str:
+    if len(hits) == 0:
+        return f"{read_name}\t{_SAM_FLAG_UNMAPPED}\t*\t0\t0\t*\t*\t0\t0\t{read}\t{qualities}\n"
+    best = hits[0]
+    unique = len(hits) == 1 or hits[1].edit_distance > best.edit_distance
+    flag = 0
+    if best.strand == "-":
+        flag |= _SAM_FLAG_REVERSE
+        read, qualities = reverse_complement(read), qualities[::-1]
+    mapping_quality = _UNIQUE_MAPPING_QUALITY if unique else 0
+    return (
+        f"{read_name}\t{flag}\t{reference}\t{best.position + 1}\t{mapping_quality}\t"
+        f"{best.cigar}\t*\t0\t0\t{read}\t{qualities}\tNM:i:{best.edit_distance}\n"
+    )
+
+
+@profiled
+def map_reads(
+    genome_filename: str,
+    reads_filename: str,
+    output: IO[str],
+    output_format: str = "tsv",
+    seed_length: int = DEFAULT_SEED_LENGTH,
+    max_mismatches: int = DEFAULT_MAX_MISMATCHES,
+    max_seed_hits: int = DEFAULT_MAX_SEED_HITS,
+    mask_low_complexity: bool = False,
+    result_cache_size: int = 0,
+) -> MappingStats:
+    """Map every read of a .fastq file to the genome of a .fa file and write the best
+    hit of each read to `output`, either tab-separated (read name, strand, 0-based
+    position, edit distance, CIGAR, number of equally good hits) or as SAM records.
+    Reads are streamed, so only the genome and its index are held in memory.
+    With `mask_low_complexity`, the low complexity regions of the genome are not seeded.
+    With `result_cache_size`, the hits of that many recently mapped reads are cached,
+    so that duplicate reads are mapped only once
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format {output_format}, expected one of {OUTPUT_FORMATS}"
+        )
+    index_start = time.perf_counter()
+    genome = read_genome(genome_filename)
+    mask = find_low_complexity_mask(genome) if mask_low_complexity else None
+    mapper = ReadMapper(genome, seed_length, max_mismatches, max_seed_hits, mask)
+    index_seconds = time.perf_counter() - index_start
+    map_read = mapper.map_read
+    if result_cache_size > 0:
+        map_read = MatchCache(mapper.map_read, result_cache_size)
+
+    reference = _read_reference_name(genome_filename)
+    if output_format == "sam":
+        output.write("@HD\tVN:1.6\tSO:unsorted\n")
+        output.write(f"@SQ\tSN:{reference}\tLN:{len(genome)}\n")
+        output.write("@PG\tID:genomics-algo\tPN:genomics-algo\n")
+
+    reads = 0
+    mapped_reads = 0
+    mapping_start = time.perf_counter()
+    for header, read, qualities in iterate_fastq(reads_filename):
+        read_name = header.split()[0] if len(header.split()) > 0 else "*"
+        hits = map_read(read)
+        reads += 1
+        mapped_reads += len(hits) > 0
+        if output_format == "sam":
+            output.write(
+                _format_sam_record(read_name, read, qualities, hits, reference)
+            )
+        else:
+            output.write(_format_tsv_record(read_name, hits))
+    mapping_seconds = time.perf_counter() - mapping_start
+    return MappingStats(reads, mapped_reads, index_seconds, mapping_seconds)
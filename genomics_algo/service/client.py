@@ -0,0 +1,73 @@
+import http.client
+import json
+
+from typing import Any, Dict, List, Optional
+
+from genomics_algo.read_mapping.mapper import ReadHit
+from genomics_algo.service.server import DEFAULT_HOST, DEFAULT_PORT
+
+DEFAULT_TIMEOUT = 60.0
+
+
+class QueryClient:
+    """Client of a `QueryServer`, keeping its connection open between requests so
+    that a batch of queries costs a single round trip
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def __enter__(self) -> "QueryClient":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def _request(self, method: str, path: str, content: Optional[Dict] = None) -> Dict:
+        body = None if content is None else json.dumps(content).encode()
+        headers = {} if body is None else {"Content-Type": "application/json"}
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        reply = json.loads(response.read())
+        if response.status != 200:
+            raise ValueError(f"Query failed ({response.status}): {reply.get('error')}")
+        return reply
+
+    def get_status(self) -> Dict[str, Any]:
+        return self._request("GET", "/status")
+
+    def query(self, queries: List[Dict[str, Any]]) -> List[List]:
+        """Send a batch of queries (see `QueryEngine.run_queries`) and get their
+        results in the same order, approximate hits as lists"""
+        return self._request("POST", "/query", {"queries": queries})["results"]
+
+    def find_exact(self, patterns: List[str]) -> List[List[int]]:
+        return self.query([{"pattern": pattern} for pattern in patterns])
+
+    def find_with_reverse_complement(self, patterns: List[str]) -> List[List[int]]:
+        return self.query(
+            [{"pattern": pattern, "mode": "reverse_complement"} for pattern in patterns]
+        )
+
+    def find_approximate(
+        self, patterns: List[str], max_mismatches: Optional[int] = None
+    ) -> List[List[ReadHit]]:
+        results = self.query(
+            [
+                {
+                    "pattern": pattern,
+                    "mode": "approximate",
+                    "max_mismatches": max_mismatches,
+                }
+                for pattern in patterns
+            ]
+        )
+        return [[ReadHit(*hit) for hit in hits] for hits in results]
@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_exact_match_with_reverse_complement,
+)
+from genomics_algo.read_mapping.mapper import (
+    DEFAULT_MAX_MISMATCHES,
+    DEFAULT_SEED_LENGTH,
+    ReadMapper,
+)
+from genomics_algo.utilities.read_files import read_genome
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+QUERY_MODES = ("exact", "reverse_complement", "approximate")
+
+
+class QueryEngine:
+    """A genome and its k-mer index, built once to answer many pattern queries:
+    ``exact`` and ``reverse_complement`` queries return the sorted positions of the
+    pattern (and of its reverse complement) found with the `KmerIndex`, and
+    ``approximate`` queries the hits of `ReadMapper.map_read` on both strands, with
+    shorter seeds for patterns too short to have more seeds than `max_mismatches`
+    >>> engine = QueryEngine("GACTACGGAGACTAGT", seed_length=3, max_mismatches=1)
+    >>> engine.query("ACT"), engine.query("ACT", "reverse_complement")
+    ([1, 10], [1, 10, 13])
+    >>> engine.query("GACTAG", "approximate", max_mismatches=0)
+    [ReadHit(position=9, strand='+', edit_distance=0, cigar='6M')]
+    >>> engine.query("CGGAG", "approximate")
+    Traceback (most recent call last):
+    ...
+    ValueError: Reads of 5 bases are too short to be mapped with 1 mismatches, which \
+needs at least 6 bases
+    """
+
+    def __init__(
+        self,
+        genome: str,
+        seed_length: int = DEFAULT_SEED_LENGTH,
+        max_mismatches: int = DEFAULT_MAX_MISMATCHES,
+    ):
+        self.genome = genome
+        self.mapper = ReadMapper(genome, seed_length, max_mismatches)
+
+    def _find_exact(self, pattern: str, text: str) -> List[int]:
+        return self.mapper.index.get_occurences(pattern)
+
+    def query(
+        self, pattern: str, mode: str = "exact", max_mismatches: Optional[int] = None
+    ) -> List:
+        if mode == "exact":
+            return self.mapper.index.get_occurences(pattern)
+        if mode == "reverse_complement":
+            return sorted(
+                get_occurences_with_exact_match_with_reverse_complement(
+                    pattern, self.genome, self._find_exact
+                )
+            )
+        if mode == "approximate":
+            seed_length = self.mapper.get_seed_length(len(pattern), max_mismatches)
+            return self.mapper.map_read(pattern, max_mismatches, seed_length)
+        raise ValueError(f"Unknown query mode {mode}, expected one of {QUERY_MODES}")
+
+    def run_queries(self, queries: List[Dict[str, Any]]) -> List[List]:
+        """Run queries given as dictionaries with a ``pattern``, and optionally a
+        ``mode`` (``exact`` by default) and ``max_mismatches``"""
+        return [
+            self.query(
+                query["pattern"],
+                query.get("mode", "exact"),
+                query.get("max_mismatches"),
+            )
+            for query in queries
+        ]
+
+
+class _EngineConfig(NamedTuple):
+    genome_filename: str
+    seed_length: int
+    max_mismatches: int
+
+
+# engine of the current process, loaded on the first queries of each worker
+_engines: Dict[_EngineConfig, QueryEngine] = {}
+
+
+def _get_engine(config: _EngineConfig) -> QueryEngine:
+    if config not in _engines:
+        _engines[config] = QueryEngine(
+            read_genome(config.genome_filename),
+            config.seed_length,
+            config.max_mismatches,
+        )
+    return _engines[config]
+
+
+def _run_queries(config: _EngineConfig, queries: List[Dict[str, Any]]) -> List[List]:
+    return _get_engine(config).run_queries(queries)
+
+
+def _validate_queries(queries: Any):
+    if not isinstance(queries, list):
+        raise ValueError("Expected a list of queries")
+    for query in queries:
+        if not isinstance(query, dict) or not isinstance(query.get("pattern"), str):
+            raise ValueError(f"Invalid query {query}, expected a pattern")
+        if query.get("mode", "exact") not in QUERY_MODES:
+            raise ValueError(
+                f"Unknown query mode {query['mode']}, expected one of {QUERY_MODES}"
+            )
+        max_mismatches = query.get("max_mismatches")
+        if max_mismatches is not None and (
+            not isinstance(max_mismatches, int) or max_mismatches < 0
+        ):
+            raise ValueError(f"Invalid max_mismatches {max_mismatches}")
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    # keeps connections open between the requests of a client, and sends the body
+    # right after the headers instead of waiting for them to be acknowledged
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, content: Dict[str, Any]):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._send_json(200, self.server.get_status())
+
+    def do_POST(self):
+        if self.path != "/query":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            results = self.server.run_queries(json.loads(body)["queries"])
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {"error": str(error)})
+            return
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QueryServer(ThreadingMixIn, HTTPServer):
+    """Local HTTP server answering batches of pattern queries against a genome loaded
+    once with its indexes (see `QueryEngine`), so that short jobs do not pay for
+    reading the genome and building the indexes every time. Every connection is
+    served by its own thread; with more than one worker, the queries of each request
+    are split among `workers` processes, which load their own engine on their first
+    queries. Use port 0 to pick any free port, then read `server_address`.
+
+    The API is ``GET /status`` and ``POST /query`` with a JSON body
+    ``{"queries": [{"pattern": "ACGT", "mode": "exact"}, ...]}`` (see
+    `QueryEngine.run_queries`), answered by ``{"results": [...]}`` in the same order,
+    or by status 400 and ``{"error": "..."}`` for invalid queries
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        genome_filename: str,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = 1,
+        seed_length: int = DEFAULT_SEED_LENGTH,
+        max_mismatches: int = DEFAULT_MAX_MISMATCHES,
+    ):
+        assert workers > 0
+        self.config = _EngineConfig(genome_filename, seed_length, max_mismatches)
+        start = time.perf_counter()
+        self.engine = _get_engine(self.config)
+        self.load_seconds = time.perf_counter() - start
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(workers) if workers > 1 else None
+        self.number_of_queries = 0
+        self._lock = threading.Lock()
+        super().__init__((host, port), _QueryHandler)
+
+    def run_queries(self, queries: List[Dict[str, Any]]) -> List[List]:
+        _validate_queries(queries)
+        with self._lock:
+            self.number_of_queries += len(queries)
+        if self.executor is None or len(queries) < 2:
+            return self.engine.run_queries(queries)
+        chunk_size = -(-len(queries) // self.workers)
+        chunks = [
+            queries[start : start + chunk_size]
+            for start in range(0, len(queries), chunk_size)
+        ]
+        results = []
+        for chunk_results in self.executor.map(
+            _run_queries, [self.config] * len(chunks), chunks
+        ):
+            results += chunk_results
+        return results
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "genome_filename": self.config.genome_filename,
+            "genome_length": len(self.engine.genome),
+            "seed_length": self.config.seed_length,
+            "max_mismatches": self.config.max_mismatches,
+            "workers": self.workers,
+            "load_seconds": self.load_seconds,
+            "number_of_queries": self.number_of_queries,
+        }
+
+    def server_close(self):
+        super().server_close()
+        if self.executor is not None:
+            self.executor.shutdown()
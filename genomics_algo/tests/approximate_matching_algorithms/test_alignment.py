@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from genomics_algo.approximate_matching_algorithms.alignment import (
+    create_scoring_matrix,
+    find_alignment_scores_batch,
+    find_global_alignment,
+    find_global_alignment_linear_space,
+    find_local_alignment,
+    score_cigar,
+)
+
+
+def _random_sequence(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("ACGT") for _ in range(length))
+
+
+def test_find_global_alignment_affine_gaps():
+    # one long gap is cheaper than two short ones with affine gap costs
+    alignment = find_global_alignment("AAAATTTT", "AAAAGGTTTT")
+    assert alignment.cigar == "4M2D4M"
+    assert alignment.score == 8 - (6 + 2 * 1)
+
+    alignment = find_global_alignment("AAAAGGTTTT", "AAAATTTT")
+    assert alignment.cigar == "4M2I4M"
+
+    alignment = find_global_alignment("", "ACG")
+    assert alignment.cigar == "3D"
+    assert alignment.score == -(6 + 3)
+
+
+def test_find_global_alignment_with_scoring_matrix():
+    scoring_matrix = create_scoring_matrix(match=2, mismatch=-1)
+    alignment = find_global_alignment(
+        "ACGT", "AGGT", scoring_matrix=scoring_matrix, gap_open=0, gap_extend=2
+    )
+    assert alignment.cigar == "4M"
+    assert alignment.score == 5
+
+
+def test_find_local_alignment():
+    query = "GGGG" + "ACGTCAGTCA" + "TT" + "GACTGACTGA" + "GGGG"
+    reference = "CCC" + "ACGTCAGTCA" + "GACTGACTGA" + "CCC"
+    alignment = find_local_alignment(query, reference)
+    assert alignment.query_start == 4
+    assert alignment.query_end == 26
+    assert alignment.reference_start == 3
+    assert alignment.reference_end == 23
+    assert alignment.cigar == "4S10M2I10M4S"
+    assert alignment.score == 20 - (6 + 2)
+
+
+@pytest.mark.parametrize("gap_open, gap_extend", [(6, 1), (0, 1), (2, 3)])
+def test_global_alignments_are_optimal_and_consistent(gap_open, gap_extend):
+    rng = random.Random(26)
+    for _ in range(50):
+        query = _random_sequence(rng, rng.randint(0, 30))
+        reference = _random_sequence(rng, rng.randint(0, 30))
+        full = find_global_alignment(query, reference, None, gap_open, gap_extend)
+        linear = find_global_alignment_linear_space(
+            query, reference, None, gap_open, gap_extend
+        )
+        assert full.score == linear.score
+        for alignment in (full, linear):
+            assert alignment.score == score_cigar(
+                query, reference, alignment.cigar, None, gap_open, gap_extend
+            )
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_find_alignment_scores_batch(local):
+    rng = random.Random(27)
+    queries = [_random_sequence(rng, rng.randint(0, 20)) for _ in range(40)]
+    references = [_random_sequence(rng, rng.randint(0, 30)) for _ in range(40)]
+    align = find_local_alignment if local else find_global_alignment
+    expected = [align(q, r).score for q, r in zip(queries, references)]
+    result = find_alignment_scores_batch(queries, references, local=local)
+    assert result.tolist() == expected
@@ -1,6 +1,14 @@
+import random
+
+import numpy as np
+import pytest
+
 from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
     _backtrace_approximate_match,
+    get_occurences_with_dynamic_programming,
+    iterate_occurences_with_dynamic_programming,
 )
+from genomics_algo.utilities.occurences import get_first_occurences
 
 
 def test__backtrace_approximate_match():
@@ -23,3 +31,30 @@ def test__backtrace_approximate_match():
     )
     expected_occurence_start_indices = [5]
     assert expected_occurence_start_indices == result_occurence_start_indices
+
+
+@pytest.mark.parametrize("bases", ["ACGT", "AC", "A"])
+def test_iterate_occurences_with_dynamic_programming(bases):
+    random.seed(len(bases))
+    for _ in range(200):
+        text = "".join(random.choices(bases, k=random.randint(1, 40)))
+        pattern = "".join(
+            random.choices("ACGT", k=random.randint(0, min(8, len(text))))
+        )
+        max_mismatches = random.randint(0, 3)
+        mask = np.array([random.random() < 0.1 for _ in text])
+        for text_mask in [None, mask]:
+            assert list(
+                iterate_occurences_with_dynamic_programming(
+                    pattern, text, max_mismatches, text_mask
+                )
+            ) == get_occurences_with_dynamic_programming(
+                pattern, text, max_mismatches, text_mask
+            )
+
+
+def test_iterate_occurences_with_dynamic_programming_stops_early():
+    text = "GACT" + "G" * 1_000_000
+    assert get_first_occurences(
+        iterate_occurences_with_dynamic_programming("ACT", text, 0), 1
+    ) == [1]
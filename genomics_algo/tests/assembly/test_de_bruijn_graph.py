@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from genomics_algo.assembly.de_bruijn_graph import DeBruijnGraph
+from genomics_algo.utilities.misc_utilities import get_frequency_map
+from genomics_algo.utilities.sequence_encoding import decode_kmer
+
+
+def _random_sequence(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("ACGT") for _ in range(length))
+
+
+def _tile_reads(genome: str, read_length: int, step: int):
+    return [
+        genome[start : start + read_length] for start in range(0, len(genome), step)
+    ]
+
+
+@pytest.mark.parametrize("k", [5, 17])
+def test_from_reads_counts_kmers(k):
+    rng = random.Random(33)
+    reads = [_random_sequence(rng, rng.randint(0, 40)) for _ in range(50)]
+    reads.append("ACGTNACGTACGTACGTAC")
+    graph = DeBruijnGraph.from_reads(reads, k, chunk_size=100)
+    expected = {}
+    for read in reads:
+        for kmer, count in get_frequency_map(read, k).items():
+            if "N" not in kmer:
+                expected[kmer] = expected.get(kmer, 0) + count
+    result = {
+        decode_kmer(kmer, k): abundance
+        for kmer, abundance in zip(graph.kmers, graph.abundances.tolist())
+    }
+    assert result == expected
+    assert graph.nbytes == len(graph) * (6 if k <= 16 else 10)
+
+
+def test_assemble_genome_from_error_free_reads():
+    rng = random.Random(34)
+    genome = _random_sequence(rng, 2000)
+    graph = DeBruijnGraph.from_reads(_tile_reads(genome, 50, 10), 21)
+    assert graph.get_unitigs() == [genome]
+    assert graph.assemble_eulerian() == genome
+
+
+def test_prune_removes_sequencing_errors():
+    rng = random.Random(35)
+    genome = _random_sequence(rng, 1000)
+    reads = _tile_reads(genome, 40, 5) * 2
+    erroneous = list(reads[10])
+    erroneous[20] = "A" if erroneous[20] != "A" else "C"
+    reads.append("".join(erroneous))
+    graph = DeBruijnGraph.from_reads(reads, 15)
+    assert len(graph.get_unitigs()) > 1
+    assert graph.assemble_eulerian() is None
+    pruned = graph.prune(2)
+    assert pruned.get_unitigs() == [genome]
+    assert DeBruijnGraph.from_reads(reads, 15, min_abundance=2).kmers.tolist() == (
+        pruned.kmers.tolist()
+    )
+
+
+def test_unitigs_of_branching_graph_and_cycles():
+    graph = DeBruijnGraph.from_reads(["AAACCC", "AAAGGG", "TCGTTCG"], 3)
+    unitigs = graph.get_unitigs()
+    # every k-mer belongs to exactly one unitig
+    kmers = sorted(
+        unitig[start : start + 3]
+        for unitig in unitigs
+        for start in range(len(unitig) - 2)
+    )
+    assert kmers == sorted(decode_kmer(kmer, 3) for kmer in graph.kmers)
+    # the self loops on AA, CC and GG end the unitigs entering them, and the
+    # isolated cycle through CG is spelled from its smallest k-mer
+    assert sorted(unitigs) == ["AAA", "AACC", "AAGG", "CCC", "CGTTCG", "GGG"]
+    assert graph.get_successors("AA") == ["AA", "AC", "AG"]
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from genomics_algo.assembly.overlap_graph import assemble_greedy, build_overlap_graph
+
+
+def _find_maximal_overlap(source: str, target: str, min_overlap: int) -> int:
+    for overlap_length in range(min(len(source) - 1, len(target)), min_overlap - 1, -1):
+        if source.endswith(target[:overlap_length]):
+            return overlap_length
+    return 0
+
+
+@pytest.mark.parametrize("min_overlap, seed_length", [(5, None), (8, 4), (3, 3)])
+def test_build_overlap_graph_matches_all_pairs(min_overlap, seed_length):
+    rng = random.Random(32)
+    genome = "".join(rng.choice("ACGT") for _ in range(300))
+    reads = [genome[start : start + rng.randint(15, 40)] for start in range(0, 280, 7)]
+    reads += ["".join(rng.choice("AC") for _ in range(20)) for _ in range(10)]
+    reads += ["ACGNNACGT", "", "AC"]
+    graph = build_overlap_graph(reads, min_overlap, seed_length)
+    expected = []
+    for source in range(len(reads)):
+        for target in range(len(reads)):
+            overlap_length = _find_maximal_overlap(
+                reads[source], reads[target], min_overlap
+            )
+            if source != target and overlap_length > 0:
+                expected.append((source, target, overlap_length))
+    assert sorted(graph.get_edges()) == expected
+    assert graph.number_of_reads == len(reads)
+    assert graph.number_of_edges == len(expected)
+
+
+def test_assemble_greedy():
+    rng = random.Random(33)
+    genome = "".join(rng.choice("ACGT") for _ in range(500))
+    reads = [genome[start : start + 50] for start in range(0, 451, 10)]
+    rng.shuffle(reads)
+    graph = build_overlap_graph(reads, 20)
+    targets, overlap_lengths = graph.get_successors(reads.index(genome[:50]))
+    assert overlap_lengths.max() == 40
+    assert assemble_greedy(reads, graph) == [genome]
@@ -0,0 +1,39 @@
+import json
+
+from genomics_algo.benchmarks.benchmark_suite import (
+    compare_benchmark_results,
+    generate_random_genome,
+    read_benchmark_results,
+    run_benchmarks,
+    write_benchmark_results,
+)
+from genomics_algo.cli import main
+
+
+def test_generate_random_genome_is_reproducible():
+    assert generate_random_genome(100, seed=1) == generate_random_genome(100, seed=1)
+    assert generate_random_genome(100, seed=1) != generate_random_genome(100, seed=2)
+    assert set(generate_random_genome(100, seed=1)) == {"A", "C", "G", "T"}
+
+
+def test_run_benchmarks(tmp_path):
+    results = run_benchmarks(genome_sizes=[300], number_of_reads=2, repeat=1)
+    engines = {result.engine for result in results}
+    assert {"naive", "boyer_moore", "kmer_index", "dynamic_programming"} <= engines
+    assert all(result.seconds >= 0 for result in results)
+    assert all(result.peak_memory_bytes > 0 for result in results)
+
+    filename = str(tmp_path / "results.json")
+    write_benchmark_results(results, filename)
+    assert read_benchmark_results(filename) == results
+    ratios = compare_benchmark_results(results, results)
+    assert all(ratio == 1 for ratio in ratios.values())
+
+
+def test_main_benchmark(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    argv = ["benchmark", "--sizes", "300", "--number-of-reads", "2", "--repeat", "1"]
+    assert main(argv + ["-o", str(output)]) == 0
+    assert json.loads(output.read_text())["metadata"]["seed"] == 0
+    assert main(argv + ["--compare", str(output)]) == 0
+    assert "x baseline time" in capsys.readouterr().out
@@ -1,6 +1,9 @@
+import random
+
 from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
     _get_alignments_skipped_gs_lookup,
     _get_alignments_skipped_bc_lookup,
+    _get_skip_tables,
 )
 
 
@@ -75,3 +78,22 @@ def test__get_alignments_skipped_bc_lookup():
         },
     }
     assert _get_alignments_skipped_bc_lookup(pattern=pattern) == expected_lookup
+
+
+def test__get_skip_tables_matches_lookups():
+    rng = random.Random(0)
+    for _ in range(2000):
+        pattern = "".join(
+            rng.choice("ACGT"[: rng.randint(1, 4)]) for _ in range(rng.randint(0, 14))
+        )
+        bc_lookup = _get_alignments_skipped_bc_lookup(pattern)
+        gs_lookup = _get_alignments_skipped_gs_lookup(pattern)
+        assert _get_skip_tables(pattern) == (
+            {
+                character: [
+                    char_lookup[pattern[:offset]] for offset in range(len(pattern))
+                ]
+                for character, char_lookup in sorted(bc_lookup.items())
+            },
+            [gs_lookup[pattern[offset + 1 :]] for offset in range(len(pattern))],
+        )
@@ -0,0 +1,24 @@
+import pytest
+
+from genomics_algo.exact_matching_algorithms.kmer_index import KmerIndex
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_naive_match,
+)
+from genomics_algo.utilities.read_files import read_genome
+
+
+@pytest.mark.parametrize("pattern", ["ATTA", "GATTACA", "TTTAAACCC", "AAAAAAAA", "G"])
+def test_kmer_index_get_occurences(pattern):
+    text = read_genome("genomics_algo/tests/test_data/genomes/phix.fa")
+    index = KmerIndex(text, 6)
+    assert index.get_occurences(pattern) == get_occurences_with_naive_match(
+        pattern, text
+    )
+
+
+def test_kmer_index_skips_n():
+    index = KmerIndex("ACGTNACGT", 3)
+    assert len(index) == 4
+    assert index.get_positions("ACG").tolist() == [0, 5]
+    assert index.get_positions("GTN").tolist() == []
+    assert index.get_occurences("TNA") == [3]
@@ -4,10 +4,18 @@ from genomics_algo.utilities.read_files import read_genome
 
 from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
     get_occurences_with_boyer_moore_exact_matching,
+    iterate_occurences_with_boyer_moore_exact_matching,
 )
+from genomics_algo.exact_matching_algorithms.match_statistics import MatchStatistics
 from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
     get_occurences_with_naive_match,
     get_occurences_with_exact_match_with_reverse_complement,
+    iterate_occurences_with_naive_match,
+)
+from genomics_algo.utilities.occurences import (
+    count_occurences,
+    get_first_occurences,
+    has_occurence,
 )
 
 
@@ -107,3 +115,74 @@ def test_get_occurences_with_exact_match_with_reverse_complement(exact_matching_
     )
     assert min(result) == 62
     assert len(result) == 60
+
+
+@pytest.mark.parametrize(
+    "exact_matching_algo",
+    [get_occurences_with_naive_match, get_occurences_with_boyer_moore_exact_matching],
+)
+def test_get_occurences_with_exact_match_statistics(exact_matching_algo):
+    text = read_genome("genomics_algo/tests/test_data/genomes/phix.fa")
+    pattern = "GATTACAGATTACA"
+    statistics = MatchStatistics()
+    result = exact_matching_algo(pattern, text, statistics=statistics)
+    assert result == exact_matching_algo(pattern, text)
+    len_alignments = len(text) - len(pattern) + 1
+    # every alignment is either tried or skipped by one of the rules, the last skip
+    # may move the pattern past the end of the text
+    alignments_covered = statistics.alignments + statistics.alignments_skipped
+    assert len_alignments <= alignments_covered < len_alignments + len(pattern)
+    assert statistics.character_comparisons >= statistics.alignments
+    assert statistics.scanning_seconds > 0
+    if exact_matching_algo is get_occurences_with_naive_match:
+        assert statistics.alignments_skipped == 0
+    else:
+        assert statistics.bad_character_skips > 0
+        assert statistics.good_suffix_skips > 0
+        assert statistics.preprocessing_seconds > 0
+
+    # counts accumulate over calls
+    first_call = statistics.as_dict()
+    exact_matching_algo(pattern, text, statistics=statistics)
+    assert statistics.alignments == 2 * first_call["alignments"]
+    assert statistics.alignments_skipped == 2 * first_call["alignments_skipped"]
+
+
+class _RecordingText(str):
+    """Text recording the largest index that was read"""
+
+    largest_index = -1
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            self.largest_index = max(self.largest_index, index)
+        return super().__getitem__(index)
+
+
+@pytest.mark.parametrize(
+    "exact_matching_algo, lazy_exact_matching_algo",
+    [
+        (get_occurences_with_naive_match, iterate_occurences_with_naive_match),
+        (
+            get_occurences_with_boyer_moore_exact_matching,
+            iterate_occurences_with_boyer_moore_exact_matching,
+        ),
+    ],
+)
+def test_iterate_occurences_with_exact_match(
+    exact_matching_algo, lazy_exact_matching_algo
+):
+    text = read_genome("genomics_algo/tests/test_data/genomes/phix.fa")
+    for pattern in ["ATTA", "GATTACA", "AAAAAAAA", "G"]:
+        occurences = exact_matching_algo(pattern, text)
+        assert list(lazy_exact_matching_algo(pattern, text)) == occurences
+        assert count_occurences(lazy_exact_matching_algo(pattern, text)) == len(
+            occurences
+        )
+        assert get_first_occurences(lazy_exact_matching_algo(pattern, text), 3) == (
+            occurences[:3]
+        )
+
+    text = _RecordingText("ACGT" + "A" * 1000)
+    assert has_occurence(lazy_exact_matching_algo("CG", text))
+    assert text.largest_index < 10
@@ -1,8 +1,13 @@
 import numpy as np
 import pytest
 
+from itertools import product
+
+from genomics_algo.utilities.misc_utilities import get_frequency_map, reverse_complement
 from genomics_algo.utilities.read_files import read_genome
+from genomics_algo.utilities.string_cmp import find_hamming_distance
 from genomics_algo.miscellaneous_algorithms.misc_algos import (
+    find_most_freq_k_substring,
     find_pattern_clumps,
     find_minimum_gc_skew_location,
     find_frequent_kmers_with_mismatches,
@@ -32,7 +37,15 @@ def test_find_pattern_clumps_short():
     assert patterns == {"TAC"}
 
 
-@pytest.mark.skip(reason="Takes 20-25 seconds in current implementation")
+def test_find_pattern_clumps_keeps_case():
+    text = "gatcagcataagggtccctgcaatgcatgacaagcctgcagttgttttac"
+    patterns = find_pattern_clumps(
+        text=text, substring_length=4, window_length=25, minimum_frequency=3
+    )
+    assert patterns == {"tgca"}
+    assert find_pattern_clumps(text.upper(), 4, 25, 3) == {"TGCA"}
+
+
 def test_find_pattern_clumps_long():
     text = "GACCTACCGTATACGCCGACGACTTACTACATGCATGTAC" * 100_000
     patterns = find_pattern_clumps(
@@ -72,6 +85,73 @@ def test_find_frequent_kmers_with_mismatches_benchmark():
     assert len(res) == 32855
 
 
+def test_find_frequent_kmers_with_mismatches_approximate():
+    res = find_frequent_kmers_with_mismatches(
+        "ACGTTGCAACGTTGCA", 12, 3, approximate=True
+    )
+    assert len(res) == 32855
+    genome = "ACGTTGCATGTCGCATGATGCATGAGAGCTACGTTGCAAGGT"
+    for k, d in [(4, 1), (5, 2), (3, 0)]:
+        assert find_frequent_kmers_with_mismatches(
+            genome, k, d, approximate=True, memory_bytes=128
+        ) == find_frequent_kmers_with_mismatches(genome, k, d)
+
+
+@pytest.mark.parametrize("memory_bytes", [32, 2**20])
+def test_find_most_freq_k_substring_approximate(memory_bytes):
+    rng = np.random.default_rng(35)
+    text = "".join(rng.choice(list("ACGT"), 3000)) + "GATTACA" * 4
+    for k in (1, 3, 7, 12):
+        assert find_most_freq_k_substring(
+            text, k, approximate=True, memory_bytes=memory_bytes
+        ) == find_most_freq_k_substring(text, k)
+
+
+def test_find_most_freq_k_substring_approximate_across_n_gaps():
+    # the gap spans whole chunks without any k-mer, and its substrings are skipped
+    text = "ACGTTGCA" * 200 + "N" * 5000 + "ACGTTGCA" * 200
+    assert find_most_freq_k_substring(
+        text, 4, approximate=True, memory_bytes=64000
+    ) == find_most_freq_k_substring(text.replace("N" * 5000, "N"), 4)
+
+
+def test_find_canonical_frequent_kmers_with_mismatches():
+    rng = np.random.default_rng(36)
+    genome = "".join(rng.choice(list("ACGT"), 60))
+    k, d = 4, 1
+    windows = [genome[i : i + k] for i in range(len(genome) - k + 1)]
+    # occurrences of a pattern plus those of its reverse complement, which is the
+    # pattern itself for palindromes
+    counts = {}
+    for pattern in map("".join, product("ACGT", repeat=k)):
+        canonical_pattern = min(pattern, reverse_complement(pattern))
+        counts[canonical_pattern] = counts.get(canonical_pattern, 0) + sum(
+            find_hamming_distance(window, pattern) <= d for window in windows
+        )
+    result = find_frequent_kmers_with_mismatches(genome, k, d, canonical=True)
+    assert result == {
+        pattern for pattern, count in counts.items() if count == max(counts.values())
+    }
+    assert result == find_frequent_kmers_with_mismatches(
+        genome, k, d, canonical=True, approximate=True, memory_bytes=64
+    )
+
+
+def test_find_most_freq_k_substring_canonical():
+    rng = np.random.default_rng(37)
+    text = "".join(rng.choice(list("ACGT"), 2000))
+    for k in (2, 5, 9):
+        substrings, frequency = find_most_freq_k_substring(text, k, canonical=True)
+        counts = get_frequency_map(text, k, canonical=True)
+        assert frequency == max(counts.values())
+        assert substrings == sorted(
+            kmer for kmer, count in counts.items() if count == frequency
+        )
+        assert (substrings, frequency) == find_most_freq_k_substring(
+            text, k, approximate=True, memory_bytes=32, canonical=True
+        )
+
+
 def test_find_frequent_kmers_with_mismatches():
     """Some debug datasets taken from:
     http://bioinformaticsalgorithms.com/data/debugdatasets/replication/FrequentWordsWithMismatchesProblem.pdf
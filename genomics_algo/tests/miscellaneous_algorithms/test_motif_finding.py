@@ -0,0 +1,129 @@
+import random
+
+import numpy as np
+import pytest
+
+from itertools import product
+
+from genomics_algo.miscellaneous_algorithms.motif_finding import (
+    create_profile,
+    find_median_strings,
+    find_motifs_greedy,
+    find_motifs_sampling,
+    find_profile_most_probable_kmer,
+    score_motifs,
+)
+from genomics_algo.utilities.sequence_encoding import encode_sequence
+from genomics_algo.utilities.string_cmp import find_hamming_distance
+
+SAMPLE_SEQUENCES = [
+    "CGCCCCTCTCGGGGGTGTTCAGTAAACGGCCA",
+    "GGGCGAGGTATGTGTAAGTGCCAAGGTGCCAG",
+    "TAGTACCGAGACCGAAAGAAGTATACAGGCGT",
+    "TAGATCAAGTTTCAGGTGCACGTCGGTGAACC",
+    "AATCCACCAGCTCCACGTGCAATGTTGGCCTA",
+]
+SAMPLE_MOTIFS = ["TCTCGGGG", "CCAAGGTG", "TACAGGCG", "TTCAGGTG", "TCCACGTG"]
+
+
+def _encode_motifs(motifs):
+    return np.stack([encode_sequence(motif) for motif in motifs])
+
+
+def _random_sequences(rng: random.Random, number_of_sequences: int, length: int):
+    return [
+        "".join(rng.choice("ACGT") for _ in range(length))
+        for _ in range(number_of_sequences)
+    ]
+
+
+def _find_motifs_greedy_reference(sequences, k, pseudocounts):
+    """Textbook greedy motif search with string operations"""
+    best_motifs = [sequence[:k] for sequence in sequences]
+    for start in range(len(sequences[0]) - k + 1):
+        motifs = [sequences[0][start : start + k]]
+        for sequence in sequences[1:]:
+            profile = create_profile(_encode_motifs(motifs), pseudocounts)
+            motifs.append(find_profile_most_probable_kmer(sequence, k, profile))
+        if score_motifs(_encode_motifs(motifs)) < score_motifs(
+            _encode_motifs(best_motifs)
+        ):
+            best_motifs = motifs
+    return best_motifs
+
+
+def test_find_median_strings():
+    rng = random.Random(37)
+    sequences = _random_sequences(rng, 6, 15)
+    distances = {
+        "".join(pattern): sum(
+            min(
+                find_hamming_distance("".join(pattern), sequence[i : i + 4])
+                for i in range(len(sequence) - 3)
+            )
+            for sequence in sequences
+        )
+        for pattern in product("ACGT", repeat=4)
+    }
+    best_distance = min(distances.values())
+    assert find_median_strings(sequences, 4) == (
+        sorted(
+            pattern
+            for pattern, distance in distances.items()
+            if distance == best_distance
+        ),
+        best_distance,
+    )
+
+
+@pytest.mark.parametrize("pseudocounts", [False, True])
+def test_find_motifs_greedy_matches_textbook_version(pseudocounts):
+    rng = random.Random(38)
+    for _ in range(5):
+        sequences = _random_sequences(rng, 6, 20)
+        expected = _find_motifs_greedy_reference(sequences, 5, pseudocounts)
+        motifs, score = find_motifs_greedy(sequences, 5, pseudocounts)
+        assert score == score_motifs(_encode_motifs(expected))
+        assert motifs == expected
+
+
+@pytest.mark.parametrize("method", ["randomized", "gibbs"])
+def test_find_motifs_sampling(method):
+    motifs, score = find_motifs_sampling(
+        SAMPLE_SEQUENCES,
+        8,
+        method,
+        number_of_restarts=1000 if method == "randomized" else 20,
+        number_of_iterations=200,
+        seed=0,
+    )
+    assert score == score_motifs(_encode_motifs(motifs))
+    assert score <= score_motifs(_encode_motifs(SAMPLE_MOTIFS))
+    assert all(motif in sequence for motif, sequence in zip(motifs, SAMPLE_SEQUENCES))
+
+
+def test_find_motifs_sampling_is_reproducible_across_processes():
+    rng = random.Random(39)
+    sequences = _random_sequences(rng, 10, 40)
+    results = [
+        find_motifs_sampling(sequences, 6, "gibbs", 4, 50, seed=1, processes=processes)
+        for processes in (1, 2)
+    ]
+    assert results[0] == results[1]
+    with pytest.raises(ValueError):
+        find_motifs_sampling(sequences, 6, "exhaustive")
+
+
+def test_find_implanted_motif():
+    rng = random.Random(40)
+    motif = "GATTACAGG"
+    sequences = []
+    for sequence in _random_sequences(rng, 20, 60):
+        start = rng.randrange(len(sequence) - len(motif))
+        sequences.append(sequence[:start] + motif + sequence[start + len(motif) :])
+    for motifs, _ in (
+        find_motifs_greedy(sequences, len(motif)),
+        find_motifs_sampling(sequences, len(motif), "randomized", 50, seed=2),
+        find_motifs_sampling(sequences, len(motif), "gibbs", 20, 300, seed=3),
+    ):
+        assert motifs == [motif] * len(sequences)
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from genomics_algo.miscellaneous_algorithms.orf_finder import (
+    OpenReadingFrame,
+    find_orfs,
+    iterate_orfs,
+)
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import iterate_genome_chunks, read_genome
+from genomics_algo.utilities.translation import translate
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+def _find_strand_orfs_naively(strand, min_protein_length):
+    """ORFs of the three frames of a strand, codon by codon, as (start, end, protein)
+    on that strand"""
+    orfs = []
+    for frame in range(3):
+        start = None
+        for i in range(frame, len(strand) - 2, 3):
+            codon = strand[i : i + 3]
+            if codon in ("TAA", "TAG", "TGA"):
+                if start is not None and (i - start) // 3 >= min_protein_length:
+                    orfs.append((start, i + 3, translate(strand[start:i])))
+                start = None
+            elif codon == "ATG" and start is None:
+                start = i
+    return orfs
+
+
+def _find_orfs_naively(genome, min_protein_length):
+    orfs = [
+        OpenReadingFrame(start, end, "+", protein)
+        for start, end, protein in _find_strand_orfs_naively(genome, min_protein_length)
+    ]
+    orfs += [
+        OpenReadingFrame(len(genome) - end, len(genome) - start, "-", protein)
+        for start, end, protein in _find_strand_orfs_naively(
+            reverse_complement(genome), min_protein_length
+        )
+    ]
+    return sorted(orfs)
+
+
+def _split(genome, rng, max_chunk_length):
+    chunks = []
+    i = 0
+    while i < len(genome):
+        length = rng.randint(1, max_chunk_length)
+        chunks.append(genome[i : i + length])
+        i += length
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_find_orfs_random(seed):
+    rng = random.Random(seed)
+    genome = "".join(rng.choice("ACGT" if seed % 3 else "ACGTN") for _ in range(600))
+    min_protein_length = rng.randint(0, 10)
+    expected = _find_orfs_naively(genome, min_protein_length)
+    assert find_orfs(genome, min_protein_length) == expected
+    chunks = _split(genome, rng, rng.choice([5, 50, 300]))
+    assert sorted(iterate_orfs(chunks, min_protein_length)) == expected
+
+
+def test_find_orfs_phix(tmp_path):
+    genome = read_genome(PHIX)
+    expected = _find_orfs_naively(genome, 50)
+    orfs = find_orfs(genome, 50)
+    assert orfs == expected
+    assert {orf.strand for orf in orfs} == {"+", "-"}
+    assert all(len(orf.protein) >= 50 for orf in orfs)
+    assert all(
+        translate(genome[orf.start : orf.end])[:-1] == orf.protein
+        for orf in orfs
+        if orf.strand == "+"
+    )
+    chunks = list(iterate_genome_chunks(PHIX, 1000))
+    assert "".join(chunks) == genome
+    assert all(len(chunk) >= 1000 for chunk in chunks[:-1])
+    assert sorted(iterate_orfs(chunks, 50)) == expected
+
+
+def test_find_orfs_edge_cases():
+    assert find_orfs("") == []
+    assert list(iterate_orfs([])) == []
+    assert find_orfs("ATGTAA", 0) == [OpenReadingFrame(0, 6, "+", "M")]
+    assert find_orfs("TTACAT", 0) == [OpenReadingFrame(0, 6, "-", "M")]
+    # no stop codon, so no ORF
+    assert find_orfs("ATGAAAAAA", 0) == []
@@ -0,0 +1,40 @@
+import pytest
+
+from genomics_algo.miscellaneous_algorithms.misc_algos import (
+    find_frequent_kmers_with_mismatches,
+    find_minimum_gc_skew_location,
+    find_pattern_clumps,
+)
+from genomics_algo.miscellaneous_algorithms.ori_finder import find_ori, get_ori_windows
+from genomics_algo.utilities.read_files import read_genome
+
+
+def test_get_ori_windows():
+    assert get_ori_windows([], 100, 10) == []
+    assert get_ori_windows([50], 100, 10) == [(45, 55, [50])]
+    assert get_ori_windows([2, 98], 100, 10) == [(0, 7, [2]), (93, 100, [98])]
+    assert get_ori_windows([50, 60], 100, 10) == [(45, 65, [50, 60])]
+
+
+def test_find_ori_matches_separate_searches():
+    genome = read_genome("genomics_algo/tests/test_data/genomes/vibrio_cholerae.txt")
+    result = find_ori(genome, window_length=500, max_mismatches=1)
+    assert result.skew_minima == [
+        location + 1 for location in find_minimum_gc_skew_location(genome)
+    ]
+    assert set(result.timings) == {"skew", "clumps", "dnaa_boxes"}
+    for candidate in result.candidates:
+        window = genome[candidate.start : candidate.end]
+        assert candidate.clumps == find_pattern_clumps(
+            window, 9, 500, 3, canonical=True
+        )
+        assert candidate.dnaa_boxes == find_frequent_kmers_with_mismatches(
+            window, 9, 1, canonical=True
+        )
+
+
+@pytest.mark.parametrize("canonical", [False, True])
+def test_find_pattern_clumps_canonical(canonical):
+    text = "AAGT" + "CCCC" + "ACTT"
+    patterns = find_pattern_clumps(text, 4, 12, 2, canonical=canonical)
+    assert patterns == ({"AAGT"} if canonical else set())
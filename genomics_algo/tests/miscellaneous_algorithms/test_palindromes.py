@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_naive_match,
+)
+from genomics_algo.miscellaneous_algorithms.palindromes import (
+    IUPAC_CODES,
+    RESTRICTION_SITES,
+    InvertedRepeat,
+    SiteOccurence,
+    expand_iupac,
+    find_inverted_repeats,
+    find_sites,
+    reverse_complement_iupac,
+)
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import read_genome
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+def _find_sites_naively(genome, sites):
+    def matches(site, position):
+        window = genome[position : position + len(site)]
+        return all(base in IUPAC_CODES[code] for base, code in zip(window, site))
+
+    occurences = []
+    for name, site in sites.items():
+        strands = [("+", site)]
+        if reverse_complement_iupac(site) != site:
+            strands.append(("-", reverse_complement_iupac(site)))
+        for strand, strand_site in strands:
+            occurences += [
+                SiteOccurence(position, name, strand)
+                for position in range(len(genome) - len(site) + 1)
+                if matches(strand_site, position)
+            ]
+    return sorted(occurences)
+
+
+def _find_inverted_repeats_naively(genome, min_arm, max_arm, min_spacer, max_spacer):
+    def pair(i, j):
+        return genome[i] in "ACGT" and reverse_complement(genome[j]) == genome[i]
+
+    repeats = []
+    for spacer in range(min_spacer, max_spacer + 1):
+        for arm_end in range(len(genome) - spacer - 1):
+            if spacer - 2 >= min_spacer and pair(arm_end + 1, arm_end + spacer):
+                continue
+            arm = 0
+            while (
+                arm < max_arm
+                and arm_end - arm >= 0
+                and arm_end + spacer + 1 + arm < len(genome)
+                and pair(arm_end - arm, arm_end + spacer + 1 + arm)
+            ):
+                arm += 1
+            if arm >= min_arm:
+                start = arm_end - arm + 1
+                end = arm_end + spacer + arm + 1
+                repeats.append(InvertedRepeat(start, end, arm, spacer))
+    return sorted(repeats)
+
+
+def test_iupac():
+    assert reverse_complement_iupac("ACGTRYSWKMBDHVN") == "NBDHVKMWSRYACGT"
+    assert len(expand_iupac("GCCNNNNNGGC")) == 4**5
+    with pytest.raises(ValueError):
+        expand_iupac("GAZTC")
+    with pytest.raises(ValueError):
+        find_sites("ACGT", {"site": ""})
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_sites_random(seed):
+    rng = random.Random(seed)
+    genome = "".join(rng.choice("ACGTN" if seed % 2 else "ACGT") for _ in range(2000))
+    sites = dict(RESTRICTION_SITES)
+    sites["BsaI"] = "GGTCTC"
+    sites["BglI"] = "GCCNNNNNGGC"
+    sites["degenerate"] = "".join(rng.choice("ACGTRYN") for _ in range(4))
+    assert find_sites(genome, sites) == _find_sites_naively(genome, sites)
+
+
+def test_find_sites_phix():
+    genome = read_genome(PHIX)
+    sites = {"concrete": "ACGTT", "HinfI": "GANTC", "palindrome": "ACGT"}
+    occurences = find_sites(genome, sites)
+    assert occurences == _find_sites_naively(genome, sites)
+    assert {occurence.strand for occurence in occurences} == {"+", "-"}
+    assert [
+        occurence.position for occurence in occurences if occurence.name == "concrete"
+    ] == sorted(
+        get_occurences_with_naive_match("ACGTT", genome)
+        + get_occurences_with_naive_match("AACGT", genome)
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_inverted_repeats_random(seed):
+    rng = random.Random(seed)
+    genome = "".join(rng.choice("ACGTN" if seed % 2 else "ACGT") for _ in range(500))
+    # plant a hairpin
+    arm = "".join(rng.choice("ACGT") for _ in range(8))
+    genome = genome[:200] + arm + "TTTT" + reverse_complement(arm) + genome[200:]
+    parameters = (3, 6, seed % 3, 8)
+    repeats = find_inverted_repeats(genome, *parameters)
+    assert repeats == _find_inverted_repeats_naively(genome, *parameters)
+    assert any(
+        repeat.start <= 202 and repeat.end >= 218 and repeat.spacer_length <= 4
+        for repeat in repeats
+    )
+
+
+def test_find_inverted_repeats_edge_cases():
+    assert find_inverted_repeats("") == []
+    assert find_inverted_repeats("ANNC", 1, 2, 0, 2) == []
+    assert find_inverted_repeats("AT", 1, 1, 0, 0) == [InvertedRepeat(0, 2, 1, 0)]
+    with pytest.raises(ValueError):
+        find_inverted_repeats("ACGT", 0)
+    with pytest.raises(ValueError):
+        find_inverted_repeats("ACGT", 2, 3, 4, 3)
@@ -0,0 +1,118 @@
+import random
+
+import numpy as np
+import pytest
+
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_naive_match,
+)
+from genomics_algo.read_mapping.coverage import (
+    CoverageAccumulator,
+    compute_coverage,
+    compute_read_pileup,
+)
+from genomics_algo.read_mapping.mapper import ReadHit, ReadMapper
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import read_genome
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+def _naive_coverage(starts, lengths, genome_length):
+    coverage = [0] * genome_length
+    for start, length in zip(starts, lengths):
+        for position in range(max(start, 0), min(start + length, genome_length)):
+            coverage[position] += 1
+    return coverage
+
+
+@pytest.mark.parametrize("number_of_hits", [0, 5, 500])
+def test_compute_coverage(number_of_hits):
+    rng = random.Random(number_of_hits)
+    starts = [rng.randint(-20, 120) for _ in range(number_of_hits)]
+    lengths = [rng.randint(0, 30) for _ in range(number_of_hits)]
+    assert compute_coverage(starts, lengths, 100).tolist() == _naive_coverage(
+        starts, lengths, 100
+    )
+
+
+def test_compute_coverage_of_matcher_occurences():
+    genome = read_genome(PHIX)
+    occurences = get_occurences_with_naive_match("ACGT", genome)
+    coverage = compute_coverage(occurences, 4, len(genome))
+    assert coverage.sum() == 4 * len(occurences)
+    assert coverage[occurences[0] : occurences[0] + 4].tolist() == [1, 1, 1, 1]
+
+
+def test_streaming_accumulation_matches_single_batch():
+    rng = np.random.default_rng(4)
+    genome = "".join(rng.choice(list("ACGT"), 1000))
+    starts = rng.integers(-10, 1000, 300)
+    reads = [genome[max(start, 0) : start + 50] for start in starts]
+    starts = np.maximum(starts, 0)
+
+    single = CoverageAccumulator(len(genome))
+    single.add_reads(starts, reads)
+    streamed = CoverageAccumulator(len(genome))
+    merged = CoverageAccumulator(len(genome))
+    for batch in range(3):
+        streamed.add_reads(starts[batch::3], reads[batch::3])
+        other = CoverageAccumulator(len(genome))
+        other.add_reads(starts[batch::3], reads[batch::3])
+        merged.merge(other)
+    for accumulator in (streamed, merged):
+        assert accumulator.number_of_hits == 300
+        assert np.array_equal(accumulator.get_coverage(), single.get_coverage())
+        assert np.array_equal(accumulator.pileup, single.pileup)
+    assert np.array_equal(single.pileup.sum(axis=1), single.get_coverage())
+    covered = single.get_coverage() > 0
+    consensus = single.get_consensus()
+    assert all(
+        base == (genome[i] if covered[i] else "N") for i, base in enumerate(consensus)
+    )
+
+
+def test_add_reads_with_gaps():
+    accumulator = CoverageAccumulator(10)
+    # read ACGGT aligned as AC-GT with an inserted G, and CTTA with a deletion
+    accumulator.add_reads([1, 4], ["ACGGT", "CTA"], ["2M1I2M", "2M1D1M"])
+    assert accumulator.get_coverage().tolist() == [0, 1, 1, 1, 2, 1, 1, 1, 0, 0]
+    assert accumulator.get_consensus() == "NACGCTNANN"
+    assert accumulator.pileup[4].tolist() == [0, 1, 0, 1, 0]
+
+
+def test_add_mapped_reads():
+    genome = read_genome(PHIX)
+    accumulator = CoverageAccumulator(len(genome))
+    read = genome[100:150]
+    accumulator.add_mapped_reads(
+        [read, reverse_complement(read), "ACGT"],
+        [[ReadHit(100, "+", 0, "50M")], [ReadHit(100, "-", 0, "50M")], []],
+    )
+    assert accumulator.number_of_hits == 2
+    assert accumulator.get_coverage()[100:150].tolist() == [2] * 50
+    assert accumulator.get_consensus(min_depth=2)[100:150] == read
+
+
+def test_compute_read_pileup(tmp_path):
+    genome = read_genome(PHIX)
+    rng = random.Random(44)
+    starts = [rng.randint(0, len(genome) - 60) for _ in range(50)]
+    with open(tmp_path / "reads.fastq", "w") as f:
+        for i, start in enumerate(starts):
+            read = genome[start : start + 60]
+            if i % 2 == 1:
+                read = reverse_complement(read)
+            f.write(f"@r{i}\n{read}\n+\n{'I' * 60}\n")
+
+    mapper = ReadMapper(genome, seed_length=10, max_mismatches=2)
+    accumulator = compute_read_pileup(mapper, str(tmp_path / "reads.fastq"), 7)
+    assert accumulator.number_of_hits == 50
+    assert accumulator.get_coverage().tolist() == _naive_coverage(
+        starts, [60] * 50, len(genome)
+    )
+    coverage_only = compute_read_pileup(
+        mapper, str(tmp_path / "reads.fastq"), 7, pileup=False
+    )
+    assert coverage_only.pileup is None
+    assert np.array_equal(coverage_only.get_coverage(), accumulator.get_coverage())
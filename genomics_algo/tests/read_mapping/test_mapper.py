@@ -0,0 +1,81 @@
+import io
+import random
+
+import pytest
+
+from genomics_algo.cli import main
+from genomics_algo.read_mapping.mapper import ReadHit, ReadMapper, map_reads
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import read_genome
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+@pytest.fixture
+def mapper():
+    return ReadMapper(read_genome(PHIX), seed_length=10, max_mismatches=2)
+
+
+def test_map_read_exact_on_both_strands(mapper):
+    read = mapper.genome[1000:1050]
+    assert mapper.map_read(read)[0] == ReadHit(1000, "+", 0, "50M")
+    assert mapper.map_read(reverse_complement(read))[0] == ReadHit(1000, "-", 0, "50M")
+
+
+def test_map_read_with_edits(mapper):
+    read = mapper.genome[2000:2060]
+    read = read[:10] + ("A" if read[10] != "A" else "C") + read[11:30] + read[31:]
+    hits = mapper.map_read(read)
+    assert hits[0].position == 2000
+    assert hits[0].strand == "+"
+    assert hits[0].edit_distance == 2
+
+
+def test_map_read_unmapped(mapper):
+    rng = random.Random(27)
+    read = "".join(rng.choice("ACGT") for _ in range(60))
+    assert mapper.map_read(read) == []
+
+
+def _write_fastq(path, reads):
+    with open(path, "w") as f:
+        for index, read in enumerate(reads):
+            f.write(f"@read{index} extra\n{read}\n+\n{'I' * len(read)}\n")
+
+
+def test_map_reads_tsv(tmp_path, mapper):
+    genome = mapper.genome
+    reads = [genome[100:150], reverse_complement(genome[3000:3050]), "ACGT" * 10]
+    _write_fastq(tmp_path / "reads.fastq", reads)
+    output = io.StringIO()
+    stats = map_reads(PHIX, str(tmp_path / "reads.fastq"), output, seed_length=10)
+    assert stats.reads == 3
+    assert stats.mapped_reads == 2
+    assert stats.reads_per_second > 0
+    assert output.getvalue().splitlines() == [
+        "read0\t+\t100\t0\t50M\t1",
+        "read1\t-\t3000\t0\t50M\t1",
+        "read2\t*\t*\t*\t*\t0",
+    ]
+
+
+def test_main_map_sam(tmp_path, capsys, mapper):
+    reads = [reverse_complement(mapper.genome[3000:3050])]
+    _write_fastq(tmp_path / "reads.fastq", reads)
+    output = tmp_path / "reads.sam"
+    argv = ["map", PHIX, str(tmp_path / "reads.fastq"), "-f", "sam", "-o", str(output)]
+    assert main(argv) == 0
+    assert "reads/sec" in capsys.readouterr().err
+    lines = output.read_text().splitlines()
+    assert lines[1] == "@SQ\tSN:gi|216019|gb|J02482.1|PX1CG\tLN:5386"
+    fields = lines[-1].split("\t")
+    assert fields[:6] == [
+        "read0",
+        "16",
+        "gi|216019|gb|J02482.1|PX1CG",
+        "3001",
+        "60",
+        "50M",
+    ]
+    assert fields[9] == mapper.genome[3000:3050]
+    assert fields[-1] == "NM:i:0"
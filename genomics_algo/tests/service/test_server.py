@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+
+import pytest
+
+from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
+    get_occurences_with_dynamic_programming,
+)
+from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
+    get_occurences_with_boyer_moore_exact_matching,
+)
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_exact_match_with_reverse_complement,
+)
+from genomics_algo.read_mapping.mapper import ReadHit, ReadMapper
+from genomics_algo.service.client import QueryClient
+from genomics_algo.service.server import QueryEngine, QueryServer
+from genomics_algo.utilities.read_files import read_genome
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+VIBRIO = "genomics_algo/tests/test_data/genomes/vibrio_cholerae.txt"
+
+
+@pytest.fixture(scope="module", params=[1, 2])
+def query_server(request):
+    query_server = QueryServer(
+        PHIX, port=0, workers=request.param, seed_length=10, max_mismatches=2
+    )
+    thread = threading.Thread(target=query_server.serve_forever, daemon=True)
+    thread.start()
+    yield query_server
+    query_server.shutdown()
+    query_server.server_close()
+
+
+@pytest.fixture
+def client(query_server):
+    with QueryClient(port=query_server.server_address[1]) as client:
+        yield client
+
+
+def _sample_patterns(genome, number_of_patterns, length, seed):
+    rng = random.Random(seed)
+    patterns = []
+    for _ in range(number_of_patterns):
+        start = rng.randint(0, len(genome) - length)
+        patterns.append(genome[start : start + length])
+    return patterns + ["ACGTTT", "GATTACA", "A" * length]
+
+
+def test_find_exact(client):
+    genome = read_genome(PHIX)
+    patterns = _sample_patterns(genome, 20, 15, 0)
+    assert client.find_exact(patterns) == [
+        get_occurences_with_boyer_moore_exact_matching(pattern, genome)
+        for pattern in patterns
+    ]
+    assert client.find_with_reverse_complement(patterns) == [
+        sorted(
+            get_occurences_with_exact_match_with_reverse_complement(
+                pattern, genome, get_occurences_with_boyer_moore_exact_matching
+            )
+        )
+        for pattern in patterns
+    ]
+
+
+def test_find_approximate(client):
+    genome = read_genome(PHIX)
+    mapper = ReadMapper(genome, seed_length=10, max_mismatches=2)
+    # without the patterns too short for approximate queries
+    patterns = _sample_patterns(genome, 10, 40, 1)[:-3] + ["A" * 40]
+    patterns[0] = patterns[0][:20] + "T" + patterns[0][21:]
+    assert client.find_approximate(patterns) == [
+        mapper.map_read(pattern) for pattern in patterns
+    ]
+    hits = client.find_approximate(patterns[:1], max_mismatches=0)
+    assert hits == [mapper.map_read(patterns[0], max_mismatches=0)]
+    # the best approximate hits are among the ends found by dynamic programming
+    window = genome[:2000]
+    pattern = window[1000:1030]
+    pattern = pattern[:10] + pattern[11:]
+    best_hit = client.find_approximate([pattern], 1)[0][0]
+    assert best_hit.edit_distance == 1
+    assert best_hit.position in get_occurences_with_dynamic_programming(
+        pattern, window, 1
+    )
+
+
+def test_find_approximate_without_seeding_guarantee(client):
+    genome = read_genome(PHIX)
+    # too short for seeds of 10 bases
+    pattern = "ATGTCTAA"
+    exact_positions = client.find_exact([pattern])[0]
+    assert exact_positions == [847, 1000, 2981]
+    hits = client.find_approximate([pattern], max_mismatches=0)[0]
+    assert [hit.position for hit in hits if hit.strand == "+"] == exact_positions
+    # two seeds, both with a substitution
+    pattern = genome[2000:2025]
+    pattern = pattern[:5] + ("A" if pattern[5] != "A" else "C") + pattern[6:]
+    pattern = pattern[:15] + ("A" if pattern[15] != "A" else "C") + pattern[16:]
+    assert 2000 in get_occurences_with_dynamic_programming(pattern, genome, 2)
+    hits = client.find_approximate([pattern], max_mismatches=2)[0]
+    assert ReadHit(2000, "+", 2, "25M") in hits
+    # seeds of 8 bases at least, so 24 bases with 2 mismatches
+    with pytest.raises(ValueError, match="at least 24 bases"):
+        client.find_approximate([pattern[:23]])
+
+
+def test_find_approximate_without_seeding_guarantee_is_fast():
+    genome = read_genome(VIBRIO)
+    engine = QueryEngine(genome)
+    rng = random.Random(3)
+    for _ in range(10):
+        start = rng.randrange(len(genome) - 32)
+        pattern = genome[start : start + 32]
+        pattern = pattern[:20] + ("A" if pattern[20] != "A" else "C") + pattern[21:]
+        query_start = time.perf_counter()
+        hits = engine.query(pattern, "approximate")
+        # the index of the shorter seeds is built by the first query only
+        assert time.perf_counter() - query_start < 2
+        assert ReadHit(start, "+", 1, "32M") in hits
+
+
+def test_status_and_errors(client, query_server):
+    status = client.get_status()
+    assert status["genome_length"] == len(read_genome(PHIX))
+    assert status["workers"] == query_server.workers
+    number_of_queries = status["number_of_queries"]
+    assert client.find_exact(["ACGT"]) != [[]]
+    assert client.get_status()["number_of_queries"] == number_of_queries + 1
+
+    for queries in (
+        [{"pattern": "ACGT", "mode": "fuzzy"}],
+        [{"mode": "exact"}],
+        [{"pattern": "ACGT", "mode": "approximate", "max_mismatches": -1}],
+        "ACGT",
+    ):
+        with pytest.raises(ValueError):
+            client.query(queries)
+    # the connection is still usable after an error
+    assert client.query([]) == []
+
+
+def test_concurrent_clients(query_server):
+    genome = read_genome(PHIX)
+    patterns = _sample_patterns(genome, 30, 12, 2)
+    expected = [
+        get_occurences_with_boyer_moore_exact_matching(pattern, genome)
+        for pattern in patterns
+    ]
+    results = [None] * 4
+
+    def run_client(i):
+        with QueryClient(port=query_server.server_address[1]) as client:
+            results[i] = client.find_exact(patterns)
+
+    threads = [threading.Thread(target=run_client, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 4
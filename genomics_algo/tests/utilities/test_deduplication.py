@@ -0,0 +1,151 @@
+import io
+import random
+
+from functools import partial
+
+import pytest
+
+from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
+    get_occurences_with_dynamic_programming,
+)
+from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
+    get_occurences_with_boyer_moore_exact_matching,
+)
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_exact_match_with_reverse_complement,
+)
+from genomics_algo.read_mapping.mapper import map_reads
+from genomics_algo.utilities.deduplication import (
+    MatchCache,
+    deduplicate_reads,
+    get_duplication_stats,
+    match_reads,
+)
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import read_genome
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+@pytest.fixture
+def genome():
+    return read_genome(PHIX)
+
+
+def _sample_reads(genome, number_of_reads, number_of_sequences, seed):
+    """Reads drawn from a few sequences of the genome, half of them reverse
+    complemented"""
+    rng = random.Random(seed)
+    starts = [rng.randint(0, len(genome) - 30) for _ in range(number_of_sequences)]
+    reads = []
+    for _ in range(number_of_reads):
+        read = genome[rng.choice(starts) :][:30]
+        reads.append(read if rng.random() < 0.5 else reverse_complement(read))
+    return reads
+
+
+def test_deduplicate_reads(genome):
+    reads = _sample_reads(genome, 200, 10, 0)
+    deduplicated = deduplicate_reads(reads)
+    assert len(deduplicated.sequences) == len(set(reads))
+    assert deduplicated.counts.sum() == 200
+    assert [deduplicated.sequences[i] for i in deduplicated.read_indices] == reads
+    assert not deduplicated.reverse_complemented.any()
+
+    deduplicated = deduplicate_reads(reads, reverse_complements=True)
+    assert len(deduplicated.sequences) == 10
+    for read, index, flipped in zip(
+        reads, deduplicated.read_indices, deduplicated.reverse_complemented
+    ):
+        sequence = deduplicated.sequences[index]
+        assert read == (reverse_complement(sequence) if flipped else sequence)
+
+
+def test_match_reads(genome):
+    genome = genome[:1000]
+    reads = _sample_reads(genome, 100, 5, 1)
+    calls = []
+
+    def match(read):
+        calls.append(read)
+        return get_occurences_with_dynamic_programming(read, genome, 1)
+
+    assert match_reads(reads, match) == [
+        get_occurences_with_dynamic_programming(read, genome, 1) for read in reads
+    ]
+    assert len(calls) == len(set(reads))
+
+    both_strands = partial(
+        get_occurences_with_exact_match_with_reverse_complement,
+        text=genome,
+        exact_matching_algo=get_occurences_with_boyer_moore_exact_matching,
+    )
+    results = match_reads(reads, both_strands, reverse_complements=True)
+    assert [sorted(result) for result in results] == [
+        sorted(both_strands(read)) for read in reads
+    ]
+
+
+def test_match_cache_across_batches(genome):
+    reads = _sample_reads(genome, 300, 20, 2)
+    cache = MatchCache(
+        partial(get_occurences_with_boyer_moore_exact_matching, text=genome), 50
+    )
+    results = []
+    for batch in range(3):
+        results += match_reads(reads[batch * 100 : (batch + 1) * 100], cache)
+    assert results == [
+        get_occurences_with_boyer_moore_exact_matching(read, genome) for read in reads
+    ]
+    assert cache.misses == len(set(reads))
+    assert len(cache) == len(set(reads))
+
+    small_cache = MatchCache(len, maxsize=2)
+    for read in ["A", "C", "A", "G", "C"]:
+        small_cache(read)
+    assert (small_cache.hits, small_cache.misses, len(small_cache)) == (1, 4, 2)
+
+
+def test_get_duplication_stats():
+    reads = ["ACGT", "ACGT", "ACGT", "ACGT", "GGCA", "TGCC", "TTTT"]
+    names = [
+        "M1:7:FC:1:1101:1000:1000 1:N:0:1",
+        "M1:7:FC:1:1101:1050:1080 1:N:0:1",
+        "M1:7:FC:1:1102:1000:1000 1:N:0:1",
+        "M1:7:FC:1:1101:5000:5000 1:N:0:1",
+        "M1:7:FC:1:1101:1010:1010 1:N:0:1",
+        "M1:7:FC:1:1101:1020:1000 1:N:0:1",
+        "SRR1.7",
+    ]
+    stats = get_duplication_stats(reads, names)
+    assert stats.number_of_reads == 7
+    assert stats.unique_sequences == 4
+    assert stats.duplicate_reads == 3
+    assert stats.optical_duplicates == 1
+    assert stats.pcr_duplicates == 2
+    assert stats.copy_number_histogram == {1: 3, 4: 1}
+    assert stats.duplication_rate == 3 / 7
+
+    stats = get_duplication_stats(reads, names, reverse_complements=True)
+    assert stats.duplicate_reads == 4
+    assert stats.optical_duplicates == 2
+    assert get_duplication_stats([]).duplication_rate == 0.0
+
+
+def test_map_reads_with_result_cache(tmp_path, genome):
+    reads = _sample_reads(genome, 40, 4, 3)
+    with open(tmp_path / "reads.fastq", "w") as f:
+        for i, read in enumerate(reads):
+            f.write(f"@r{i}\n{read}\n+\n{'I' * len(read)}\n")
+    outputs = []
+    for result_cache_size in (0, 2):
+        output = io.StringIO()
+        map_reads(
+            PHIX,
+            str(tmp_path / "reads.fastq"),
+            output,
+            seed_length=10,
+            result_cache_size=result_cache_size,
+        )
+        outputs.append(output.getvalue())
+    assert outputs[0] == outputs[1]
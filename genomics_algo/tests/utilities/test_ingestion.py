@@ -0,0 +1,175 @@
+import gzip
+import shutil
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from genomics_algo.cli import main
+from genomics_algo.utilities import ingestion
+from genomics_algo.utilities.ingestion import (
+    SequenceFile,
+    compute_read_qc,
+    run_ingestion_pipeline,
+)
+from genomics_algo.utilities.read_files import (
+    open_text_file,
+    read_fastq,
+    read_genome,
+)
+from genomics_algo.utilities.seq_read_qualities_processing import (
+    get_freq_for_qualities,
+)
+from genomics_algo.utilities.seq_reads_processing import (
+    find_GC_by_position,
+    get_base_freq,
+)
+
+FASTQ = "genomics_algo/tests/test_data/reads/SRR835775_1.first1000.fastq"
+GENOME = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+def count_reads(sequence_file: SequenceFile) -> int:
+    return len(sequence_file.reads)
+
+
+@pytest.fixture
+def filenames(tmp_path):
+    """The test reads, some of the copies gzipped, and a genome"""
+    filenames = []
+    for i in range(5):
+        filename = str(tmp_path / f"reads_{i}.fastq")
+        if i % 2 == 1:
+            filename += ".gz"
+            with open(FASTQ, "rb") as source, gzip.open(filename, "wb") as target:
+                shutil.copyfileobj(source, target)
+        else:
+            shutil.copy(FASTQ, filename)
+        filenames.append(filename)
+    return filenames + [GENOME]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_ingestion_pipeline(filenames, processes):
+    results = list(
+        run_ingestion_pipeline(
+            filenames, processes=processes, reader_threads=3, max_queued_files=1
+        )
+    )
+    assert [filename for filename, _ in results] == filenames
+
+    reads, qualities = read_fastq(FASTQ)
+    for _, qc in results[:-1]:
+        assert qc.number_of_reads == 1000
+        assert qc.base_frequencies == dict(get_base_freq(reads))
+        assert np.array_equal(qc.gc_by_position, find_GC_by_position(reads))
+        assert (qc.quality_values, qc.quality_frequencies) == get_freq_for_qualities(
+            qualities
+        )
+    genome_qc = results[-1][1]
+    assert genome_qc.number_of_reads == 1
+    assert genome_qc.base_frequencies == dict(get_base_freq([read_genome(GENOME)]))
+    assert genome_qc.gc_by_position is None
+    assert genome_qc.mean_quality == 0.0
+
+
+def test_run_ingestion_pipeline_with_custom_compute(filenames):
+    assert list(run_ingestion_pipeline(filenames, count_reads, processes=2)) == [
+        (filename, 1) if filename == GENOME else (filename, 1000)
+        for filename in filenames
+    ]
+
+
+def test_run_ingestion_pipeline_raises(filenames, tmp_path):
+    missing = str(tmp_path / "missing.fastq")
+    with pytest.raises(FileNotFoundError):
+        list(run_ingestion_pipeline(filenames + [missing], processes=1))
+
+
+def test_run_ingestion_pipeline_raises_parsing_errors(filenames, monkeypatch):
+    def parse_sequence_file(filename, text):
+        if filename == filenames[2]:
+            raise ValueError("Invalid file")
+        return SequenceFile(filename, [text], [])
+
+    monkeypatch.setattr(ingestion, "parse_sequence_file", parse_sequence_file)
+    with pytest.raises(ValueError, match="Invalid file"):
+        list(run_ingestion_pipeline(filenames, count_reads, processes=1))
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    """Thread pool recording the largest number of files computed at once"""
+
+    def __init__(self, processes):
+        super().__init__(processes)
+        self.lock = threading.Lock()
+        self.computing = 0
+        self.max_computing = 0
+
+    def submit(self, function, *args):
+        with self.lock:
+            self.computing += 1
+            self.max_computing = max(self.max_computing, self.computing)
+        future = super().submit(function, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self.lock:
+            self.computing -= 1
+
+
+def test_run_ingestion_pipeline_bounds_files_computed(filenames, monkeypatch):
+    executors = []
+
+    def create_executor(processes):
+        executors.append(_CountingExecutor(processes))
+        return executors[-1]
+
+    def open_slowly(filename):
+        # the first file is read last, so the later ones cannot be yielded meanwhile
+        if filename == filenames[0]:
+            time.sleep(0.5)
+        return open_text_file(filename)
+
+    def count_reads_slowly(sequence_file):
+        time.sleep(0.05)
+        return count_reads(sequence_file)
+
+    monkeypatch.setattr(ingestion, "ProcessPoolExecutor", create_executor)
+    monkeypatch.setattr(ingestion, "open_text_file", open_slowly)
+    results = run_ingestion_pipeline(
+        filenames * 3,
+        count_reads_slowly,
+        processes=4,
+        reader_threads=2,
+        max_queued_files=2,
+    )
+    assert [filename for filename, _ in results] == filenames * 3
+    assert executors[0].max_computing == 2
+
+
+def test_run_ingestion_pipeline_stops_early(filenames):
+    results = run_ingestion_pipeline(filenames * 4, count_reads, processes=1)
+    assert next(results) == (filenames[0], 1000)
+    results.close()
+
+
+def test_compute_read_qc_of_reads_of_different_lengths():
+    qc = compute_read_qc(SequenceFile("reads.fastq", ["ACGT", "GC"], ["IIII", "II"]))
+    assert qc.gc_by_position is None
+    assert qc.gc_content == 4 / 6
+    assert qc.mean_quality == 40.0
+
+
+def test_qc_command(filenames, capsys):
+    assert main(["qc", *filenames[:2], "--processes", "1"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split("\t") == ["file", "reads", "gc_content", "mean_quality"]
+    assert [line.split("\t")[:2] for line in lines[1:]] == [
+        [filenames[0], "1000"],
+        [filenames[1], "1000"],
+    ]
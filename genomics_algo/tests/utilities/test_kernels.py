@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
+    get_occurences_with_dynamic_programming,
+)
+from genomics_algo.miscellaneous_algorithms.misc_algos import (
+    find_minimum_gc_skew_location,
+)
+from genomics_algo.utilities import kernels
+from genomics_algo.utilities.string_cmp import (
+    find_hamming_distance,
+    find_levenshtein_distance,
+)
+
+
+def _random_sequence(rng, length, alphabet="ACGT"):
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def _run_with_backends(monkeypatch, function, *args):
+    """Results of `function` with the pure Python implementation and with the
+    kernels, compiled if Numba is installed and interpreted otherwise"""
+    results = []
+    for backend in kernels.BACKENDS:
+        monkeypatch.setattr(kernels, "BACKEND", backend)
+        result = function(*args)
+        results.append(result.tolist() if isinstance(result, np.ndarray) else result)
+    return results
+
+
+def test_backend_selection():
+    assert kernels.BACKEND in kernels.BACKENDS
+    if kernels.numba is None:
+        assert kernels.BACKEND == "python"
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_string_distances_parity(monkeypatch, seed):
+    rng = random.Random(seed)
+    s1 = _random_sequence(rng, rng.randint(0, 30), "ACGTé")
+    s2 = _random_sequence(rng, rng.randint(0, 30), "ACGTé")
+    python_distance, kernel_distance = _run_with_backends(
+        monkeypatch, find_levenshtein_distance, s1, s2
+    )
+    assert python_distance == kernel_distance
+    assert isinstance(kernel_distance, int)
+    s2 = _random_sequence(rng, len(s1), "ACGTé")
+    python_distance, kernel_distance = _run_with_backends(
+        monkeypatch, find_hamming_distance, s1, s2
+    )
+    assert python_distance == kernel_distance
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_dynamic_programming_parity(monkeypatch, seed):
+    rng = random.Random(seed)
+    text = _random_sequence(rng, rng.randint(10, 200), "ACGT"[: rng.randint(2, 4)])
+    start = rng.randint(0, len(text) - 1)
+    pattern = text[start : start + rng.randint(1, 10)]
+    if rng.random() < 0.5:
+        pattern = _random_sequence(rng, len(pattern))
+    mask = np.array([rng.random() < 0.1 for _ in text]) if seed % 2 else None
+    for max_mismatches in range(3):
+        python_occurences, kernel_occurences = _run_with_backends(
+            monkeypatch,
+            get_occurences_with_dynamic_programming,
+            pattern,
+            text,
+            max_mismatches,
+            mask,
+        )
+        assert python_occurences == kernel_occurences
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_minimum_gc_skew_parity(monkeypatch, seed):
+    rng = random.Random(seed)
+    genome = _random_sequence(rng, rng.randint(0, 300), "ACGT"[: rng.randint(1, 4)])
+    python_locations, kernel_locations = _run_with_backends(
+        monkeypatch, find_minimum_gc_skew_location, genome
+    )
+    assert python_locations == kernel_locations
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from genomics_algo.utilities.kmer_counting import (
+    BloomFilter,
+    CountMinSketch,
+    count_frequent_kmers,
+    count_kmers,
+    iterate_kmer_chunks,
+)
+from genomics_algo.utilities.misc_utilities import get_frequency_map, reverse_complement
+from genomics_algo.utilities.sequence_encoding import decode_kmer
+
+
+def _random_reads(rng, number_of_reads, read_length):
+    return [
+        "".join(rng.choice(list("ACGT"), read_length)) for _ in range(number_of_reads)
+    ]
+
+
+def test_count_kmers_across_chunks():
+    rng = np.random.default_rng(33)
+    reads = _random_reads(rng, 200, 30)
+    codes, counts = count_kmers(reads, 5, chunk_size=1_000_000)
+    chunked_codes, chunked_counts = count_kmers(reads, 5, chunk_size=50)
+    assert chunked_codes.tolist() == codes.tolist()
+    assert chunked_counts.tolist() == counts.tolist()
+    assert counts.sum() == 200 * 26
+
+
+def test_bloom_filter_and_count_min_sketch_never_underestimate():
+    rng = np.random.default_rng(34)
+    kmers = rng.integers(0, 2**40, 5000).astype(np.uint64)
+    bloom_filter = BloomFilter(1000, 3)
+    bloom_filter.add(kmers[:2500])
+    assert bloom_filter.contains(kmers[:2500]).all()
+    sketch = CountMinSketch(100, 4)
+    counts = rng.integers(1, 10, 5000)
+    sketch.add(kmers, counts)
+    assert (sketch.estimate(kmers) >= counts).all()
+
+
+def test_count_frequent_kmers_is_exact_for_small_budgets():
+    rng = np.random.default_rng(35)
+    genome = "".join(rng.choice(list("ACGT"), 500))
+    starts = rng.integers(0, 450, 300)
+    reads = [genome[start : start + 50] for start in starts]
+    # singletons stemming from sequencing errors
+    reads += _random_reads(rng, 100, 50)
+    codes, counts = count_kmers(reads, 11)
+    for memory_bytes in (16, 256, 2**16):
+        get_chunks = lambda: iterate_kmer_chunks(reads, 11, chunk_size=1000)
+        frequent_codes, frequent_counts = count_frequent_kmers(
+            get_chunks, 3, memory_bytes
+        )
+        assert frequent_codes.tolist() == codes[counts >= 3].tolist()
+        assert frequent_counts.tolist() == counts[counts >= 3].tolist()
+        top_codes, top_counts = count_frequent_kmers(get_chunks, None, memory_bytes)
+        assert top_codes.tolist() == codes[counts == counts.max()].tolist()
+        assert top_counts.tolist() == [counts.max()] * len(top_codes)
+
+
+@pytest.mark.parametrize("k", [1, 4, 16, 17, 32])
+def test_count_kmers_canonical(k):
+    rng = np.random.default_rng(36)
+    reads = _random_reads(rng, 50, 40) + ["ACGTNNACGT"]
+    expected = {}
+    for read in reads:
+        for kmer, count in get_frequency_map(read, k).items():
+            if "N" not in kmer:
+                canonical_kmer = min(kmer, reverse_complement(kmer))
+                expected[canonical_kmer] = expected.get(canonical_kmer, 0) + count
+    codes, counts = count_kmers(reads, k, chunk_size=300, canonical=True)
+    assert {
+        decode_kmer(code, k): count for code, count in zip(codes, counts.tolist())
+    } == expected
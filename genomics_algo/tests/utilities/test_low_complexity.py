@@ -0,0 +1,104 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from genomics_algo.approximate_matching_algorithms.dynamic_programming import (
+    get_occurences_with_dynamic_programming,
+)
+from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
+    get_occurences_with_boyer_moore_exact_matching,
+)
+from genomics_algo.exact_matching_algorithms.kmer_index import KmerIndex
+from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    get_occurences_with_naive_match,
+)
+from genomics_algo.utilities.low_complexity import (
+    find_low_complexity_mask,
+    get_dust_scores,
+    get_entropy_scores,
+    get_masked_intervals,
+    mask_sequence,
+)
+from genomics_algo.utilities.kmer_counting import count_kmers
+from genomics_algo.utilities.sequence_encoding import encode_sequence
+
+
+def _get_dust_scores_by_window(sequence, window_length):
+    if len(sequence) == 0:
+        return []
+    window_length = min(window_length, len(sequence))
+    number_of_triplets = window_length - 2
+    scores = []
+    for start in range(len(sequence) - window_length + 1):
+        counts = Counter(
+            sequence[index : index + 3]
+            for index in range(start, start + number_of_triplets)
+            if "N" not in sequence[index : index + 3]
+        )
+        pairs = sum(count * (count - 1) // 2 for count in counts.values())
+        scores.append(pairs / (number_of_triplets - 1) if number_of_triplets > 1 else 0)
+    return scores
+
+
+@pytest.mark.parametrize("bases", ["ACGT", "AT", "ACGTN"])
+def test_get_dust_scores(bases):
+    random.seed(len(bases))
+    for _ in range(50):
+        sequence = "".join(random.choices(bases, k=random.randint(0, 100)))
+        window_length = random.randint(3, 40)
+        np.testing.assert_allclose(
+            get_dust_scores(encode_sequence(sequence), window_length),
+            _get_dust_scores_by_window(sequence, window_length),
+        )
+
+
+def test_get_entropy_scores():
+    codes = encode_sequence("ACGT" * 4 + "N" * 4)
+    np.testing.assert_allclose(get_entropy_scores(codes, 4)[:13], 2.0)
+    assert get_entropy_scores(codes, 4)[-1] == 2.0
+    assert get_entropy_scores(encode_sequence("A" * 10), 64).tolist() == [0.0]
+
+
+@pytest.mark.parametrize("method", ["dust", "entropy"])
+def test_find_low_complexity_mask(method):
+    random.seed(0)
+    left = "".join(random.choices("ACGT", k=500))
+    right = "".join(random.choices("ACGT", k=500))
+    for repeat in ["A" * 100, "AT" * 50]:
+        mask = find_low_complexity_mask(left + repeat + right, method)
+        intervals = get_masked_intervals(mask)
+        assert len(intervals) == 1
+        start, end = intervals[0]
+        assert start <= 500 and end >= 600
+        assert end - start < 100 + 2 * 64
+
+
+def test_find_low_complexity_mask_raises():
+    with pytest.raises(ValueError):
+        find_low_complexity_mask("ACGT", "repeats")
+
+
+def test_matchers_skip_masked_regions():
+    random.seed(1)
+    text = "".join(random.choices("ACGT", k=200)) + "A" * 100
+    text += "".join(random.choices("ACGT", k=100)) + "ACGTTGCA"
+    mask = find_low_complexity_mask(text)
+    assert get_occurences_with_naive_match("AAAAAAAA", text, mask=mask) == []
+    assert (
+        get_occurences_with_boyer_moore_exact_matching("AAAAAAAA", text, mask=mask)
+        == []
+    )
+    assert KmerIndex(text, 4, mask).get_occurences("AAAAAAAA") == []
+    assert get_occurences_with_dynamic_programming("AAAAAAAA", text, 1, mask) == []
+    assert get_occurences_with_dynamic_programming("ACGTTGCA", text, 0, mask) == [400]
+    assert len(get_occurences_with_naive_match("AAAAAAAA", text)) > 90
+
+
+def test_mask_sequence_skips_kmers():
+    text = "ACGTACGT"
+    mask = np.zeros(len(text), dtype=bool)
+    mask[3] = True
+    kmers, counts = count_kmers([mask_sequence(text, mask)], 3)
+    assert counts.sum() == 3
@@ -21,9 +21,17 @@ def test_generate_artificial_reads():
         genome=genome, number_of_reads=number_of_reads, read_length=read_length
     )
 
+    assert len(reads) == number_of_reads
     for read in reads:
+        assert len(read) == read_length
         assert read in genome
 
+    reads = generate_artificial_reads(genome, 20, len(genome), seed=1)
+    assert reads == [genome] * 20
+    assert generate_artificial_reads(genome, 5, 7, seed=2) == generate_artificial_reads(
+        genome, 5, 7, seed=2
+    )
+
 
 def test_get_frequency_map():
     with pytest.raises(AssertionError):
@@ -32,3 +40,22 @@ def test_get_frequency_map():
         get_frequency_map("GTACGTACC", 0)
     with pytest.raises(AssertionError):
         get_frequency_map("GTACGTACC", -2)
+
+
+@pytest.mark.parametrize("memory_bytes", [64, 1024, 2**20])
+def test_get_frequency_map_approximate(memory_bytes):
+    text = "".join(generate_artificial_reads("ACGTTGCAGGTACCAT" * 20, 40, 30, seed=0))
+    for min_frequency in (2, 5):
+        expected = get_frequency_map(text, 6, min_frequency=min_frequency)
+        result = get_frequency_map(
+            text,
+            6,
+            min_frequency=min_frequency,
+            approximate=True,
+            memory_bytes=memory_bytes,
+        )
+        assert result == expected
+    with pytest.raises(ValueError):
+        get_frequency_map(text, 6, approximate=True)
+    # no k-mer at all
+    assert get_frequency_map("ACGT", 5, min_frequency=2, approximate=True) == {}
@@ -0,0 +1,133 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from genomics_algo.utilities import profiling
+from genomics_algo.utilities.profiling import (
+    MetricsRegistry,
+    profile_section,
+    profiled,
+)
+from genomics_algo.utilities.read_files import read_genome
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+def _count_bases(genome, base="A"):
+    return genome.count(base)
+
+
+def test_disabled_profiling_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING", None)
+    registry = MetricsRegistry()
+    assert profiled(_count_bases, registry=registry) is _count_bases
+    with profile_section("section", 10, registry):
+        pass
+    assert registry.names() == []
+
+
+@pytest.mark.parametrize("mode", profiling.PROFILING_MODES)
+def test_profiled_function(monkeypatch, mode):
+    monkeypatch.setattr(profiling, "PROFILING", mode)
+    registry = MetricsRegistry()
+    count_bases = profiled(_count_bases, name="count_bases", registry=registry)
+    assert count_bases.__name__ == "_count_bases"
+    assert count_bases("AACG") == 2
+    assert count_bases(genome="ACGTT", base="T") == 2
+    metrics = registry["count_bases"]
+    assert metrics.calls == 2
+    assert metrics.total_input_size == 4 + 5 + 1
+    assert metrics.max_input_size == 6
+    assert metrics.wall_seconds >= 0 and metrics.cpu_seconds >= 0
+
+    @profiled(name="allocate", registry=registry)
+    def allocate(size):
+        with profile_section("allocate.inner", registry=registry):
+            inner = np.ones(size // 2, dtype=np.uint8)
+        return np.ones(size, dtype=np.uint8).sum() + inner.sum()
+
+    assert allocate(1_000_000) == 1_500_000
+    assert registry.names() == [
+        "allocate",
+        "allocate.inner",
+        "count_bases",
+    ]
+    if mode == "memory" and sys.version_info >= (3, 9):
+        assert 500_000 <= registry["allocate.inner"].peak_memory_bytes < 1_000_000
+        assert registry["allocate"].peak_memory_bytes >= 1_000_000
+    elif mode == "time":
+        assert registry["allocate"].peak_memory_bytes == 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_registry_threads_and_json(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILING", "time")
+    registry = MetricsRegistry()
+    count_bases = profiled(_count_bases, name="count", registry=registry)
+
+    def run():
+        for _ in range(1000):
+            count_bases("ACGT")
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry["count"].calls == 4000
+    filename = str(tmp_path / "metrics.json")
+    registry.dump(filename)
+    with open(filename) as f:
+        metrics = json.load(f)
+    assert list(metrics) == ["count"]
+    assert metrics["count"]["calls"] == 4000
+    assert metrics["count"]["total_input_size"] == 16000
+    registry.reset()
+    assert "count" not in registry
+
+
+def test_profiling_from_environment(tmp_path):
+    output = str(tmp_path / "metrics.json")
+    script = (
+        "from genomics_algo.utilities.read_files import read_genome\n"
+        "from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching "
+        "import get_occurences_with_boyer_moore_exact_matching\n"
+        f"genome = read_genome({PHIX!r})\n"
+        "get_occurences_with_boyer_moore_exact_matching('ACGT', genome)\n"
+    )
+    environment = dict(
+        os.environ,
+        GENOMICS_ALGO_PROFILE="time",
+        GENOMICS_ALGO_PROFILE_OUTPUT=output,
+    )
+    subprocess.run([sys.executable, "-c", script], env=environment, check=True)
+    with open(output) as f:
+        metrics = json.load(f)
+    assert metrics["utilities.read_files.read_genome"]["calls"] == 1
+    matching = "exact_matching_algorithms.boyer_moore_exact_matching."
+    assert metrics[matching + "_get_skip_tables"]["total_input_size"] == 4
+    genome_length = len(read_genome(PHIX))
+    metrics = metrics[matching + "get_occurences_with_boyer_moore_exact_matching"]
+    assert metrics["max_input_size"] == 4 + genome_length
+
+
+def test_memory_profiling_leaves_other_tracemalloc_users_alone(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING", "memory")
+    registry = MetricsRegistry()
+    allocate = profiled(np.ones, name="ones", registry=registry)
+    tracemalloc.start()
+    try:
+        allocate(1_000_000)
+        _, peak = tracemalloc.get_traced_memory()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert peak >= 1_000_000
+    assert registry["ones"].calls == 1
+    assert registry["ones"].peak_memory_bytes == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from genomics_algo.cli import main
+from genomics_algo.utilities.read_cache import ReadCache, write_read_cache
+from genomics_algo.utilities.read_files import iterate_fastq, read_fastq
+from genomics_algo.utilities.seq_read_qualities_processing import (
+    get_freq_for_qualities,
+)
+from genomics_algo.utilities.seq_reads_processing import (
+    find_GC_by_position,
+    get_base_freq,
+)
+
+FASTQ = "genomics_algo/tests/test_data/reads/SRR835775_1.first1000.fastq"
+
+
+@pytest.fixture
+def read_cache(tmp_path):
+    write_read_cache(FASTQ, str(tmp_path / "reads.rcache"), batch_size=333)
+    return ReadCache(str(tmp_path / "reads.rcache"))
+
+
+def test_read_cache_round_trip(read_cache):
+    reads, qualities = read_fastq(FASTQ)
+    assert len(read_cache) == 1000
+    assert read_cache.get_reads() == reads
+    assert read_cache.get_qualities() == qualities
+    assert read_cache.get_names() == [record[0] for record in iterate_fastq(FASTQ)]
+    assert read_cache.get_reads(331, 335) == reads[331:335]
+    assert read_cache.get_qualities(999, 2000) == qualities[999:]
+    assert read_cache.get_reads(5, 5) == []
+
+
+def test_read_cache_is_memory_mapped(read_cache):
+    quality_bytes, offsets = read_cache.get_quality_bytes(10, 20)
+    assert isinstance(quality_bytes, np.memmap)
+    assert offsets.tolist() == list(range(0, 1001, 100))
+
+
+def test_read_cache_keeps_n(tmp_path):
+    fastq = tmp_path / "reads.fastq"
+    fastq.write_text(
+        "@r1\nNACGT\n+\nIIIII\n@r2 x\nACGN\n+\nIIII\n@r3\nTTTTTTN\n+\n#######\n"
+    )
+    write_read_cache(str(fastq), str(tmp_path / "reads.rcache"), batch_size=2)
+    read_cache = ReadCache(str(tmp_path / "reads.rcache"))
+    assert read_cache.get_reads() == ["NACGT", "ACGN", "TTTTTTN"]
+    assert read_cache.get_names() == ["r1", "r2 x", "r3"]
+    assert read_cache.get_read_lengths().tolist() == [5, 4, 7]
+
+
+def test_write_read_cache_raises(tmp_path):
+    fastq = tmp_path / "reads.fastq"
+    fastq.write_text("@r1\nACGT\n+\nIII\n")
+    with pytest.raises(ValueError):
+        write_read_cache(str(fastq), str(tmp_path / "reads.rcache"))
+    with pytest.raises(ValueError):
+        ReadCache(str(fastq))
+
+
+def test_qc_functions_with_read_cache(read_cache):
+    reads, qualities = read_fastq(FASTQ)
+    np.testing.assert_array_equal(
+        find_GC_by_position(read_cache), find_GC_by_position(reads)
+    )
+    assert get_base_freq(read_cache) == get_base_freq(reads)
+    assert get_freq_for_qualities(read_cache) == get_freq_for_qualities(qualities)
+
+
+def test_cli_cache(tmp_path):
+    assert main(["cache", FASTQ, str(tmp_path / "reads.rcache")]) == 0
+    assert len(ReadCache(str(tmp_path / "reads.rcache"))) == 1000
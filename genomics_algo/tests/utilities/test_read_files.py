@@ -1,6 +1,14 @@
+import gzip
+import shutil
+import threading
+
+import pytest
+
 from genomics_algo.utilities.read_files import (
     read_genome,
     read_fastq,
+    iterate_fastq,
+    iterate_paired_fastq,
 )
 
 
@@ -23,3 +31,62 @@ def test_read_fastq():
         qualities[0]
         == "???B1ADDD8??BB+C?B+:AA883CEE8?C3@DDD3)?D2;DC?8?=BAD=@C@(.6.6=A?=?@##################################"
     )
+
+
+def test_iterate_fastq():
+    filename = "genomics_algo/tests/test_data/reads/SRR835775_1.first1000.fastq"
+    records = list(iterate_fastq(filename))
+    reads, qualities = read_fastq(filename)
+    assert [record[1] for record in records] == reads
+    assert [record[2] for record in records] == qualities
+    assert records[0][0].startswith("SRR835775.1 ")
+
+
+FASTQ = "genomics_algo/tests/test_data/reads/SRR835775_1.first1000.fastq"
+
+
+def _write_fastq(filename, records):
+    with open(filename, "w") as f:
+        for name, read in records:
+            f.write(f"@{name}\n{read}\n+\n{'I' * len(read)}\n")
+
+
+def test_iterate_paired_fastq(tmp_path):
+    # the second mates are the same reads, gzipped
+    gzipped = str(tmp_path / "reads_2.fastq.gz")
+    with open(FASTQ, "rb") as source, gzip.open(gzipped, "wb") as target:
+        shutil.copyfileobj(source, target)
+    assert list(iterate_fastq(gzipped)) == list(iterate_fastq(FASTQ))
+
+    reads, qualities = read_fastq(FASTQ)
+    batches = list(iterate_paired_fastq(FASTQ, gzipped, batch_size=300))
+    assert [len(batch.ids) for batch in batches] == [300, 300, 300, 100]
+    assert batches[0].ids[0] == "SRR835775.1"
+    for mate_reads in ["reads_1", "reads_2"]:
+        assert sum((getattr(batch, mate_reads) for batch in batches), []) == reads
+    assert sum((batch.qualities_2 for batch in batches), []) == qualities
+
+
+def test_iterate_paired_fastq_raises(tmp_path):
+    _write_fastq(tmp_path / "1.fastq", [("p1/1", "ACGT"), ("p2/1", "GGCC")])
+    _write_fastq(tmp_path / "2.fastq", [("p1/2", "TTTT"), ("p3/2", "AAAA")])
+    _write_fastq(tmp_path / "3.fastq", [("p1/2", "TTTT")])
+    files = [str(tmp_path / f"{mate}.fastq") for mate in range(1, 4)]
+    with pytest.raises(ValueError, match="pair 1"):
+        list(iterate_paired_fastq(files[0], files[1]))
+    assert len(list(iterate_paired_fastq(files[0], files[1], validate_ids=False))) == 1
+    with pytest.raises(ValueError, match="numbers of reads"):
+        list(iterate_paired_fastq(files[0], files[2], batch_size=1))
+    with pytest.raises(FileNotFoundError):
+        list(iterate_paired_fastq(files[0], str(tmp_path / "missing.fastq")))
+
+
+def test_iterate_paired_fastq_stops_readers():
+    threads = threading.active_count()
+    batches = iterate_paired_fastq(FASTQ, FASTQ, batch_size=1)
+    next(batches)
+    batches.close()
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(timeout=5)
+    assert threading.active_count() == threads
@@ -0,0 +1,88 @@
+import gzip
+
+import numpy as np
+
+from genomics_algo.cli import main
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.read_files import read_fastq, read_genome
+from genomics_algo.utilities.read_simulation import (
+    ERROR_QUALITY_SCORE,
+    simulate_reads,
+    write_simulated_fastq,
+)
+from genomics_algo.utilities.string_cmp import find_levenshtein_distance
+
+PHIX = "genomics_algo/tests/test_data/genomes/phix.fa"
+
+
+def test_simulate_reads_without_errors():
+    genome = read_genome(PHIX)
+    batches = list(simulate_reads(genome, 250, 50, seed=3, batch_size=100))
+    assert [len(batch.reads) for batch in batches] == [100, 100, 50]
+    for batch in batches:
+        for start, reverse, read in zip(
+            batch.start_positions, batch.reverse, batch.reads
+        ):
+            expected = genome[start : start + 50]
+            assert read == (reverse_complement(expected) if reverse else expected)
+    assert 0 < np.concatenate([batch.reverse for batch in batches]).sum() < 250
+
+
+def test_simulate_reads_with_errors():
+    genome = read_genome(PHIX)
+    batch = next(
+        simulate_reads(
+            genome,
+            100,
+            60,
+            substitution_rate=0.03,
+            insertion_rate=0.01,
+            reverse_strand_probability=0.0,
+            seed=4,
+        )
+    )
+    total_edits = 0
+    for start, read, qualities in zip(
+        batch.start_positions, batch.reads, batch.read_qualities
+    ):
+        assert len(read) == len(qualities) == 60
+        # substituted and inserted bases are marked with a low quality
+        errors = qualities.count(chr(ERROR_QUALITY_SCORE + 33))
+        edits = min(
+            find_levenshtein_distance(read, genome[start:end])
+            for end in range(start + 60 - errors, start + 61)
+        )
+        assert edits <= errors
+        total_edits += edits
+    assert 0.01 < total_edits / (100 * 60) < 0.06
+
+
+def test_simulate_reads_is_reproducible():
+    genome = read_genome(PHIX)
+    first = next(simulate_reads(genome, 10, 30, substitution_rate=0.1, seed=5))
+    second = next(simulate_reads(genome, 10, 30, substitution_rate=0.1, seed=5))
+    assert first.reads == second.reads
+    assert first.read_qualities == second.read_qualities
+
+
+def test_write_simulated_fastq(tmp_path):
+    genome = read_genome(PHIX)
+    filename = str(tmp_path / "reads.fastq")
+    assert write_simulated_fastq(genome, filename, 25, 40, seed=6, batch_size=10) == 25
+    reads, qualities = read_fastq(filename)
+    assert len(reads) == len(qualities) == 25
+    assert all(len(read) == 40 for read in reads)
+    with open(filename) as f:
+        assert f.readline().startswith("@sim_0000000000_")
+
+    gzipped = str(tmp_path / "reads.fastq.gz")
+    write_simulated_fastq(genome, gzipped, 25, 40, seed=6, batch_size=10)
+    with gzip.open(gzipped, "rt") as f, open(filename) as g:
+        assert f.read() == g.read()
+
+
+def test_main_simulate(tmp_path, capsys):
+    output = str(tmp_path / "reads.fastq")
+    assert main(["simulate", PHIX, output, "-n", "20", "-l", "30", "--seed", "1"]) == 0
+    assert len(read_fastq(output)[0]) == 20
+    assert "reads/sec" in capsys.readouterr().err
@@ -0,0 +1,111 @@
+import random
+
+import numpy as np
+import pytest
+
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.sketching import (
+    compute_distance_matrix,
+    estimate_jaccard,
+    estimate_mash_distance,
+    find_minimizers,
+    hash_kmers,
+    read_sketches,
+    sketch_genome_files,
+    sketch_sequence,
+    write_sketches,
+)
+from genomics_algo.utilities.sequence_encoding import encode_kmer
+
+
+def _random_sequence(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("ACGT") for _ in range(length))
+
+
+def _mutate(rng: random.Random, sequence: str, rate: float) -> str:
+    return "".join(
+        rng.choice("ACGT".replace(base, "")) if rng.random() < rate else base
+        for base in sequence
+    )
+
+
+def test_sketch_is_bottom_k_of_all_kmer_hashes():
+    rng = random.Random(34)
+    sequence = _random_sequence(rng, 3000) + "NN" + "ACGT" * 100
+    sketch = sketch_sequence(sequence, k=9, sketch_size=200, canonical=False)
+    kmers = {
+        sequence[start : start + 9]
+        for start in range(len(sequence) - 8)
+        if "N" not in sequence[start : start + 9]
+    }
+    hashes = hash_kmers(np.array([encode_kmer(kmer) for kmer in kmers], np.uint64))
+    assert sketch.hashes.tolist() == sorted(hashes.tolist())[:200]
+
+
+def test_canonical_sketches_ignore_strand():
+    rng = random.Random(35)
+    sequence = _random_sequence(rng, 2000)
+    forward = sketch_sequence(sequence, k=15, sketch_size=100)
+    reverse = sketch_sequence(reverse_complement(sequence), k=15, sketch_size=100)
+    assert forward.hashes.tolist() == reverse.hashes.tolist()
+    assert estimate_mash_distance(forward, reverse) == 0.0
+
+
+def test_mash_distance_estimates_mutation_rate():
+    rng = random.Random(36)
+    genome = _random_sequence(rng, 50_000)
+    sketch = sketch_sequence(genome, sketch_size=2000)
+    for rate in (0.01, 0.05):
+        mutated = sketch_sequence(_mutate(rng, genome, rate), sketch_size=2000)
+        assert estimate_mash_distance(sketch, mutated) == pytest.approx(rate, rel=0.3)
+    unrelated = sketch_sequence(_random_sequence(rng, 50_000), sketch_size=2000)
+    assert estimate_jaccard(sketch, unrelated) == 0.0
+    assert estimate_mash_distance(sketch, unrelated) == 1.0
+
+
+def test_find_minimizers():
+    rng = random.Random(37)
+    sequence = _random_sequence(rng, 500) + "N" + _random_sequence(rng, 100)
+    k, window_size = 7, 5
+    positions, hashes = find_minimizers(sequence, k, window_size, canonical=False)
+    expected = set()
+    for window_start in range(len(sequence) - k - window_size + 2):
+        candidates = [
+            (hash_kmers(np.array([encode_kmer(kmer)], np.uint64))[0], start)
+            for start in range(window_start, window_start + window_size)
+            for kmer in [sequence[start : start + k]]
+            if "N" not in kmer
+        ]
+        if candidates:
+            expected.add(min(candidates)[1])
+    assert positions.tolist() == sorted(expected)
+    assert len(hashes) == len(positions)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_distance_matrix_and_serialization(tmp_path, processes):
+    rng = random.Random(38)
+    genome = _random_sequence(rng, 5000)
+    filenames = []
+    for index, rate in enumerate((0.0, 0.01, 0.02, 0.03)):
+        filename = tmp_path / f"genome_{index}.fa"
+        filename.write_text(f">genome_{index}\n{_mutate(rng, genome, rate)}\n")
+        filenames.append(str(filename))
+    sketches = sketch_genome_files(
+        filenames, k=15, sketch_size=500, processes=processes
+    )
+    assert [sketch.name for sketch in sketches] == [
+        f"genome_{index}.fa" for index in range(4)
+    ]
+    distances = compute_distance_matrix(sketches, processes=processes)
+    assert distances.shape == (4, 4)
+    assert np.allclose(distances, distances.T)
+    assert np.all(np.diag(distances) == 0)
+    assert distances[0, 1] < distances[0, 2] < distances[0, 3]
+
+    write_sketches(sketches, str(tmp_path / "sketches.npz"))
+    restored = read_sketches(str(tmp_path / "sketches.npz"))
+    assert [sketch.hashes.tolist() for sketch in restored] == [
+        sketch.hashes.tolist() for sketch in sketches
+    ]
+    assert [sketch[:5] for sketch in restored] == [sketch[:5] for sketch in sketches]
@@ -1,8 +1,69 @@
+import random
+
+import numpy as np
 import pytest
 
-from genomics_algo.utilities.string_cmp import find_hamming_distance
+from genomics_algo.utilities.string_cmp import (
+    LongestCommonExtension,
+    build_lcp_array,
+    build_suffix_array,
+    find_common_prefix_lengths,
+    find_common_suffix_lengths,
+    find_hamming_distance,
+    longest_common_prefix,
+    longest_common_suffix,
+)
 
 
 def test_find_hamming_distance():
     with pytest.raises(AssertionError):
         find_hamming_distance("A", "ATG")
+
+
+def test_longest_common_prefix_and_suffix_do_not_depend_on_order():
+    rng = random.Random(31)
+    for _ in range(200):
+        s1 = "".join(rng.choice("AC") for _ in range(rng.randint(0, 8)))
+        s2 = "".join(rng.choice("AC") for _ in range(rng.randint(0, 8)))
+        assert longest_common_prefix(s1, s2) == longest_common_prefix(s2, s1)
+        assert longest_common_suffix(s1, s2) == longest_common_suffix(s2, s1)
+        assert s1.endswith(longest_common_suffix(s1, s2))
+        assert s2.endswith(longest_common_suffix(s1, s2))
+
+
+@pytest.mark.parametrize("alphabet", ["A", "AC", "ACGT"])
+def test_suffix_array_lcp_and_longest_common_extension(alphabet):
+    rng = random.Random(32)
+    for length in [1, 2, 7, 64, 200]:
+        text = "".join(rng.choice(alphabet) for _ in range(length))
+        suffix_array = build_suffix_array(text)
+        assert suffix_array.tolist() == sorted(range(length), key=lambda i: text[i:])
+        lcp = build_lcp_array(text, suffix_array)
+        for r in range(1, length):
+            assert lcp[r] == len(
+                longest_common_prefix(
+                    text[suffix_array[r - 1] :], text[suffix_array[r] :]
+                )
+            )
+        lce = LongestCommonExtension(text)
+        for _ in range(100):
+            i, j = rng.randrange(length), rng.randrange(length)
+            assert lce.query(i, j) == len(longest_common_prefix(text[i:], text[j:]))
+
+
+def test_find_common_prefix_and_suffix_lengths():
+    rng = np.random.default_rng(33)
+    first = rng.integers(0, 2, (100, 12))
+    second = rng.integers(0, 2, (100, 12))
+    as_strings = lambda rows: ["".join(map(str, row)) for row in rows.tolist()]
+    expected_prefix = [
+        len(longest_common_prefix(s1, s2))
+        for s1, s2 in zip(as_strings(first), as_strings(second))
+    ]
+    expected_suffix = [
+        len(longest_common_suffix(s1, s2))
+        for s1, s2 in zip(as_strings(first), as_strings(second))
+    ]
+    assert find_common_prefix_lengths(first, second).tolist() == expected_prefix
+    assert find_common_suffix_lengths(first, second).tolist() == expected_suffix
+    assert find_common_prefix_lengths(first, first).tolist() == [12] * 100
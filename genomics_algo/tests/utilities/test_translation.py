@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.translation import (
+    CODON_TABLE,
+    REVERSE_COMPLEMENT_CODONS,
+    encode_codons,
+    translate,
+    translate_six_frames,
+)
+
+STANDARD_CODE = {
+    "TTT": "F", "TTC": "F", "TTA": "L", "TTG": "L", "CTT": "L", "CTC": "L",
+    "CTA": "L", "CTG": "L", "ATT": "I", "ATC": "I", "ATA": "I", "ATG": "M",
+    "GTT": "V", "GTC": "V", "GTA": "V", "GTG": "V", "TCT": "S", "TCC": "S",
+    "TCA": "S", "TCG": "S", "CCT": "P", "CCC": "P", "CCA": "P", "CCG": "P",
+    "ACT": "T", "ACC": "T", "ACA": "T", "ACG": "T", "GCT": "A", "GCC": "A",
+    "GCA": "A", "GCG": "A", "TAT": "Y", "TAC": "Y", "TAA": "*", "TAG": "*",
+    "CAT": "H", "CAC": "H", "CAA": "Q", "CAG": "Q", "AAT": "N", "AAC": "N",
+    "AAA": "K", "AAG": "K", "GAT": "D", "GAC": "D", "GAA": "E", "GAG": "E",
+    "TGT": "C", "TGC": "C", "TGA": "*", "TGG": "W", "CGT": "R", "CGC": "R",
+    "CGA": "R", "CGG": "R", "AGT": "S", "AGC": "S", "AGA": "R", "AGG": "R",
+    "GGT": "G", "GGC": "G", "GGA": "G", "GGG": "G",
+}  # fmt: skip
+
+
+def _translate_naively(sequence, frame=0):
+    return "".join(
+        STANDARD_CODE.get(sequence[i : i + 3], "X")
+        for i in range(frame, len(sequence) - 2, 3)
+    )
+
+
+def test_codon_table():
+    assert len(CODON_TABLE) == 65
+    for codon, amino_acid in STANDARD_CODE.items():
+        assert CODON_TABLE[encode_codons(codon)[0]] == amino_acid
+        reverse_code = REVERSE_COMPLEMENT_CODONS[encode_codons(codon)[0]]
+        assert reverse_code == encode_codons(reverse_complement(codon))[0]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_translate(seed):
+    rng = random.Random(seed)
+    sequence = "".join(rng.choice("ACGTN" if seed % 2 else "ACGT") for _ in range(300))
+    for frame in range(3):
+        assert translate(sequence, frame) == _translate_naively(sequence, frame)
+    assert translate_six_frames(sequence) == [
+        _translate_naively(strand, frame)
+        for strand in (sequence, reverse_complement(sequence))
+        for frame in range(3)
+    ]
+
+
+def test_translate_short_sequences():
+    assert translate("") == ""
+    assert translate("AT") == ""
+    assert translate_six_frames("ATGA") == ["M", "*", "", "S", "H", ""]
@@ -0,0 +1,218 @@
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from genomics_algo.utilities.misc_utilities import reverse_complement
+
+DEFAULT_CACHE_SIZE = 100_000
+# maximal distance in pixels between the clusters of optical duplicates on a tile
+DEFAULT_OPTICAL_DISTANCE = 100
+
+
+class DeduplicatedReads(NamedTuple):
+    """Unique sequences of a set of reads, with the number of reads of each: read ``i``
+    is ``sequences[read_indices[i]]``, or its reverse complement if
+    ``reverse_complemented[i]``"""
+
+    sequences: List[str]
+    counts: np.ndarray
+    read_indices: np.ndarray
+    reverse_complemented: np.ndarray
+
+
+class DuplicationStats(NamedTuple):
+    number_of_reads: int
+    unique_sequences: int
+    duplicate_reads: int
+    optical_duplicates: int
+    pcr_duplicates: int
+    copy_number_histogram: Dict[int, int]
+
+    @property
+    def duplication_rate(self) -> float:
+        if self.number_of_reads == 0:
+            return 0.0
+        return self.duplicate_reads / self.number_of_reads
+
+
+def deduplicate_reads(
+    reads: List[str], reverse_complements: bool = False
+) -> DeduplicatedReads:
+    """Collapse identical reads, hashed into a dictionary, into unique sequences, the
+    first occurence of a sequence being kept. With `reverse_complements`, a read whose
+    reverse complement was seen before is collapsed into it too
+    >>> deduplicated = deduplicate_reads(["ACG", "TTA", "ACG", "CGT"], True)
+    >>> deduplicated.sequences, deduplicated.counts.tolist()
+    (['ACG', 'TTA'], [3, 1])
+    >>> deduplicated.read_indices.tolist(), deduplicated.reverse_complemented.tolist()
+    ([0, 1, 0, 0], [False, False, False, True])
+    """
+    sequence_indices: Dict[str, int] = {}
+    sequences = []
+    read_indices = np.zeros(len(reads), dtype=np.int64)
+    reverse_complemented = np.zeros(len(reads), dtype=bool)
+    for i, read in enumerate(reads):
+        index = sequence_indices.get(read)
+        if index is None and reverse_complements:
+            index = sequence_indices.get(reverse_complement(read))
+            reverse_complemented[i] = index is not None
+        if index is None:
+            index = len(sequences)
+            sequence_indices[read] = index
+            sequences.append(read)
+        read_indices[i] = index
+    counts = np.bincount(read_indices, minlength=len(sequences))
+    return DeduplicatedReads(sequences, counts, read_indices, reverse_complemented)
+
+
+class MatchCache:
+    """Bounded LRU cache of the results of `match`, a function of a read, e.g. a matcher
+    with its text bound by `functools.partial`. The results of the `maxsize` most
+    recently used reads are kept, and are shared by all the reads they are returned
+    for, so they must not be modified
+    >>> from functools import partial
+    >>> from genomics_algo.exact_matching_algorithms.boyer_moore_exact_matching import (
+    ...     get_occurences_with_boyer_moore_exact_matching,
+    ... )
+    >>> cache = MatchCache(
+    ...     partial(get_occurences_with_boyer_moore_exact_matching, text="GACTACGACT"),
+    ...     maxsize=2,
+    ... )
+    >>> [cache(read) for read in ["ACT", "CG", "ACT", "TA", "CG"]]
+    [[1, 7], [5], [1, 7], [3], [5]]
+    >>> cache.hits, cache.misses
+    (1, 4)
+    """
+
+    def __init__(self, match: Callable[[str], Any], maxsize: int = DEFAULT_CACHE_SIZE):
+        assert maxsize > 0
+        self.match = match
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __call__(self, read: str) -> Any:
+        if read in self._results:
+            self.hits += 1
+            self._results.move_to_end(read)
+            return self._results[read]
+        self.misses += 1
+        result = self.match(read)
+        self._results[read] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return result
+
+
+def match_reads(
+    reads: List[str],
+    match: Callable[[str], Any],
+    reverse_complements: bool = False,
+) -> List[Any]:
+    """Run `match` once per unique sequence of `reads` (see `deduplicate_reads`) and
+    fan the results back out to every read, duplicates sharing the same result. Pass a
+    `MatchCache` as `match` to also reuse the results of the reads of previous batches.
+    With `reverse_complements`, a read and its reverse complement share a result too,
+    so `match` must find both strands, like
+    `get_occurences_with_exact_match_with_reverse_complement` does
+    >>> match_reads(["ACT", "AC", "ACT"], lambda read: "GACTACGACT".find(read))
+    [1, 1, 1]
+    """
+    deduplicated = deduplicate_reads(reads, reverse_complements)
+    results = [match(sequence) for sequence in deduplicated.sequences]
+    return [results[index] for index in deduplicated.read_indices.tolist()]
+
+
+def parse_illumina_location(name: str) -> Optional[Tuple[str, int, int]]:
+    """Get the tile (everything before the coordinates, from the instrument to the
+    tile number) and the x and y coordinates of the cluster of a read from its Illumina
+    name, or None if the name is in another format
+    >>> parse_illumina_location("M00123:45:000000000-ABCDE:1:1101:15589:1332 1:N:0:1")
+    ('M00123:45:000000000-ABCDE:1:1101', 15589, 1332)
+    >>> parse_illumina_location("HWUSI-EAS100R:6:73:941:1973#0/1")
+    ('HWUSI-EAS100R:6:73', 941, 1973)
+    >>> parse_illumina_location("SRR835775.1 1/1") is None
+    True
+    """
+    words = name.split()
+    if len(words) == 0:
+        return None
+    fields = words[0].split("#")[0].split(":")
+    if len(fields) < 5:
+        return None
+    try:
+        return ":".join(fields[:-2]), int(fields[-2]), int(fields[-1])
+    except ValueError:
+        return None
+
+
+def _count_optical_duplicates(
+    locations: List[Tuple[str, int, int]], optical_distance: int
+) -> int:
+    """Count the reads lying within `optical_distance` of a previous read of the same
+    tile, in the order of the x coordinates"""
+    optical_duplicates = 0
+    locations = sorted(locations)
+    for i, (tile, x, y) in enumerate(locations):
+        j = i - 1
+        while (
+            j >= 0
+            and locations[j][0] == tile
+            and x - locations[j][1] <= optical_distance
+        ):
+            if abs(y - locations[j][2]) <= optical_distance:
+                optical_duplicates += 1
+                break
+            j -= 1
+    return optical_duplicates
+
+
+def get_duplication_stats(
+    reads: List[str],
+    names: Optional[List[str]] = None,
+    reverse_complements: bool = False,
+    optical_distance: int = DEFAULT_OPTICAL_DISTANCE,
+) -> DuplicationStats:
+    """Get the duplication statistics of a set of reads: every read beyond the first
+    one of its sequence is a duplicate. With the Illumina `names` of the reads, a
+    duplicate whose cluster lies within `optical_distance` pixels of another copy on
+    the same tile is counted as an optical duplicate, the other ones as PCR duplicates
+    >>> names = ["I:1:F:1:11:100:100", "I:1:F:1:11:150:120", "I:1:F:1:11:900:9", "I:2"]
+    >>> stats = get_duplication_stats(["ACG", "ACG", "ACG", "TTT"], names)
+    >>> stats.duplicate_reads, stats.optical_duplicates, stats.pcr_duplicates
+    (2, 1, 1)
+    >>> stats.copy_number_histogram
+    {1: 1, 3: 1}
+    """
+    deduplicated = deduplicate_reads(reads, reverse_complements)
+    duplicate_reads = len(reads) - len(deduplicated.sequences)
+    optical_duplicates = 0
+    if names is not None and duplicate_reads > 0:
+        assert len(names) == len(reads)
+        order = np.argsort(deduplicated.read_indices, kind="stable")
+        group_ends = np.cumsum(deduplicated.counts)
+        for group_end, count in zip(group_ends.tolist(), deduplicated.counts.tolist()):
+            if count < 2:
+                continue
+            locations = [
+                parse_illumina_location(names[i])
+                for i in order[group_end - count : group_end].tolist()
+            ]
+            optical_duplicates += _count_optical_duplicates(
+                [location for location in locations if location is not None],
+                optical_distance,
+            )
+    copy_numbers, frequencies = np.unique(deduplicated.counts, return_counts=True)
+    return DuplicationStats(
+        len(reads),
+        len(deduplicated.sequences),
+        duplicate_reads,
+        optical_duplicates,
+        duplicate_reads - optical_duplicates,
+        dict(zip(copy_numbers.tolist(), frequencies.tolist())),
+    )
@@ -0,0 +1,222 @@
+import queue
+import threading
+
+import numpy as np
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+from typing import Tuple
+
+from genomics_algo.utilities.read_files import open_text_file
+from genomics_algo.utilities.seq_read_qualities_processing import (
+    get_freq_for_qualities,
+)
+from genomics_algo.utilities.seq_reads_processing import (
+    find_GC_by_position,
+    get_base_freq,
+    same_length_reads,
+)
+
+DEFAULT_READER_THREADS = 2
+DEFAULT_MAX_QUEUED_FILES = 4
+
+
+class SequenceFile(NamedTuple):
+    """Parsed content of a .fastq file, or of a genome file as a single read without
+    qualities"""
+
+    filename: str
+    reads: List[str]
+    qualities: List[str]
+
+
+class ReadQC(NamedTuple):
+    number_of_reads: int
+    base_frequencies: Dict[str, int]
+    gc_by_position: Optional[np.ndarray]
+    quality_values: List[int]
+    quality_frequencies: List[int]
+
+    @property
+    def gc_content(self) -> float:
+        bases = sum(self.base_frequencies.values())
+        gc = self.base_frequencies.get("G", 0) + self.base_frequencies.get("C", 0)
+        return gc / bases if bases > 0 else 0.0
+
+    @property
+    def mean_quality(self) -> float:
+        qualities = sum(self.quality_frequencies)
+        if qualities == 0:
+            return 0.0
+        return float(np.dot(self.quality_values, self.quality_frequencies)) / qualities
+
+
+def parse_sequence_file(filename: str, text: str) -> SequenceFile:
+    """Parse the content of a .fastq file, recognised by its leading ``@``, or else of
+    a genome file like `read_genome` does
+    >>> parse_sequence_file("reads.fastq", "@r1\\nACGT\\n+\\nIIII\\n")
+    SequenceFile(filename='reads.fastq', reads=['ACGT'], qualities=['IIII'])
+    >>> parse_sequence_file("genome.fa", ">chr\\nACGT\\nAC\\n").reads
+    ['ACGTAC']
+    """
+    lines = text.splitlines()
+    if text.startswith("@"):
+        return SequenceFile(filename, lines[1::4], lines[3::4])
+    genome = "".join(line.rstrip() for line in lines if not line.startswith(">"))
+    return SequenceFile(filename, [genome], [])
+
+
+def compute_read_qc(sequence_file: SequenceFile) -> ReadQC:
+    """Run the QC functions over the reads of a file: base frequencies, quality
+    frequencies and, for reads of the same length, the GC content by position"""
+    reads = sequence_file.reads
+    gc_by_position = None
+    if len(sequence_file.qualities) > 0 and same_length_reads(reads):
+        gc_by_position = find_GC_by_position(reads)
+    quality_values, quality_frequencies = get_freq_for_qualities(
+        sequence_file.qualities
+    )
+    return ReadQC(
+        len(reads),
+        dict(get_base_freq(reads)),
+        gc_by_position,
+        quality_values,
+        quality_frequencies,
+    )
+
+
+# marks the end of the items of a stage in the queue to the next stage
+_END = None
+
+
+def _put(items: queue.Queue, item, stopped: threading.Event):
+    """Put an item into a bounded queue, waiting for room unless the pipeline stops"""
+    while not stopped.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _read_files(files: queue.Queue, texts: queue.Queue, stopped: threading.Event):
+    """Reader stage: read (and decompress) whole files"""
+    try:
+        while not stopped.is_set():
+            try:
+                index, filename = files.get_nowait()
+            except queue.Empty:
+                break
+            with open_text_file(filename) as f:
+                _put(texts, (index, filename, f.read()), stopped)
+    except Exception as error:
+        _put(texts, error, stopped)
+    _put(texts, _END, stopped)
+
+
+def _parse_files(
+    texts: queue.Queue,
+    sequence_files: queue.Queue,
+    reader_threads: int,
+    stopped: threading.Event,
+):
+    """Parse stage: parse the files read by all reader threads"""
+    finished_readers = 0
+    try:
+        while finished_readers < reader_threads and not stopped.is_set():
+            try:
+                item = texts.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END:
+                finished_readers += 1
+            elif isinstance(item, Exception):
+                _put(sequence_files, item, stopped)
+            else:
+                index, filename, text = item
+                sequence_file = parse_sequence_file(filename, text)
+                _put(sequence_files, (index, sequence_file), stopped)
+    except Exception as error:
+        _put(sequence_files, error, stopped)
+    _put(sequence_files, _END, stopped)
+
+
+def _compute_now(compute: Callable[[SequenceFile], Any], sequence_file) -> Future:
+    future = Future()
+    future.set_result(compute(sequence_file))
+    return future
+
+
+def run_ingestion_pipeline(
+    filenames: Sequence[str],
+    compute: Callable[[SequenceFile], Any] = compute_read_qc,
+    processes: Optional[int] = None,
+    reader_threads: int = DEFAULT_READER_THREADS,
+    max_queued_files: int = DEFAULT_MAX_QUEUED_FILES,
+) -> Iterator[Tuple[str, Any]]:
+    """Process many .fastq or genome files (possibly gzipped) with the stages
+    overlapping each other: `reader_threads` threads read and decompress files, a
+    thread parses them (see `parse_sequence_file`) and `compute` (by default
+    `compute_read_qc`, it must be picklable) runs on each of them in a pool of
+    `processes` worker processes (all CPUs if None, no pool with one process).
+    Stages are connected by queues of at most `max_queued_files` files and at most
+    `max_queued_files` files are computed at once, so that a slow stage holds the
+    previous ones back instead of letting files pile up in memory
+
+    Yields:
+        Tuple[str, Any]: the filename and the result of `compute` for each file, in
+            the order of `filenames`
+    """
+    assert reader_threads > 0 and max_queued_files > 0
+    files = queue.Queue()
+    for index, filename in enumerate(filenames):
+        files.put((index, filename))
+    texts = queue.Queue(maxsize=max_queued_files)
+    sequence_files = queue.Queue(maxsize=max_queued_files)
+    stopped = threading.Event()
+    threads = [
+        threading.Thread(target=_read_files, args=(files, texts, stopped), daemon=True)
+        for _ in range(reader_threads)
+    ]
+    threads.append(
+        threading.Thread(
+            target=_parse_files,
+            args=(texts, sequence_files, reader_threads, stopped),
+            daemon=True,
+        )
+    )
+    for thread in threads:
+        thread.start()
+
+    executor = ProcessPoolExecutor(processes) if processes != 1 else None
+    results = {}
+    next_index = 0
+    try:
+        while True:
+            item = sequence_files.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            index, sequence_file = item
+            if executor is None:
+                results[index] = _compute_now(compute, sequence_file)
+            else:
+                # wait for a file to be computed when too many are, even if the next
+                # file to yield is not among them (e.g. while it is still being read)
+                pending = [result for result in results.values() if not result.done()]
+                if len(pending) >= max_queued_files:
+                    wait(pending, return_when=FIRST_COMPLETED)
+                results[index] = executor.submit(compute, sequence_file)
+            # results are yielded in order
+            while next_index in results and results[next_index].done():
+                yield filenames[next_index], results.pop(next_index).result()
+                next_index += 1
+        for index in sorted(results):
+            yield filenames[index], results[index].result()
+    finally:
+        stopped.set()
+        if executor is not None:
+            for result in results.values():
+                result.cancel()
+            executor.shutdown()
@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+
+from typing import Tuple
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("python", "numba")
+# the kernels below are used in place of the pure Python implementations when Numba
+# is installed, unless the environment variable GENOMICS_ALGO_BACKEND is "python"
+BACKEND = (
+    "numba"
+    if numba is not None and os.environ.get("GENOMICS_ALGO_BACKEND") != "python"
+    else "python"
+)
+
+
+def jit(function):
+    """Compile `function` with Numba if it is installed, otherwise leave it as is so
+    that it still runs (slowly) in the interpreter, e.g. for the parity tests"""
+    if numba is None:
+        return function
+    return numba.njit(cache=True, nogil=True)(function)
+
+
+def encode_characters(s: str) -> np.ndarray:
+    """Get the code points of the characters of a string, as the kernels work on
+    arrays of integers
+    >>> encode_characters("ACGT").tolist()
+    [65, 67, 71, 84]
+    """
+    return np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32)
+
+
+@jit
+def count_mismatches(first: np.ndarray, second: np.ndarray) -> int:
+    """Hamming distance between two arrays of the same length
+    >>> count_mismatches(encode_characters("ATG"), encode_characters("ATC"))
+    1
+    """
+    mismatches = 0
+    for i in range(len(first)):
+        if first[i] != second[i]:
+            mismatches += 1
+    return mismatches
+
+
+@jit
+def compute_levenshtein_distance(first: np.ndarray, second: np.ndarray) -> int:
+    """Levenshtein distance between two arrays, keeping two rows of the matrix only
+    >>> compute_levenshtein_distance(encode_characters("ATG"), encode_characters("TGA"))
+    2
+    """
+    previous_row = np.arange(len(second) + 1)
+    row = np.empty_like(previous_row)
+    for i in range(1, len(first) + 1):
+        row[0] = i
+        for j in range(1, len(second) + 1):
+            row[j] = min(
+                row[j - 1] + 1,
+                previous_row[j] + 1,
+                previous_row[j - 1] + (1 if first[i - 1] != second[j - 1] else 0),
+            )
+        previous_row, row = row, previous_row
+    return int(previous_row[len(second)])
+
+
+@jit
+def find_approximate_occurences(
+    pattern: np.ndarray, text: np.ndarray, max_mismatches: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the end indices of the approximate occurences of `pattern` in `text` and
+    their starts, as `iterate_occurences_with_dynamic_programming` does: the matrix is
+    filled column by column, each cell keeping the start its backtrace leads to
+    >>> find_approximate_occurences(
+    ...     encode_characters("ACT"), encode_characters("GACTACGGAGACT"), 0
+    ... )
+    (array([ 4, 13]), array([ 1, 10]))
+    """
+    len_pattern = len(pattern)
+    column = np.arange(len_pattern + 1)
+    starts = np.zeros(len_pattern + 1, dtype=np.int64)
+    previous_column = np.empty_like(column)
+    previous_starts = np.empty_like(starts)
+    occurence_ends = np.empty(len(text) + 1, dtype=np.int64)
+    occurence_starts = np.empty(len(text) + 1, dtype=np.int64)
+    number_of_occurences = 0
+    if column[len_pattern] <= max_mismatches:
+        occurence_ends[0] = 0
+        occurence_starts[0] = 0
+        number_of_occurences = 1
+    for j in range(1, len(text) + 1):
+        previous_column, column = column, previous_column
+        previous_starts, starts = starts, previous_starts
+        column[0] = 0
+        starts[0] = j
+        text_base = text[j - 1]
+        for i in range(1, len_pattern + 1):
+            distance_left = previous_column[i] + 1
+            distance_above = column[i - 1] + 1
+            distance_diagonal = previous_column[i - 1] + (
+                1 if pattern[i - 1] != text_base else 0
+            )
+            distance = min(distance_left, distance_above, distance_diagonal)
+            column[i] = distance
+            if distance == distance_above:
+                starts[i] = starts[i - 1]
+            elif distance == distance_left:
+                starts[i] = previous_starts[i]
+            else:
+                starts[i] = previous_starts[i - 1]
+        if column[len_pattern] <= max_mismatches:
+            occurence_ends[number_of_occurences] = j
+            occurence_starts[number_of_occurences] = starts[len_pattern]
+            number_of_occurences += 1
+    return (
+        occurence_ends[:number_of_occurences],
+        occurence_starts[:number_of_occurences],
+    )
+
+
+@jit
+def find_minimum_skew_prefixes(codes: np.ndarray) -> np.ndarray:
+    """Lengths of the prefixes of an encoded genome with minimal GC skew, in a single
+    pass without storing the skew
+    >>> from genomics_algo.utilities.sequence_encoding import encode_sequence
+    >>> find_minimum_skew_prefixes(encode_sequence("CATGGGCATCGG"))
+    array([1, 2, 3])
+    """
+    prefix_lengths = np.empty(len(codes) + 1, dtype=np.int64)
+    prefix_lengths[0] = 0
+    number_of_prefixes = 1
+    skew = 0
+    minimum_skew = 0
+    for i in range(len(codes)):
+        if codes[i] == 2:
+            skew += 1
+        elif codes[i] == 1:
+            skew -= 1
+        if skew < minimum_skew:
+            minimum_skew = skew
+            number_of_prefixes = 0
+        if skew == minimum_skew:
+            prefix_lengths[number_of_prefixes] = i + 1
+            number_of_prefixes += 1
+    return prefix_lengths[:number_of_prefixes]
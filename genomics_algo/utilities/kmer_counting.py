@@ -0,0 +1,301 @@
+import numpy as np
+
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from genomics_algo.utilities.profiling import profiled
+from genomics_algo.utilities.sequence_encoding import (
+    encode_canonical_kmers,
+    encode_kmers,
+    encode_sequence,
+)
+
+from genomics_algo.utilities.sketching import hash_kmers
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_MEMORY_BYTES = 64 * 2**20
+_BLOOM_FILTER_HASHES = 3
+_COUNT_MIN_DEPTH = 4
+_COUNT_MIN_SEED = 1000
+# bytes of the temporary arrays counting the k-mers of one base of a chunk take
+_BYTES_PER_CHUNK_BASE = 64
+
+
+def kmer_dtype(k: int) -> np.dtype:
+    """Smallest unsigned integer type holding a k-mer packed with 2 bits per base
+    >>> kmer_dtype(16), kmer_dtype(17)
+    (dtype('uint32'), dtype('uint64'))
+    """
+    assert 0 < k <= 32
+    return np.dtype(np.uint32) if k <= 16 else np.dtype(np.uint64)
+
+
+def merge_kmer_counts(
+    kmer_codes: List[np.ndarray], counts: List[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge several arrays of k-mer codes and their counts into one sorted array of
+    unique k-mer codes and the summed counts
+    >>> merge_kmer_counts([np.array([3, 1]), np.array([1, 2])], [np.array([1, 1]), np.array([2, 5])])
+    (array([1, 2, 3]), array([3, 5, 1]))
+    """
+    kmer_codes = np.concatenate(kmer_codes)
+    counts = np.concatenate(counts)
+    order = np.argsort(kmer_codes, kind="stable")
+    kmer_codes, counts = kmer_codes[order], counts[order]
+    is_first = np.ones(len(kmer_codes), dtype=bool)
+    is_first[1:] = kmer_codes[1:] != kmer_codes[:-1]
+    first_indices = np.nonzero(is_first)[0]
+    if len(first_indices) == 0:
+        return kmer_codes, counts
+    return kmer_codes[first_indices], np.add.reduceat(counts, first_indices)
+
+
+def iterate_kmer_chunks(
+    sequences: Iterable[str],
+    k: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    canonical: bool = False,
+) -> Iterator[np.ndarray]:
+    """Encode the k-mers of all sequences, without those containing ``N``, in chunks
+    of the k-mers of about `chunk_size` bases. Sequences longer than `chunk_size` are
+    split into pieces overlapping by ``k - 1`` bases. With `canonical`, every k-mer is
+    replaced by the smaller of its code and the code of its reverse complement
+    >>> [chunk.tolist() for chunk in iterate_kmer_chunks(["ACG", "TNA", "CC"], 2, 4)]
+    [[1, 6], [5]]
+    >>> [chunk.tolist() for chunk in iterate_kmer_chunks(["ACGTA"], 2, 2)]
+    [[1, 6], [11, 12]]
+    >>> [chunk.tolist() for chunk in iterate_kmer_chunks(["ACGTA"], 2, canonical=True)]
+    [[1, 6, 1, 12]]
+    """
+    dtype = kmer_dtype(k)
+    encode = encode_canonical_kmers if canonical else encode_kmers
+    chunk = []
+    chunk_bases = 0
+    for sequence in sequences:
+        for start in range(0, max(len(sequence) - k + 1, 1), chunk_size):
+            piece = sequence[start : start + chunk_size + k - 1]
+            chunk.append(piece)
+            chunk_bases += len(piece)
+            if chunk_bases >= chunk_size:
+                kmers, valid = encode(encode_sequence("N".join(chunk)), k)
+                yield kmers[valid].astype(dtype)
+                chunk = []
+                chunk_bases = 0
+    if len(chunk) > 0:
+        kmers, valid = encode(encode_sequence("N".join(chunk)), k)
+        yield kmers[valid].astype(dtype)
+
+
+def get_chunk_size(memory_bytes: int) -> int:
+    """Number of bases per chunk of `iterate_kmer_chunks` whose temporary arrays
+    take about as much memory as a Bloom filter and count-min sketch of
+    `memory_bytes` bytes
+    >>> get_chunk_size(2 ** 30)
+    1000000
+    """
+    return int(
+        min(max(memory_bytes // _BYTES_PER_CHUNK_BASE, 1000), DEFAULT_CHUNK_SIZE)
+    )
+
+
+def count_kmer_chunks(chunks: Iterable[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Count the packed k-mer codes of all chunks exactly
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted unique k-mer codes and their counts
+    >>> codes, counts = count_kmer_chunks([np.array([3, 1, 3]), np.array([1, 2])])
+    >>> codes.tolist(), counts.tolist()
+    ([1, 2, 3], [2, 1, 2])
+    """
+    chunk_codes = [np.zeros(0, dtype=np.uint64)]
+    chunk_counts = [np.zeros(0, dtype=np.int64)]
+    for kmers in chunks:
+        codes, counts = np.unique(kmers.astype(np.uint64), return_counts=True)
+        chunk_codes.append(codes)
+        chunk_counts.append(counts)
+    return merge_kmer_counts(chunk_codes, chunk_counts)
+
+
+@profiled
+def count_kmers(
+    sequences: Iterable[str],
+    k: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    canonical: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Count the k-mers of all sequences (e.g. reads), skipping k-mers containing
+    ``N``. Sequences are consumed in chunks of about `chunk_size` bases, whose k-mers
+    are encoded and counted with vectorized operations, so `sequences` can be a stream.
+    With `canonical`, a k-mer and its reverse complement are counted together under
+    the smaller of their codes
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted unique 2-bit packed k-mer codes (see
+            `kmer_dtype`) and the number of occurences of each
+    >>> codes, counts = count_kmers(["GTACGTACC"], 2)
+    >>> from genomics_algo.utilities.sequence_encoding import decode_kmer
+    >>> {decode_kmer(code, 2): count for code, count in zip(codes, counts.tolist())}
+    {'AC': 2, 'CC': 1, 'CG': 1, 'GT': 2, 'TA': 2}
+    >>> codes, counts = count_kmers(["GTACGTACC"], 2, canonical=True)
+    >>> {decode_kmer(code, 2): count for code, count in zip(codes, counts.tolist())}
+    {'AC': 4, 'CC': 1, 'CG': 1, 'TA': 2}
+    """
+    codes, counts = count_kmer_chunks(
+        iterate_kmer_chunks(sequences, k, chunk_size, canonical)
+    )
+    return codes.astype(kmer_dtype(k)), counts
+
+
+class BloomFilter:
+    """Bloom filter over packed k-mer codes with `number_of_bits` bits and
+    `number_of_hashes` hash functions. Membership tests may give false positives
+    but never false negatives
+    >>> bloom_filter = BloomFilter(1024, 3)
+    >>> bloom_filter.add(np.array([1, 2], dtype=np.uint64))
+    >>> bloom_filter.contains(np.array([1, 2, 3], dtype=np.uint64)).tolist()
+    [True, True, False]
+    """
+
+    def __init__(self, number_of_bits: int, number_of_hashes: int):
+        assert number_of_bits > 0 and number_of_hashes > 0
+        self.number_of_bits = number_of_bits
+        self.number_of_hashes = number_of_hashes
+        self.bits = np.zeros((number_of_bits + 7) // 8, dtype=np.uint8)
+
+    def _get_bit_indices(self, kmers: np.ndarray) -> List[np.ndarray]:
+        return [
+            hash_kmers(kmers, seed) % np.uint64(self.number_of_bits)
+            for seed in range(self.number_of_hashes)
+        ]
+
+    def add(self, kmers: np.ndarray):
+        for bit_indices in self._get_bit_indices(kmers):
+            np.bitwise_or.at(
+                self.bits,
+                bit_indices >> np.uint64(3),
+                np.left_shift(1, bit_indices & np.uint64(7)).astype(np.uint8),
+            )
+
+    def contains(self, kmers: np.ndarray) -> np.ndarray:
+        found = np.ones(len(kmers), dtype=bool)
+        for bit_indices in self._get_bit_indices(kmers):
+            bits = self.bits[bit_indices >> np.uint64(3)] >> (
+                bit_indices & np.uint64(7)
+            )
+            found &= (bits & 1).astype(bool)
+        return found
+
+
+class CountMinSketch:
+    """Count-min sketch over packed k-mer codes: `depth` rows of `width` counters, each
+    row indexed by its own hash function. The estimated count of a k-mer is the
+    minimum of its counters, which never underestimates the true count
+    >>> sketch = CountMinSketch(1024, 4)
+    >>> sketch.add(np.array([5, 7], dtype=np.uint64), np.array([3, 1]))
+    >>> sketch.estimate(np.array([5, 7, 9], dtype=np.uint64)).tolist()
+    [3, 1, 0]
+    """
+
+    def __init__(self, width: int, depth: int):
+        assert width > 0 and depth > 0
+        self.width = width
+        self.depth = depth
+        self.counters = np.zeros((depth, width), dtype=np.uint32)
+
+    def _get_counter_indices(self, kmers: np.ndarray) -> List[np.ndarray]:
+        # seeds differ from the ones used by `BloomFilter`
+        return [
+            hash_kmers(kmers, _COUNT_MIN_SEED + row) % np.uint64(self.width)
+            for row in range(self.depth)
+        ]
+
+    def add(self, kmers: np.ndarray, counts: np.ndarray):
+        counts = np.asarray(counts, dtype=np.uint32)
+        for row, indices in enumerate(self._get_counter_indices(kmers)):
+            np.add.at(self.counters[row], indices, counts)
+
+    def estimate(self, kmers: np.ndarray) -> np.ndarray:
+        estimates = np.full(len(kmers), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for row, indices in enumerate(self._get_counter_indices(kmers)):
+            estimates = np.minimum(estimates, self.counters[row][indices])
+        return estimates.astype(np.int64)
+
+
+def _count_candidates(
+    get_chunks: Callable[[], Iterator[np.ndarray]],
+    count_min_sketch: CountMinSketch,
+    min_count: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Exactly count the k-mers whose estimated count reaches `min_count`"""
+    chunk_codes = [np.zeros(0, dtype=np.uint64)]
+    chunk_counts = [np.zeros(0, dtype=np.int64)]
+    for kmers in get_chunks():
+        codes, counts = np.unique(kmers, return_counts=True)
+        # first occurences are not in the sketch, see `count_frequent_kmers`
+        is_candidate = count_min_sketch.estimate(codes) + 1 >= min_count
+        chunk_codes.append(codes[is_candidate].astype(np.uint64))
+        chunk_counts.append(counts[is_candidate])
+    return merge_kmer_counts(chunk_codes, chunk_counts)
+
+
+@profiled
+def count_frequent_kmers(
+    get_chunks: Callable[[], Iterator[np.ndarray]],
+    min_count: Optional[int] = None,
+    memory_bytes: int = DEFAULT_MEMORY_BYTES,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Count frequent k-mers exactly within a fixed memory budget. `get_chunks` returns
+    a new iterator over chunks of packed k-mer codes (e.g. from `iterate_kmer_chunks`)
+    each time it is called, as the k-mers are read two or three times:
+
+    1. every k-mer is checked against a Bloom filter, only repeated k-mers are added
+       to a count-min sketch, so error singletons take no space in it
+    2. the k-mers whose estimated count can reach the threshold are counted exactly
+
+    A quarter of `memory_bytes` is spent on the Bloom filter and the rest on the
+    count-min sketch; only the candidates of step 2 take additional memory
+
+    Args:
+        min_count (Optional[int]): count all k-mers occurring at least `min_count`
+            (at least 2) times, or only the most frequent k-mers if None
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted packed k-mer codes and their exact counts
+    >>> get_chunks = lambda: iterate_kmer_chunks(["GTACGTACC"], 2)
+    >>> codes, counts = count_frequent_kmers(get_chunks)
+    >>> codes.tolist(), counts.tolist()
+    ([1, 11, 12], [2, 2, 2])
+    """
+    assert min_count is None or min_count >= 2
+    bloom_filter = BloomFilter(max(memory_bytes * 2, 8), _BLOOM_FILTER_HASHES)
+    count_min_sketch = CountMinSketch(
+        max(memory_bytes * 3 // (4 * 4 * _COUNT_MIN_DEPTH), 1), _COUNT_MIN_DEPTH
+    )
+    max_estimate = 0
+    for kmers in get_chunks():
+        codes, counts = np.unique(kmers, return_counts=True)
+        if len(codes) == 0:
+            # e.g. a chunk of N bases only
+            continue
+        seen = bloom_filter.contains(codes)
+        bloom_filter.add(codes)
+        # the first occurence of a k-mer only goes to the Bloom filter, so the
+        # estimate of a k-mer plus one is at least its true count
+        count_min_sketch.add(codes, np.where(seen, counts, counts - 1))
+        max_estimate = max(max_estimate, count_min_sketch.estimate(codes).max() + 1)
+
+    if min_count is not None:
+        codes, counts = _count_candidates(get_chunks, count_min_sketch, min_count)
+        keep = counts >= min_count
+        return codes[keep], counts[keep]
+
+    # every k-mer occurring `max_count` times has an estimate of at least
+    # `max_count - 1`, so once the candidates of a threshold at most `max_count` are
+    # counted, the most frequent k-mers are among them
+    threshold = max_estimate
+    while True:
+        codes, counts = _count_candidates(get_chunks, count_min_sketch, threshold)
+        max_count = counts.max() if len(counts) > 0 else 0
+        if max_count >= threshold or max_count == 0:
+            keep = counts == max_count
+            return codes[keep], counts[keep]
+        threshold = max_count
@@ -0,0 +1,186 @@
+import numpy as np
+
+from typing import List, Optional, Tuple
+
+from genomics_algo.utilities.sequence_encoding import (
+    CODE_N,
+    encode_kmers,
+    encode_sequence,
+)
+
+DEFAULT_WINDOW_LENGTH = 64
+LOW_COMPLEXITY_METHODS = ("dust", "entropy")
+# scores of random sequences are about 0.5 (dust) and close to 2 bits (entropy),
+# while the default thresholds flag repeats of up to about 5 and 2 bases respectively
+DEFAULT_THRESHOLDS = {"dust": 5.0, "entropy": 1.5}
+
+
+def get_dust_scores(
+    codes: np.ndarray, window_length: int = DEFAULT_WINDOW_LENGTH
+) -> np.ndarray:
+    """Get the DUST score of every window of `window_length` bases of an encoded
+    sequence, i.e. the number of pairs of identical triplets in the window divided by
+    the number of triplets minus one. Instead of counting the triplets of every window,
+    the score of each window is derived from the previous one: moving the window by one
+    base adds the pairs of the new triplet with the identical triplets in the window and
+    removes those of the triplet leaving it, which are found by binary search among the
+    sorted positions of each triplet. Triplets with ``N`` are not counted and sequences
+    shorter than a window are scored as a single window
+    >>> get_dust_scores(encode_sequence("AAAAAA"), 5).tolist()
+    [1.5, 1.5]
+    >>> get_dust_scores(encode_sequence("ACGTAC"), 5).tolist()
+    [0.0, 0.0]
+    """
+    window_length = min(window_length, len(codes))
+    number_of_windows = len(codes) - window_length + 1 if len(codes) > 0 else 0
+    triplets_per_window = window_length - 2
+    if triplets_per_window < 2:
+        return np.zeros(number_of_windows)
+    triplets, valid = encode_kmers(codes, 3)
+    number_of_triplets = len(triplets)
+
+    # positions of each triplet in increasing order, triplet after triplet, keyed so
+    # that a single sorted array holds them all
+    positions = np.nonzero(valid)[0]
+    triplets = triplets.astype(np.uint8)
+    order = np.argsort(triplets[positions], kind="stable")
+    positions = positions[order]
+    offsets = triplets[positions].astype(np.int64) * (number_of_triplets + 1)
+    keys = offsets + positions
+    ranks = np.arange(len(keys))
+    # identical triplets among the previous and the next `triplets_per_window` - 1
+    previous_pairs = np.zeros(number_of_triplets, dtype=np.int64)
+    previous_pairs[positions] = ranks - np.searchsorted(
+        keys, offsets + np.maximum(positions - triplets_per_window + 1, 0)
+    )
+    next_pairs = np.zeros(number_of_triplets, dtype=np.int64)
+    next_pairs[positions] = (
+        np.searchsorted(
+            keys,
+            offsets + np.minimum(positions + triplets_per_window, number_of_triplets),
+        )
+        - ranks
+        - 1
+    )
+
+    first_counts = np.bincount(
+        triplets[:triplets_per_window][valid[:triplets_per_window]].astype(np.int64),
+        minlength=64,
+    )
+    pairs = np.concatenate(
+        (
+            [(first_counts * (first_counts - 1) // 2).sum()],
+            previous_pairs[triplets_per_window:][: number_of_windows - 1]
+            - next_pairs[: number_of_windows - 1],
+        )
+    ).cumsum()
+    return pairs / (triplets_per_window - 1)
+
+
+def get_entropy_scores(
+    codes: np.ndarray, window_length: int = DEFAULT_WINDOW_LENGTH
+) -> np.ndarray:
+    """Get the Shannon entropy in bits of the base composition of every window of
+    `window_length` bases of an encoded sequence, from the running counts of each base.
+    ``N`` is not counted and windows without any other base get the maximal entropy
+    >>> get_entropy_scores(encode_sequence("AAAATATA"), 4).tolist()
+    [0.0, 0.8112781244591328, 0.8112781244591328, 1.0, 1.0]
+    """
+    window_length = min(window_length, len(codes))
+    number_of_windows = len(codes) - window_length + 1 if len(codes) > 0 else 0
+    base_counts = []
+    for code in range(CODE_N):
+        running_count = np.concatenate(([0], np.cumsum(codes == code, dtype=np.int32)))
+        base_counts.append(
+            running_count[window_length:] - running_count[:number_of_windows]
+        )
+    totals = np.sum(base_counts, axis=0)
+    entropies = np.zeros(number_of_windows)
+    for counts in base_counts:
+        frequencies = counts / np.maximum(totals, 1)
+        entropies -= frequencies * np.log2(np.where(counts > 0, frequencies, 1))
+    return np.where(totals > 0, entropies, 2.0)
+
+
+def find_low_complexity_mask(
+    sequence: str,
+    method: str = "dust",
+    window_length: int = DEFAULT_WINDOW_LENGTH,
+    threshold: Optional[float] = None,
+) -> np.ndarray:
+    """Mask the bases of a genome or read lying in a window of low complexity, that is
+    with a DUST score above `threshold` or an entropy below `threshold`, defaulting to
+    `DEFAULT_THRESHOLDS`. Reads shorter than a window are scored as a whole
+    >>> mask = find_low_complexity_mask("ACGTTGCA" + "A" * 8 + "CGATGCAT", "dust", 8, 2)
+    >>> get_masked_intervals(mask)
+    [(7, 16)]
+
+    Returns:
+        np.ndarray: boolean array, True for the masked bases
+    """
+    if method not in LOW_COMPLEXITY_METHODS:
+        raise ValueError(
+            f"Unknown method {method}, expected one of {LOW_COMPLEXITY_METHODS}"
+        )
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS[method]
+    codes = encode_sequence(sequence)
+    window_length = min(window_length, len(codes))
+    if method == "dust":
+        window_starts = np.nonzero(get_dust_scores(codes, window_length) > threshold)[0]
+    else:
+        window_starts = np.nonzero(
+            get_entropy_scores(codes, window_length) < threshold
+        )[0]
+    # +1 where a flagged window starts and -1 where it ends
+    boundaries = np.zeros(len(codes) + 1, dtype=np.int64)
+    boundaries[window_starts] += 1
+    boundaries[window_starts + window_length] -= 1
+    return np.cumsum(boundaries[:-1]) > 0
+
+
+def get_masked_intervals(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Get the start and end index of every run of masked bases
+    >>> get_masked_intervals(np.array([True, True, False, False, True]))
+    [(0, 2), (4, 5)]
+    """
+    boundaries = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0])))
+    return list(
+        zip(
+            np.nonzero(boundaries == 1)[0].tolist(),
+            np.nonzero(boundaries == -1)[0].tolist(),
+        )
+    )
+
+
+def mask_sequence(sequence: str, mask: np.ndarray) -> str:
+    """Replace the masked bases by ``N`` (hard masking), so that they are skipped by
+    everything working on packed k-mers, e.g. `count_kmers` or the sketches
+    >>> mask_sequence("ACGT", np.array([False, True, True, False]))
+    'ANNT'
+    """
+    assert len(mask) == len(sequence)
+    characters = np.frombuffer(sequence.encode("ascii"), dtype=np.uint8).copy()
+    characters[np.asarray(mask, dtype=bool)] = ord("N")
+    return characters.tobytes().decode("ascii")
+
+
+def get_masked_counts(mask: np.ndarray) -> np.ndarray:
+    """Get the number of masked bases before each index, so that the number of masked
+    bases in ``[start, end)`` is ``masked_counts[end] - masked_counts[start]``"""
+    return np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+
+
+def filter_masked_occurences(
+    occurences: List[int], length: int, mask: Optional[np.ndarray]
+) -> List[int]:
+    """Drop the occurences of length `length` overlapping a masked base
+    >>> filter_masked_occurences([0, 2, 5], 2, np.array([0, 0, 1, 0, 0, 0, 0], dtype=bool))
+    [0, 5]
+    """
+    if mask is None or len(occurences) == 0:
+        return occurences
+    masked_counts = get_masked_counts(mask)
+    starts = np.asarray(occurences)
+    ends = np.minimum(starts + length, len(mask))
+    return starts[masked_counts[ends] == masked_counts[starts]].tolist()
@@ -1,6 +1,16 @@
-import random
+import numpy as np
 
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from genomics_algo.utilities.kmer_counting import (
+    DEFAULT_MEMORY_BYTES,
+    count_frequent_kmers,
+    count_kmers,
+    get_chunk_size,
+    iterate_kmer_chunks,
+)
+from genomics_algo.utilities.low_complexity import get_masked_counts, mask_sequence
+from genomics_algo.utilities.sequence_encoding import decode_kmer
 
 
 class Bases:
@@ -43,19 +53,43 @@ def reverse_complement(s: str) -> str:
 
 
 def generate_artificial_reads(
-    genome: str, number_of_reads: int, read_length: int
+    genome: str, number_of_reads: int, read_length: int, seed: Optional[int] = None
 ) -> List[str]:
-    """Generate a set of reads randomly from a genome"""
-    reads = []
-    for _ in range(number_of_reads):
-        start_position = random.randint(0, len(genome) - read_length + 1)
-        reads.append(genome[start_position : start_position + read_length + 1])
-    return reads
-
-
-def get_frequency_map(text: str, substring_length: int) -> Dict[str, int]:
+    """Generate a set of error free reads of length `read_length` randomly from a genome,
+    reproducibly if `seed` is given. See `genomics_algo.utilities.read_simulation` for
+    reads with sequencing errors, both strands and qualities
+    >>> generate_artificial_reads("ACGTACGT", 3, 8)
+    ['ACGTACGT', 'ACGTACGT', 'ACGTACGT']
     """
-    Find the frequency of all substring of length in a given text
+    assert 0 <= read_length <= len(genome)
+    rng = np.random.default_rng(seed)
+    start_positions = rng.integers(0, len(genome) - read_length + 1, number_of_reads)
+    return [
+        genome[start_position : start_position + read_length]
+        for start_position in start_positions.tolist()
+    ]
+
+
+def get_frequency_map(
+    text: str,
+    substring_length: int,
+    min_frequency: int = 1,
+    approximate: bool = False,
+    memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    canonical: bool = False,
+    mask: Optional[np.ndarray] = None,
+) -> Dict[str, int]:
+    """
+    Find the frequency of all substring of length in a given text, keeping those
+    occurring at least `min_frequency` times.
+    With `approximate`, k-mers are counted within a memory budget of `memory_bytes`
+    (see `count_frequent_kmers`), which requires `min_frequency` to be at least 2 as
+    k-mers seen once are never stored. With `canonical`, a substring and its reverse
+    complement are counted together under the lexicographically smaller of the two.
+    In both modes the counts are exact, but substrings are ordered by their 2-bit
+    codes and substrings with bases other than ACGT are skipped. Substrings
+    overlapping a base masked in `mask` (e.g. from `find_low_complexity_mask`) are not
+    counted
     >>> get_frequency_map("GTACGTACC", 1)
     {'G': 2, 'T': 2, 'A': 2, 'C': 3}
     >>> get_frequency_map("GTACGTACC", 2)
@@ -64,17 +98,61 @@ def get_frequency_map(text: str, substring_length: int) -> Dict[str, int]:
     {'GTAC': 2, 'TACG': 1, 'ACGT': 1, 'CGTA': 1, 'TACC': 1}
     >>> get_frequency_map("GTACGTACC", 6)
     {'GTACGT': 1, 'TACGTA': 1, 'ACGTAC': 1, 'CGTACC': 1}
+    >>> get_frequency_map("GTACGTACC", 2, min_frequency=2, approximate=True)
+    {'AC': 2, 'GT': 2, 'TA': 2}
+    >>> get_frequency_map("GTACGTACC", 2, canonical=True)
+    {'AC': 4, 'CC': 1, 'CG': 1, 'TA': 2}
+    >>> get_frequency_map("GTACGTACC", 4, mask=np.array([False] * 6 + [True] * 3))
+    {'GTAC': 1, 'TACG': 1, 'ACGT': 1}
     """
     assert substring_length > 0
     assert len(text) > 0
 
+    if mask is not None and (canonical or approximate):
+        text = mask_sequence(text, mask)
+    if canonical and not approximate:
+        codes, counts = count_kmers([text], substring_length, canonical=True)
+        keep = counts >= min_frequency
+        return {
+            decode_kmer(code, substring_length): count
+            for code, count in zip(codes[keep].tolist(), counts[keep].tolist())
+        }
+    if approximate:
+        if min_frequency < 2:
+            raise ValueError(
+                f"Approximate counting requires min_frequency >= 2, got {min_frequency}"
+            )
+        codes, counts = count_frequent_kmers(
+            lambda: iterate_kmer_chunks(
+                [text], substring_length, get_chunk_size(memory_bytes), canonical
+            ),
+            min_frequency,
+            memory_bytes,
+        )
+        return {
+            decode_kmer(code, substring_length): count
+            for code, count in zip(codes.tolist(), counts.tolist())
+        }
+
     freq_map = {}
+    masked_counts = get_masked_counts(mask).tolist() if mask is not None else None
     for index in range(len(text) - substring_length + 1):
+        if (
+            masked_counts is not None
+            and masked_counts[index + substring_length] != masked_counts[index]
+        ):
+            continue
         substr = text[index : index + substring_length]
         if substr in freq_map:
             freq_map[substr] += 1
         else:
             freq_map[substr] = 1
+    if min_frequency > 1:
+        freq_map = {
+            substr: count
+            for substr, count in freq_map.items()
+            if count >= min_frequency
+        }
     return freq_map
 
 
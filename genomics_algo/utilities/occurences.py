@@ -0,0 +1,32 @@
+from itertools import islice
+
+from typing import Iterable, List
+
+
+def count_occurences(occurences: Iterable[int]) -> int:
+    """Count the occurences yielded by a lazy matcher without storing them
+    >>> count_occurences(iter([1, 10]))
+    2
+    """
+    return sum(1 for _ in occurences)
+
+
+def has_occurence(occurences: Iterable[int]) -> bool:
+    """Check whether a lazy matcher finds any occurence, stopping it at the first one
+    >>> from genomics_algo.exact_matching_algorithms.naive_exact_matching import (
+    ...     iterate_occurences_with_naive_match,
+    ... )
+    >>> has_occurence(iterate_occurences_with_naive_match("ACT", "GACTACGGAGACT"))
+    True
+    """
+    return next(iter(occurences), None) is not None
+
+
+def get_first_occurences(occurences: Iterable[int], n: int) -> List[int]:
+    """Get at most the first `n` occurences of a lazy matcher, stopping it after the
+    `n`-th one, e.g. to drop reads mapping to more than `n` - 1 locations
+    >>> get_first_occurences(iter([1, 10, 12]), 2)
+    [1, 10]
+    """
+    assert n >= 0
+    return list(islice(occurences, n))
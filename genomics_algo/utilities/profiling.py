@@ -0,0 +1,267 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILING_MODES = ("time", "memory")
+# profiling is enabled by setting the environment variable GENOMICS_ALGO_PROFILE
+# before genomics_algo is imported: "memory" also records the peak allocations with
+# tracemalloc, which slows every allocation down, and any other value but "0" only
+# the call counts, times and input sizes. When it is disabled, `profiled` returns the
+# functions unchanged and `profile_section` does nothing, so there is no overhead
+_mode = os.environ.get("GENOMICS_ALGO_PROFILE", "")
+PROFILING = (
+    "memory" if _mode == "memory" else "time" if _mode not in ("", "0") else None
+)
+
+# the peaks of nested sections are only exact from Python 3.9, before which they are
+# the peaks since the start of the outermost section
+_reset_peak = getattr(tracemalloc, "reset_peak", lambda: None)
+
+
+class FunctionMetrics:
+    """Metrics of the calls of a profiled function or section, accumulated over calls
+
+    calls: number of calls
+    wall_seconds: elapsed time
+    cpu_seconds: CPU time of the whole process (so including other threads)
+    total_input_size: sum over calls of the lengths of the sized arguments
+    max_input_size: largest input size of a call
+    peak_memory_bytes: largest memory allocated by a call at any time, above what was
+        allocated when it started (with the ``memory`` profiling mode only, and not
+        measured while another thread or caller is already using ``tracemalloc``)
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.total_input_size = 0
+        self.max_input_size = 0
+        self.peak_memory_bytes = 0
+
+    def add_call(
+        self,
+        wall_seconds: float,
+        cpu_seconds: float,
+        input_size: int,
+        peak_memory_bytes: int,
+    ):
+        self.calls += 1
+        self.wall_seconds += wall_seconds
+        self.cpu_seconds += cpu_seconds
+        self.total_input_size += input_size
+        self.max_input_size = max(self.max_input_size, input_size)
+        self.peak_memory_bytes = max(self.peak_memory_bytes, peak_memory_bytes)
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(vars(self))
+
+    def __repr__(self) -> str:
+        metrics = ", ".join(f"{key}={value}" for key, value in vars(self).items())
+        return f"FunctionMetrics({metrics})"
+
+
+class MetricsRegistry:
+    """Metrics of the profiled functions and sections by name, shared by the threads
+    of a process (worker processes each have their own)
+    >>> registry = MetricsRegistry()
+    >>> registry.record("parse", 0.5, 0.25, 100, 0)
+    >>> registry.record("parse", 0.5, 0.25, 300, 0)
+    >>> registry["parse"]
+    FunctionMetrics(calls=2, wall_seconds=1.0, cpu_seconds=0.5, total_input_size=400, \
+max_input_size=300, peak_memory_bytes=0)
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, FunctionMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float,
+        input_size: int,
+        peak_memory_bytes: int,
+    ):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = FunctionMetrics()
+            self._metrics[name].add_call(
+                wall_seconds, cpu_seconds, input_size, peak_memory_bytes
+            )
+
+    def __getitem__(self, name: str) -> FunctionMetrics:
+        return self._metrics[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def names(self) -> List[str]:
+        return sorted(self._metrics)
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: self._metrics[name].as_dict() for name in sorted(self._metrics)
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def dump(self, filename: str):
+        """Write the metrics to a JSON file"""
+        with open(filename, "w") as f:
+            f.write(self.to_json())
+
+
+REGISTRY = MetricsRegistry()
+
+_memory_frames = threading.local()
+
+
+def _get_memory_frames() -> List[Optional[List[int]]]:
+    """Memory allocated at the start of every section being run by this thread and
+    the peak allocation seen in it so far, or None for sections not measured"""
+    if not hasattr(_memory_frames, "stack"):
+        _memory_frames.stack = []
+    return _memory_frames.stack
+
+
+def _enter_memory_frame():
+    frames = _get_memory_frames()
+    if not frames:
+        if tracemalloc.is_tracing():
+            # leave the measurement of another user of tracemalloc undisturbed
+            frames.append(None)
+            return
+        tracemalloc.start()
+    elif frames[0] is None:
+        frames.append(None)
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    # the peak is reset for the new section, so it is kept by the enclosing one first
+    if frames:
+        frames[-1][1] = max(frames[-1][1], peak)
+    frames.append([current, current])
+    _reset_peak()
+
+
+def _exit_memory_frame() -> int:
+    frames = _get_memory_frames()
+    frame = frames.pop()
+    if frame is None:
+        return 0
+    start, peak = frame
+    peak = max(peak, tracemalloc.get_traced_memory()[1])
+    if frames:
+        frames[-1][1] = max(frames[-1][1], peak)
+    else:
+        tracemalloc.stop()
+    return max(peak - start, 0)
+
+
+def get_input_size(args: tuple, kwargs: Dict[str, Any]) -> int:
+    """Sum of the lengths of the strings, sequences and arrays among arguments
+    >>> get_input_size(("ACT", "GACTACGGAGACT", 2), {"mask": None})
+    16
+    """
+    return sum(
+        len(arg)
+        for arg in args + tuple(kwargs.values())
+        if isinstance(arg, (str, bytes, list, tuple, np.ndarray))
+    )
+
+
+class _Section:
+    """Context manager recording the metrics of one run of a section in a registry"""
+
+    def __init__(self, name: str, input_size: int, registry: MetricsRegistry):
+        self._name = name
+        self._input_size = input_size
+        self._registry = registry
+
+    def __enter__(self) -> "_Section":
+        if PROFILING == "memory":
+            _enter_memory_frame()
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        wall_seconds = time.perf_counter() - self._wall_start
+        cpu_seconds = time.process_time() - self._cpu_start
+        peak_memory_bytes = _exit_memory_frame() if PROFILING == "memory" else 0
+        self._registry.record(
+            self._name, wall_seconds, cpu_seconds, self._input_size, peak_memory_bytes
+        )
+
+
+class _NoOpSection:
+    def __enter__(self) -> "_NoOpSection":
+        return self
+
+    def __exit__(self, *exception):
+        pass
+
+
+_NO_OP_SECTION = _NoOpSection()
+
+
+def profile_section(
+    name: str, input_size: int = 0, registry: MetricsRegistry = REGISTRY
+):
+    """Context manager recording the metrics of a block of code under `name`, doing
+    nothing if profiling is disabled
+    >>> with profile_section("example.section", input_size=10):
+    ...     pass
+    """
+    if PROFILING is None:
+        return _NO_OP_SECTION
+    return _Section(name, input_size, registry)
+
+
+def profiled(
+    function: Optional[Callable] = None,
+    name: Optional[str] = None,
+    registry: MetricsRegistry = REGISTRY,
+) -> Callable:
+    """Decorator recording the metrics of the calls of a function, under `name` or
+    its module (without the package name) and qualified name, returning the function
+    unchanged if profiling is disabled. It can be used as ``@profiled`` or
+    ``@profiled(name=...)``. For generators, only the creation of the generator would
+    be measured, so `profile_section` should be used in them instead
+    """
+    if function is None:
+        return functools.partial(profiled, name=name, registry=registry)
+    if PROFILING is None:
+        return function
+    if name is None:
+        module = function.__module__
+        if module.startswith("genomics_algo."):
+            module = module[len("genomics_algo.") :]
+        name = f"{module}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def profiled_function(*args, **kwargs):
+        with _Section(name, get_input_size(args, kwargs), registry):
+            return function(*args, **kwargs)
+
+    return profiled_function
+
+
+# the metrics are written at exit to the file named by GENOMICS_ALGO_PROFILE_OUTPUT
+if PROFILING is not None and os.environ.get("GENOMICS_ALGO_PROFILE_OUTPUT"):
+    atexit.register(REGISTRY.dump, os.environ["GENOMICS_ALGO_PROFILE_OUTPUT"])
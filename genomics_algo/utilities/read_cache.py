@@ -0,0 +1,274 @@
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from genomics_algo.utilities.read_files import iterate_fastq
+from genomics_algo.utilities.sequence_encoding import (
+    CODE_N,
+    decode_sequence,
+    encode_sequence,
+)
+
+READ_CACHE_MAGIC = b"GAREADS\x00"
+READ_CACHE_VERSION = 1
+DEFAULT_BATCH_SIZE = 100_000
+
+# columns of the cache in the order they are stored in
+_COLUMN_DTYPES = {
+    "read_offsets": np.dtype("<i8"),
+    "bases": np.dtype(np.uint8),
+    "n_positions": np.dtype("<i8"),
+    "qualities": np.dtype(np.uint8),
+    "name_offsets": np.dtype("<i8"),
+    "names": np.dtype(np.uint8),
+}
+_ALIGNMENT = 8
+# shifts of the 4 base codes packed in a byte, first base in the high bits
+_PACKING_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+
+
+def pack_codes(codes: np.ndarray) -> np.ndarray:
+    """Pack base codes without ``N`` 4 per byte, the first one in the high bits, the
+    last byte being padded with ``A``
+    >>> pack_codes(encode_sequence("ACGTC")).tolist()
+    [27, 64]
+    """
+    padded = np.zeros((len(codes) + 3) // 4 * 4, dtype=np.uint8)
+    padded[: len(codes)] = codes & 3
+    return np.bitwise_or.reduce(padded.reshape(-1, 4) << _PACKING_SHIFTS, axis=1)
+
+
+def unpack_codes(packed: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Unpack the base codes from index `start` to `end` of bases packed by `pack_codes`
+    >>> decode_sequence(unpack_codes(pack_codes(encode_sequence("ACGTC")), 1, 5))
+    'CGTC'
+    """
+    packed = np.asarray(packed[start // 4 : (end + 3) // 4])
+    codes = ((packed[:, None] >> _PACKING_SHIFTS) & 3).ravel()
+    return codes[start % 4 : start % 4 + end - start]
+
+
+def _align(position: int) -> int:
+    return (position + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_read_cache(
+    fastq_filename: str, cache_filename: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """Convert a .fastq file once into a read cache, a binary columnar file which
+    `ReadCache` opens without parsing: after a magic number and the length of a JSON
+    header giving the location of every column relative to the end of the header, the
+    columns follow, each aligned to 8 bytes: the offsets of the reads in the
+    concatenated bases, the bases packed with 2 bits per base (see `pack_codes`), the
+    positions of the bases other than ACGT, stored as ``A`` in the packed bases, the
+    qualities as phred33 bytes and the names of the reads with their offsets. Reads
+    are converted in batches of `batch_size` reads, each column being streamed to a
+    temporary file before they are all assembled
+
+    Returns:
+        int: number of reads written
+    """
+    columns = {name: tempfile.TemporaryFile() for name in _COLUMN_DTYPES}
+    try:
+        number_of_reads = 0
+        number_of_bases = 0
+        number_of_name_bytes = 0
+        unpacked_codes = np.zeros(0, dtype=np.uint8)
+        for offsets_column in ("read_offsets", "name_offsets"):
+            columns[offsets_column].write(np.zeros(1, dtype="<i8").tobytes())
+        records = iterate_fastq(fastq_filename)
+        while True:
+            batch = list(islice(records, batch_size))
+            if len(batch) == 0:
+                break
+            names, reads, qualities = zip(*batch)
+            read_lengths = np.array([len(read) for read in reads], dtype="<i8")
+            if read_lengths.tolist() != [len(quality) for quality in qualities]:
+                raise ValueError(
+                    f"Reads and qualities of different lengths in {fastq_filename}"
+                )
+            codes = encode_sequence("".join(reads))
+            columns["n_positions"].write(
+                (np.nonzero(codes == CODE_N)[0] + number_of_bases)
+                .astype("<i8")
+                .tobytes()
+            )
+            # bases are packed 4 by 4, the remaining ones wait for the next batch
+            codes = np.concatenate((unpacked_codes, codes & 3))
+            packed_length = len(codes) // 4 * 4
+            columns["bases"].write(pack_codes(codes[:packed_length]).tobytes())
+            unpacked_codes = codes[packed_length:]
+            columns["qualities"].write("".join(qualities).encode("ascii"))
+            columns["read_offsets"].write(
+                (number_of_bases + np.cumsum(read_lengths)).tobytes()
+            )
+            encoded_names = [name.encode("utf-8") for name in names]
+            columns["names"].write(b"".join(encoded_names))
+            columns["name_offsets"].write(
+                (
+                    number_of_name_bytes
+                    + np.cumsum([len(name) for name in encoded_names], dtype="<i8")
+                ).tobytes()
+            )
+            number_of_reads += len(batch)
+            number_of_bases += int(read_lengths.sum())
+            number_of_name_bytes += sum(len(name) for name in encoded_names)
+        columns["bases"].write(pack_codes(unpacked_codes).tobytes())
+
+        # columns are located relative to the aligned end of the header
+        column_locations = {}
+        position = 0
+        for name, column in columns.items():
+            column_locations[name] = [position, column.tell()]
+            position = _align(position + column.tell())
+        header = json.dumps(
+            _get_header(number_of_reads, number_of_bases, column_locations)
+        ).encode()
+        data_start = _align(len(READ_CACHE_MAGIC) + 8 + len(header))
+
+        with open(cache_filename, "wb") as f:
+            f.write(READ_CACHE_MAGIC)
+            f.write(np.array([len(header)], dtype="<u8").tobytes())
+            f.write(header)
+            for name, column in columns.items():
+                f.write(b"\0" * (data_start + column_locations[name][0] - f.tell()))
+                column.seek(0)
+                shutil.copyfileobj(column, f)
+    finally:
+        for column in columns.values():
+            column.close()
+    return number_of_reads
+
+
+def _get_header(
+    number_of_reads: int, number_of_bases: int, column_locations: Dict[str, List[int]]
+) -> Dict:
+    return {
+        "version": READ_CACHE_VERSION,
+        "number_of_reads": number_of_reads,
+        "number_of_bases": number_of_bases,
+        "columns": {
+            name: {
+                "dtype": _COLUMN_DTYPES[name].str,
+                "offset": location[0],
+                "nbytes": location[1],
+            }
+            for name, location in column_locations.items()
+        },
+    }
+
+
+class ReadCache:
+    """Reads of a cache written by `write_read_cache`, memory mapped so that opening it
+    costs nothing and only the accessed parts are read from disk. Offsets, qualities
+    and names are zero-copy views of the file, bases are unpacked on access. Instances
+    can be passed to the QC functions of `seq_reads_processing` and
+    `seq_read_qualities_processing` instead of lists of strings
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            if f.read(len(READ_CACHE_MAGIC)) != READ_CACHE_MAGIC:
+                raise ValueError(f"{filename} is not a read cache")
+            header_length = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+            self.metadata = json.loads(f.read(header_length))
+        if self.metadata["version"] != READ_CACHE_VERSION:
+            raise ValueError(
+                f"Unsupported read cache version {self.metadata['version']}"
+            )
+        data = np.memmap(filename, dtype=np.uint8, mode="r")
+        data_start = _align(len(READ_CACHE_MAGIC) + 8 + header_length)
+        columns = {}
+        for name, column in self.metadata["columns"].items():
+            start = data_start + column["offset"]
+            columns[name] = data[start : start + column["nbytes"]].view(
+                np.dtype(column["dtype"])
+            )
+        self.read_offsets = columns["read_offsets"]
+        self.packed_bases = columns["bases"]
+        self.n_positions = columns["n_positions"]
+        self.qualities = columns["qualities"]
+        self.name_offsets = columns["name_offsets"]
+        self.names = columns["names"]
+
+    def __len__(self) -> int:
+        return self.metadata["number_of_reads"]
+
+    def _get_range(self, start: int, end: Optional[int]) -> Tuple[int, int]:
+        end = len(self) if end is None else min(end, len(self))
+        assert 0 <= start <= end
+        return start, end
+
+    def get_read_lengths(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        start, end = self._get_range(start, end)
+        return np.diff(self.read_offsets[start : end + 1])
+
+    def get_codes(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the base codes (see `encode_sequence`) of the reads `start` to `end`
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: concatenated codes of the reads and the
+                offsets of each read in them, ending with the number of codes
+        """
+        start, end = self._get_range(start, end)
+        first_base = int(self.read_offsets[start])
+        last_base = int(self.read_offsets[end])
+        codes = unpack_codes(self.packed_bases, first_base, last_base)
+        n_positions = self.n_positions[
+            np.searchsorted(self.n_positions, first_base) : np.searchsorted(
+                self.n_positions, last_base
+            )
+        ]
+        codes[n_positions - first_base] = CODE_N
+        return codes, self.read_offsets[start : end + 1] - first_base
+
+    def get_quality_bytes(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the phred33 qualities of the reads `start` to `end` as a zero-copy view
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: concatenated qualities of the reads and the
+                offsets of each read in them, ending with the number of qualities
+        """
+        start, end = self._get_range(start, end)
+        first_base = int(self.read_offsets[start])
+        return (
+            self.qualities[first_base : self.read_offsets[end]],
+            self.read_offsets[start : end + 1] - first_base,
+        )
+
+    def get_reads(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        codes, offsets = self.get_codes(start, end)
+        sequence = decode_sequence(codes)
+        return [sequence[i:j] for i, j in zip(offsets[:-1], offsets[1:])]
+
+    def get_qualities(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        qualities, offsets = self.get_quality_bytes(start, end)
+        qualities = qualities.tobytes().decode("ascii")
+        return [qualities[i:j] for i, j in zip(offsets[:-1], offsets[1:])]
+
+    def get_names(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        start, end = self._get_range(start, end)
+        offsets = self.name_offsets[start : end + 1].tolist()
+        names = self.names[offsets[0] : offsets[-1]].tobytes()
+        return [
+            names[i - offsets[0] : j - offsets[0]].decode("utf-8")
+            for i, j in zip(offsets[:-1], offsets[1:])
+        ]
+
+    def iterate_batches(
+        self, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[Tuple[int, int]]:
+        """Yield the start and end of consecutive ranges of at most `batch_size`
+        reads"""
+        for start in range(0, len(self), batch_size):
+            yield start, min(start + batch_size, len(self))
@@ -1,6 +1,19 @@
-from typing import List, Tuple
+import gzip
+import queue
+import threading
 
+from itertools import islice
+from typing import IO, Iterator, List, NamedTuple, Tuple
 
+from genomics_algo.utilities.profiling import profiled
+
+DEFAULT_PAIRED_BATCH_SIZE = 10_000
+DEFAULT_GENOME_CHUNK_SIZE = 1_000_000
+# batches read ahead by the background thread of each file
+_PREFETCH_BATCHES = 4
+
+
+@profiled
 def read_genome(filename: str) -> str:
     """
     Reads a genome from a .fa file
@@ -17,6 +30,36 @@ def read_genome(filename: str) -> str:
     return genome
 
 
+def iterate_genome_chunks(
+    filename: str, chunk_size: int = DEFAULT_GENOME_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Reads a genome from a .fa file like `read_genome`, but yields it in chunks of at
+    least `chunk_size` bases (the last one may be shorter) so that the whole genome is
+    never held in memory
+
+    filename: relative or absolute path of the .fa file to be read from
+    chunk_size: minimum number of bases in a chunk
+    """
+    assert chunk_size > 0
+    lines = []
+    number_of_bases = 0
+    with open_text_file(filename) as f:
+        for line in f:
+            if line.startswith(">"):
+                continue
+            line = line.rstrip()
+            lines.append(line)
+            number_of_bases += len(line)
+            if number_of_bases >= chunk_size:
+                yield "".join(lines)
+                lines = []
+                number_of_bases = 0
+    if number_of_bases:
+        yield "".join(lines)
+
+
+@profiled
 def read_fastq(filename: str) -> Tuple[List[str], List[str]]:
     """
     Reads sequences and qualities from a .fastq file
@@ -42,3 +85,158 @@ def read_fastq(filename: str) -> Tuple[List[str], List[str]]:
             qualities.append(seq_qualities)
 
     return reads, qualities
+
+
+def iterate_fastq(filename: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Streams records from a .fastq file one at a time instead of loading all of them
+
+    filename: relative or absolute path of the .fastq file to be read from, which is
+        decompressed on the fly if it ends with ``.gz``
+
+    Yields:
+        Name of the read (header line without the leading ``@``), sequence read and
+        its qualities
+    """
+    with open_text_file(filename) as f:
+        while True:
+            header = f.readline().rstrip()
+            read = f.readline().rstrip()
+            f.readline()
+            seq_qualities = f.readline().rstrip()
+            if len(read) == 0:
+                break
+            yield header[1:], read, seq_qualities
+
+
+def open_text_file(filename: str) -> IO[str]:
+    """Open a text file for reading, decompressing it on the fly if it ends with
+    ``.gz``"""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "rt")
+    return open(filename, "r")
+
+
+def get_mate_id(name: str) -> str:
+    """
+    Get the ID shared by both mates of a read pair from the name of a read, i.e. its
+    first word without a ``/1`` or ``/2`` suffix
+    >>> get_mate_id("SRR835775.1/1 length=100")
+    'SRR835775.1'
+    >>> get_mate_id("SRR835775.1 2:N:0:1")
+    'SRR835775.1'
+    """
+    words = name.split(maxsplit=1)
+    mate_id = words[0] if len(words) > 0 else ""
+    if mate_id.endswith(("/1", "/2")):
+        return mate_id[:-2]
+    return mate_id
+
+
+class PairedReadBatch(NamedTuple):
+    """Mates of consecutive read pairs, the i-th read of both files forming a pair"""
+
+    ids: List[str]
+    reads_1: List[str]
+    qualities_1: List[str]
+    reads_2: List[str]
+    qualities_2: List[str]
+
+
+class _FastqBatchReader(threading.Thread):
+    """Thread reading (and decompressing) batches of records of a .fastq file ahead
+    into a bounded queue, an empty batch marking the end of the file"""
+
+    def __init__(self, filename: str, batch_size: int):
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.batch_size = batch_size
+        self.batches = queue.Queue(maxsize=_PREFETCH_BATCHES)
+        self.stopped = threading.Event()
+
+    def run(self):
+        records = iterate_fastq(self.filename)
+        try:
+            while not self.stopped.is_set():
+                batch = list(islice(records, self.batch_size))
+                self._put(batch)
+                if len(batch) == 0:
+                    break
+        except Exception as error:
+            self._put(error)
+        finally:
+            records.close()
+
+    def _put(self, item):
+        # waits for room in the queue, unless the consumer stopped reading
+        while not self.stopped.is_set():
+            try:
+                self.batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get_batch(self) -> List[Tuple[str, str, str]]:
+        batch = self.batches.get()
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    def stop(self):
+        self.stopped.set()
+
+
+def iterate_paired_fastq(
+    filename_1: str,
+    filename_2: str,
+    batch_size: int = DEFAULT_PAIRED_BATCH_SIZE,
+    validate_ids: bool = True,
+) -> Iterator[PairedReadBatch]:
+    """
+    Streams the read pairs of two .fastq files (R1 and R2) in lockstep, in batches of
+    `batch_size` pairs. Each file is read and decompressed in its own background
+    thread a few batches ahead, so that I/O overlaps with the processing of the
+    batches. Raises ``ValueError`` if the files have different numbers of reads or,
+    with `validate_ids`, if the IDs of two mates differ (see `get_mate_id`)
+
+    filename_1, filename_2: .fastq files of the first and second mates, possibly gzipped
+
+    Yields:
+        PairedReadBatch: IDs, sequence reads and qualities of the pairs
+    """
+    assert batch_size > 0
+    readers = [
+        _FastqBatchReader(filename, batch_size) for filename in (filename_1, filename_2)
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        number_of_pairs = 0
+        while True:
+            batch_1 = readers[0].get_batch()
+            batch_2 = readers[1].get_batch()
+            if len(batch_1) != len(batch_2):
+                raise ValueError(
+                    f"{filename_1} and {filename_2} have different numbers of reads"
+                )
+            if len(batch_1) == 0:
+                return
+            ids = [get_mate_id(name) for name, _, _ in batch_1]
+            if validate_ids:
+                for index, (mate_id, (name, _, _)) in enumerate(zip(ids, batch_2)):
+                    if mate_id != get_mate_id(name):
+                        raise ValueError(
+                            f"Mates of pair {number_of_pairs + index} have different "
+                            f"IDs: {mate_id} and {get_mate_id(name)}"
+                        )
+            number_of_pairs += len(batch_1)
+            yield PairedReadBatch(
+                ids,
+                [read for _, read, _ in batch_1],
+                [qualities for _, _, qualities in batch_1],
+                [read for _, read, _ in batch_2],
+                [qualities for _, _, qualities in batch_2],
+            )
+    finally:
+        for reader in readers:
+            reader.stop()
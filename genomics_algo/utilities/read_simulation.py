@@ -0,0 +1,238 @@
+import gzip
+
+import numpy as np
+
+from typing import Iterator, List, NamedTuple, Optional
+
+from genomics_algo.utilities.seq_read_qualities_processing import (
+    map_errorprobability_to_phred33,
+)
+from genomics_algo.utilities.sequence_encoding import (
+    CODE_N,
+    COMPLEMENT_CODES,
+    codes_to_ascii,
+    encode_sequence,
+)
+
+DEFAULT_BATCH_SIZE = 10_000
+MAX_QUALITY_SCORE = 41
+# quality score given to the bases the simulator made erroneous
+ERROR_QUALITY_SCORE = 2
+_PHRED33_OFFSET = 33
+_HEADER_PREFIX = b"@sim_"
+_HEADER_DIGITS = 10
+
+
+class SimulatedReadBatch(NamedTuple):
+    """A batch of simulated reads of equal length. `sequences` and `qualities` are
+    ``(number of reads, read length)`` arrays of ASCII characters, `start_positions`
+    are the 0-based starts on the forward strand of the genome and `reverse` is True
+    for reads taken from the reverse strand"""
+
+    start_positions: np.ndarray
+    reverse: np.ndarray
+    sequences: np.ndarray
+    qualities: np.ndarray
+
+    @property
+    def reads(self) -> List[str]:
+        return [row.tobytes().decode("ascii") for row in self.sequences]
+
+    @property
+    def read_qualities(self) -> List[str]:
+        return [row.tobytes().decode("ascii") for row in self.qualities]
+
+
+def _error_free_quality_score(error_rate: float) -> int:
+    """Phred quality score matching the per base error rate of the simulation
+    >>> _error_free_quality_score(0.01)
+    20
+    >>> _error_free_quality_score(0.0)
+    41
+    """
+    if error_rate <= 0:
+        return MAX_QUALITY_SCORE
+    quality_score = round(map_errorprobability_to_phred33(error_rate))
+    return int(min(max(quality_score, ERROR_QUALITY_SCORE), MAX_QUALITY_SCORE))
+
+
+def _draw_mask(rng: np.random.Generator, rate: float, shape) -> np.ndarray:
+    """Draw a boolean mask where each entry is True with probability `rate`"""
+    if rate <= 0:
+        return np.zeros(shape, dtype=bool)
+    return rng.random(shape) < rate
+
+
+def _simulate_read_batch(
+    genome_codes: np.ndarray,
+    rng: np.random.Generator,
+    number_of_reads: int,
+    read_length: int,
+    substitution_rate: float,
+    insertion_rate: float,
+    deletion_rate: float,
+    reverse_strand_probability: float,
+) -> SimulatedReadBatch:
+    """Helper function simulating one batch of reads with vectorized operations only"""
+    shape = (number_of_reads, read_length)
+    is_insertion = _draw_mask(rng, insertion_rate, shape)
+    is_deletion = _draw_mask(rng, deletion_rate, shape) & ~is_insertion
+
+    # the genome offset of each read base, counted from the start of the read: bases
+    # before it that were not insertions, plus deleted genome bases before it
+    consumed = ~is_insertion
+    genome_offsets = (
+        np.cumsum(consumed, axis=1) - consumed + np.cumsum(is_deletion, axis=1)
+    )
+    spans = consumed.sum(axis=1) + is_deletion.sum(axis=1)
+    possible_starts = np.maximum(len(genome_codes) - spans + 1, 1)
+    start_positions = (rng.random(number_of_reads) * possible_starts).astype(np.int64)
+    genome_indices = np.minimum(
+        start_positions[:, None] + genome_offsets, len(genome_codes) - 1
+    )
+    codes = genome_codes[genome_indices]
+
+    is_substitution = (
+        _draw_mask(rng, substitution_rate, shape) & consumed & (codes != CODE_N)
+    )
+    if is_substitution.any():
+        # adding 1 to 3 modulo 4 always yields a different base
+        shifted = (codes + rng.integers(1, 4, shape, dtype=np.uint8)) % 4
+        codes = np.where(is_substitution, shifted, codes)
+    if is_insertion.any():
+        codes = np.where(is_insertion, rng.integers(0, 4, shape, dtype=np.uint8), codes)
+
+    reverse = _draw_mask(rng, reverse_strand_probability, number_of_reads)
+    codes[reverse] = COMPLEMENT_CODES[codes[reverse, ::-1]]
+    is_error = is_substitution | is_insertion
+    is_error[reverse] = is_error[reverse, ::-1]
+
+    error_free_quality = _error_free_quality_score(
+        substitution_rate + insertion_rate + deletion_rate
+    )
+    qualities = np.where(is_error, ERROR_QUALITY_SCORE, error_free_quality)
+    return SimulatedReadBatch(
+        start_positions=start_positions,
+        reverse=reverse,
+        sequences=codes_to_ascii(codes),
+        qualities=(qualities + _PHRED33_OFFSET).astype(np.uint8),
+    )
+
+
+def simulate_reads(
+    genome: str,
+    number_of_reads: int,
+    read_length: int,
+    substitution_rate: float = 0.0,
+    insertion_rate: float = 0.0,
+    deletion_rate: float = 0.0,
+    reverse_strand_probability: float = 0.5,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[SimulatedReadBatch]:
+    """Simulate sequencing reads of length `read_length` from random positions of a
+    genome in batches of `batch_size` reads. Each read base independently is an
+    inserted random base with probability `insertion_rate`, is preceded by a deleted
+    genome base with probability `deletion_rate`, and is substituted by a different base
+    with probability `substitution_rate`. Reads are reverse complemented with
+    probability `reverse_strand_probability`. Erroneous bases get the quality score
+    `ERROR_QUALITY_SCORE`, all others the score matching the total error rate
+    >>> batch = next(simulate_reads("ACGTTGCA" * 4, 2, 5, seed=1))
+    >>> [len(read) for read in batch.reads]
+    [5, 5]
+    >>> batch.read_qualities
+    ['JJJJJ', 'JJJJJ']
+    """
+    assert 0 <= read_length <= len(genome)
+    assert batch_size > 0
+    genome_codes = encode_sequence(genome)
+    rng = np.random.default_rng(seed)
+    for batch_start in range(0, number_of_reads, batch_size):
+        yield _simulate_read_batch(
+            genome_codes,
+            rng,
+            min(batch_size, number_of_reads - batch_start),
+            read_length,
+            substitution_rate,
+            insertion_rate,
+            deletion_rate,
+            reverse_strand_probability,
+        )
+
+
+def _format_digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Format non-negative integers as zero padded ASCII digits, one row per value
+    >>> _format_digits(np.array([7, 1234]), 5).tobytes()
+    b'0000701234'
+    """
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return ((values[:, None] // powers) % 10 + ord("0")).astype(np.uint8)
+
+
+def format_fastq_batch(batch: SimulatedReadBatch, first_read_index: int) -> bytes:
+    """Format a batch of simulated reads as FASTQ records. All records of a batch have
+    the same length, so the whole batch is laid out in one array without a loop over
+    the reads. Read names have the form ``sim_<read index>_<start position>_<strand>``
+    """
+    number_of_reads = len(batch.start_positions)
+    read_indices = np.arange(first_read_index, first_read_index + number_of_reads)
+    strands = np.where(batch.reverse, ord("-"), ord("+")).astype(np.uint8)
+    newlines = np.full((number_of_reads, 1), ord("\n"), dtype=np.uint8)
+    underscores = np.full((number_of_reads, 1), ord("_"), dtype=np.uint8)
+    records = np.hstack(
+        [
+            np.tile(
+                np.frombuffer(_HEADER_PREFIX, dtype=np.uint8), (number_of_reads, 1)
+            ),
+            _format_digits(read_indices, _HEADER_DIGITS),
+            underscores,
+            _format_digits(batch.start_positions, _HEADER_DIGITS),
+            underscores,
+            strands[:, None],
+            newlines,
+            batch.sequences,
+            newlines,
+            np.full((number_of_reads, 1), ord("+"), dtype=np.uint8),
+            newlines,
+            batch.qualities,
+            newlines,
+        ]
+    )
+    return records.tobytes()
+
+
+def write_simulated_fastq(
+    genome: str,
+    filename: str,
+    number_of_reads: int,
+    read_length: int,
+    substitution_rate: float = 0.0,
+    insertion_rate: float = 0.0,
+    deletion_rate: float = 0.0,
+    reverse_strand_probability: float = 0.5,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Simulate reads (see `simulate_reads`) and stream them straight to a .fastq file,
+    which is gzip compressed if `filename` ends with ``.gz``
+
+    Returns:
+        int: number of reads written
+    """
+    opener = gzip.open if filename.endswith(".gz") else open
+    reads_written = 0
+    with opener(filename, "wb") as f:
+        for batch in simulate_reads(
+            genome,
+            number_of_reads,
+            read_length,
+            substitution_rate,
+            insertion_rate,
+            deletion_rate,
+            reverse_strand_probability,
+            seed,
+            batch_size,
+        ):
+            f.write(format_fastq_batch(batch, reads_written))
+            reads_written += len(batch.start_positions)
+    return reads_written
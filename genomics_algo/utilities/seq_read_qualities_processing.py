@@ -1,7 +1,11 @@
 import math
 
+import numpy as np
+
 from collections import Counter
-from typing import List, Tuple
+from typing import List, Tuple, Union
+
+from genomics_algo.utilities.read_cache import ReadCache
 
 
 def map_phred33_to_error_probability(phred33: str) -> float:
@@ -24,8 +28,19 @@ def map_phred33_ascii_to_qualityscore(phred33_char: str) -> float:
     return ord(phred33_char) - 33
 
 
-def get_freq_for_qualities(qualities: List[str]) -> Tuple[List[str], List[int]]:
-    """Generates a frequency distribution from a list of quality strings"""
+def get_freq_for_qualities(
+    qualities: Union[List[str], ReadCache],
+) -> Tuple[List[str], List[int]]:
+    """Generates a frequency distribution from a list of quality strings, or from the
+    qualities of a `ReadCache`, counted directly on the memory mapped bytes"""
+    if isinstance(qualities, ReadCache):
+        counts = np.zeros(256, dtype=np.int64)
+        for start, end in qualities.iterate_batches():
+            counts += np.bincount(
+                qualities.get_quality_bytes(start, end)[0], minlength=256
+            )
+        values = np.nonzero(counts)[0]
+        return (values - 33).tolist(), counts[values].tolist()
     concatenated_qualities = "".join(qualities)
     quality_scores = [
         map_phred33_ascii_to_qualityscore(char) for char in concatenated_qualities
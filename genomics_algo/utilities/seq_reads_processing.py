@@ -1,13 +1,19 @@
 import numpy as np
 
 from collections import Counter
-from typing import List
+from typing import List, Union
 
+from genomics_algo.utilities.read_cache import ReadCache
+from genomics_algo.utilities.sequence_encoding import ALPHABET
 
-def find_GC_by_position(reads: List[str]) -> np.ndarray:
+
+def find_GC_by_position(reads: Union[List[str], ReadCache]) -> np.ndarray:
     """
-    Returns the average GC content per index in a list of sequencing reads
+    Returns the average GC content per index in a list of sequencing reads, or in
+    the reads of a `ReadCache`, which are processed batch by batch from their codes
     """
+    if isinstance(reads, ReadCache):
+        return _find_GC_by_position_in_cache(reads)
     assert same_length_reads(reads)
     reads_length = len(reads[0])
     gc = np.zeros(reads_length)
@@ -20,14 +26,36 @@ def find_GC_by_position(reads: List[str]) -> np.ndarray:
     return gc
 
 
-def get_base_freq(reads: List[str]):
+def _find_GC_by_position_in_cache(read_cache: ReadCache) -> np.ndarray:
+    """Same as `find_GC_by_position` for the reads of a `ReadCache`"""
+    read_lengths = read_cache.get_read_lengths()
+    assert len(read_lengths) > 0 and read_lengths.min() == read_lengths.max()
+    gc = np.zeros(read_lengths[0])
+    for start, end in read_cache.iterate_batches():
+        codes, _ = read_cache.get_codes(start, end)
+        codes = codes.reshape(end - start, -1)
+        gc += ((codes == 1) | (codes == 2)).sum(axis=0)
+    return gc / len(read_cache)
+
+
+def get_base_freq(reads: Union[List[str], ReadCache]):
     """
-    Returns the aggregate frequency of bases in the sequencing reads
+    Returns the aggregate frequency of bases in the sequencing reads, or in the reads
+    of a `ReadCache`, where bases other than ACGT are all counted as ``N``
     >>> get_base_freq(["NAACGTTA"])
     Counter({'A': 3, 'T': 2, 'N': 1, 'C': 1, 'G': 1})
     >>> get_base_freq(["AACGTTA", "CGCGTTT"])
     Counter({'T': 5, 'A': 3, 'C': 3, 'G': 3})
     """
+    if isinstance(reads, ReadCache):
+        counts = np.zeros(len(ALPHABET), dtype=np.int64)
+        for start, end in reads.iterate_batches():
+            counts += np.bincount(
+                reads.get_codes(start, end)[0], minlength=len(ALPHABET)
+            )
+        return Counter(
+            {base: count for base, count in zip(ALPHABET, counts.tolist()) if count > 0}
+        )
     concatenated_reads = "".join(reads)
     return Counter(concatenated_reads)
 
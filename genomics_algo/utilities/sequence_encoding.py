@@ -0,0 +1,140 @@
+import numpy as np
+
+from typing import Tuple
+
+# base codes follow the order of the bases in the alphabet, ``N`` is any other base
+ALPHABET = "ACGTN"
+CODE_N = 4
+
+# maps every ASCII character to its 2-bit base code, anything that is not a
+# (lowercase or uppercase) A, C, G or T is mapped to the code of ``N``
+_ASCII_TO_CODE = np.full(256, CODE_N, dtype=np.uint8)
+for _code, _base in enumerate(ALPHABET[:CODE_N]):
+    _ASCII_TO_CODE[ord(_base)] = _code
+    _ASCII_TO_CODE[ord(_base.lower())] = _code
+
+_CODE_TO_ASCII = np.frombuffer(ALPHABET.encode("ascii"), dtype=np.uint8)
+
+# complement of each base code, A <-> T, C <-> G and N <-> N
+COMPLEMENT_CODES = np.array([3, 2, 1, 0, CODE_N], dtype=np.uint8)
+
+# (shift, mask) pairs swapping neighbouring groups of 2, 4, 8 and 16 bits of a uint64
+_GROUP_SWAP_MASKS = [
+    (np.uint64(2), np.uint64(0x3333333333333333)),
+    (np.uint64(4), np.uint64(0x0F0F0F0F0F0F0F0F)),
+    (np.uint64(8), np.uint64(0x00FF00FF00FF00FF)),
+    (np.uint64(16), np.uint64(0x0000FFFF0000FFFF)),
+]
+
+
+def encode_sequence(sequence: str) -> np.ndarray:
+    """Encode a DNA sequence into an array of base codes (A=0, C=1, G=2, T=3, N=4)
+    >>> encode_sequence("ACGTN")
+    array([0, 1, 2, 3, 4], dtype=uint8)
+    >>> encode_sequence("acgRt")
+    array([0, 1, 2, 4, 3], dtype=uint8)
+    >>> encode_sequence("")
+    array([], dtype=uint8)
+    """
+    return _ASCII_TO_CODE[np.frombuffer(sequence.encode("ascii"), dtype=np.uint8)]
+
+
+def codes_to_ascii(codes: np.ndarray) -> np.ndarray:
+    """Map an array of base codes (of any shape) to the ASCII values of the bases"""
+    return _CODE_TO_ASCII[np.asarray(codes, dtype=np.uint8)]
+
+
+def decode_sequence(codes: np.ndarray) -> str:
+    """Decode an array of base codes back into a DNA sequence
+    >>> decode_sequence(encode_sequence("GATTACA"))
+    'GATTACA'
+    >>> decode_sequence(encode_sequence("GANNA"))
+    'GANNA'
+    """
+    return codes_to_ascii(codes).tobytes().decode("ascii")
+
+
+def encode_kmer(kmer: str) -> int:
+    """Pack a k-mer (without ``N``) into an integer using 2 bits per base
+    >>> encode_kmer("ACGT")
+    27
+    >>> encode_kmer("")
+    0
+    """
+    code = 0
+    for base_code in encode_sequence(kmer).tolist():
+        assert base_code != CODE_N
+        code = (code << 2) | base_code
+    return code
+
+
+def encode_kmers(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack every k-mer of an encoded sequence into an unsigned 64 bit integer
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the k-mer codes for each start position and a
+            mask which is False for k-mers overlapping an ``N``
+    >>> kmers, valid = encode_kmers(encode_sequence("ACGTNA"), 2)
+    >>> kmers
+    array([ 1,  6, 11, 12,  0], dtype=uint64)
+    >>> valid
+    array([ True,  True,  True, False, False])
+    """
+    assert 0 < k <= 32
+    number_of_kmers = max(len(codes) - k + 1, 0)
+    kmers = np.zeros(number_of_kmers, dtype=np.uint64)
+    for offset in range(k):
+        kmers <<= np.uint64(2)
+        kmers |= (codes[offset : offset + number_of_kmers] & 3).astype(np.uint64)
+    n_count = np.concatenate(([0], np.cumsum(codes == CODE_N)))
+    valid = n_count[k : k + number_of_kmers] == n_count[:number_of_kmers]
+    return kmers, valid
+
+
+def reverse_complement_codes(codes: np.ndarray) -> np.ndarray:
+    """Reverse complement an encoded DNA sequence (``N`` stays ``N``)
+    >>> decode_sequence(reverse_complement_codes(encode_sequence("AACGN")))
+    'NCGTT'
+    """
+    return COMPLEMENT_CODES[codes[::-1]]
+
+
+def decode_kmer(code: int, k: int) -> str:
+    """Unpack a k-mer packed with 2 bits per base
+    >>> decode_kmer(encode_kmer("GATTACA"), 7)
+    'GATTACA'
+    """
+    return "".join(ALPHABET[(int(code) >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+
+def reverse_complement_kmers(kmers: np.ndarray, k: int) -> np.ndarray:
+    """Reverse complement 2-bit packed k-mers with bit operations: complementing a base
+    code is flipping both its bits, and the order of the bases is reversed by swapping
+    ever larger groups of bits, all on whole arrays at once
+    >>> kmers = np.array([encode_kmer("AACGT"), encode_kmer("GATTA")], dtype=np.uint64)
+    >>> [decode_kmer(kmer, 5) for kmer in reverse_complement_kmers(kmers, 5)]
+    ['ACGTT', 'TAATC']
+    """
+    assert 0 < k <= 32
+    dtype = np.asarray(kmers).dtype
+    reversed_kmers = ~np.asarray(kmers, dtype=np.uint64)
+    for shift, mask in _GROUP_SWAP_MASKS:
+        reversed_kmers = ((reversed_kmers >> shift) & mask) | (
+            (reversed_kmers & mask) << shift
+        )
+    reversed_kmers = (reversed_kmers >> np.uint64(32)) | (
+        reversed_kmers << np.uint64(32)
+    )
+    return (reversed_kmers >> np.uint64(64 - 2 * k)).astype(dtype)
+
+
+def encode_canonical_kmers(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack every k-mer of an encoded sequence like `encode_kmers`, but keep the
+    smaller of the codes of the k-mer and of its reverse complement, so that a k-mer
+    and its reverse complement are counted as the same k-mer
+    >>> kmers, valid = encode_canonical_kmers(encode_sequence("AACGTT"), 2)
+    >>> [decode_kmer(kmer, 2) for kmer in kmers]
+    ['AA', 'AC', 'CG', 'AC', 'AA']
+    """
+    kmers, valid = encode_kmers(codes, k)
+    return np.minimum(kmers, reverse_complement_kmers(kmers, k)), valid
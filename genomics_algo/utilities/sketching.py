@@ -0,0 +1,346 @@
+import os
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from genomics_algo.utilities.read_files import read_genome
+from genomics_algo.utilities.sequence_encoding import (
+    encode_canonical_kmers,
+    encode_kmers,
+    encode_sequence,
+)
+
+DEFAULT_KMER_LENGTH = 21
+DEFAULT_SKETCH_SIZE = 1000
+DEFAULT_WINDOW_SIZE = 10
+_MAX_HASH = np.iinfo(np.uint64).max
+
+
+class MinHashSketch(NamedTuple):
+    """Bottom-k MinHash sketch of a sequence: the `sketch_size` smallest distinct hash
+    values of its k-mers, sorted. Sketches can only be compared if they were built
+    with the same `k`, `seed` and `canonical` setting"""
+
+    name: str
+    k: int
+    sketch_size: int
+    seed: int
+    canonical: bool
+    hashes: np.ndarray
+
+
+def hash_kmers(kmers: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Hash packed k-mer codes to uniformly distributed 64 bit values with the
+    splitmix64 finalizer, which is a bijection so distinct k-mers never collide
+    >>> hash_kmers(np.array([0, 1, 2], dtype=np.uint64)).dtype
+    dtype('uint64')
+    >>> len(set(hash_kmers(np.arange(1000, dtype=np.uint64)).tolist()))
+    1000
+    """
+    hashes = np.asarray(kmers, dtype=np.uint64) + np.uint64(
+        (0x9E3779B97F4A7C15 * (seed + 1)) % 2**64
+    )
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def _hash_sequence(
+    sequence: str, k: int, seed: int, canonical: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash all k-mers of a sequence, returning the hashes and the mask of k-mers
+    without ``N``"""
+    encode = encode_canonical_kmers if canonical else encode_kmers
+    kmers, valid = encode(encode_sequence(sequence), k)
+    return hash_kmers(kmers, seed), valid
+
+
+def _get_smallest_distinct(values: np.ndarray, count: int) -> np.ndarray:
+    """Get the `count` smallest distinct values, sorted. Only values below a threshold
+    found with `np.partition` are sorted, and the threshold is raised until enough
+    distinct values are below it
+    >>> _get_smallest_distinct(np.array([5, 1, 1, 1, 3, 2, 9]), 3)
+    array([1, 2, 3])
+    """
+    candidates = count
+    while True:
+        if candidates >= len(values):
+            return np.unique(values)[:count]
+        threshold = np.partition(values, candidates - 1)[candidates - 1]
+        smallest = np.unique(values[values <= threshold])
+        if len(smallest) >= count:
+            return smallest[:count]
+        candidates *= 2
+
+
+def sketch_sequence(
+    sequence: str,
+    k: int = DEFAULT_KMER_LENGTH,
+    sketch_size: int = DEFAULT_SKETCH_SIZE,
+    seed: int = 0,
+    canonical: bool = True,
+    name: str = "",
+) -> MinHashSketch:
+    """Build the bottom-k MinHash sketch of a sequence in one vectorized pass over its
+    k-mers. With `canonical` a k-mer and its reverse complement hash the same, so the
+    sketch does not depend on the strand a sequence was assembled on
+    >>> sketch = sketch_sequence("ACGTTGCA" * 10, k=4, sketch_size=3)
+    >>> len(sketch.hashes)
+    3
+    """
+    assert sketch_size > 0
+    hashes, valid = _hash_sequence(sequence, k, seed, canonical)
+    return MinHashSketch(
+        name=name,
+        k=k,
+        sketch_size=sketch_size,
+        seed=seed,
+        canonical=canonical,
+        hashes=_get_smallest_distinct(hashes[valid], sketch_size),
+    )
+
+
+def find_minimizers(
+    sequence: str,
+    k: int = DEFAULT_KMER_LENGTH,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    seed: int = 0,
+    canonical: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the (window, k)-minimizers of a sequence: in every window of `window_size`
+    consecutive k-mers, the k-mer with the smallest hash (the leftmost one on ties).
+    Windows are evaluated all at once on a sliding view of the hashes, k-mers with
+    ``N`` are never selected
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted distinct start positions of the
+            minimizers and their hashes
+    >>> positions, hashes = find_minimizers("ACGTTGCAAC" * 5, k=4, window_size=3)
+    >>> bool(np.all(np.diff(positions) <= 3))
+    True
+    """
+    assert window_size > 0
+    hashes, valid = _hash_sequence(sequence, k, seed, canonical)
+    hashes = np.where(valid, hashes, np.uint64(_MAX_HASH))
+    if len(hashes) == 0:
+        return np.zeros(0, dtype=np.int64), hashes
+    window_size = min(window_size, len(hashes))
+    windows = np.lib.stride_tricks.sliding_window_view(hashes, window_size)
+    positions = np.unique(np.argmin(windows, axis=1) + np.arange(len(windows)))
+    positions = positions[valid[positions]]
+    return positions, hashes[positions]
+
+
+def estimate_jaccard(first: MinHashSketch, second: MinHashSketch) -> float:
+    """Estimate the Jaccard index of the k-mer sets of two sequences: the fraction of
+    the bottom-k hashes of the union of both sketches which are in both sketches
+    >>> first = sketch_sequence("ACGTTGCAAC" * 5, k=4)
+    >>> estimate_jaccard(first, first)
+    1.0
+    """
+    assert (first.k, first.seed, first.canonical) == (
+        second.k,
+        second.seed,
+        second.canonical,
+    ), "sketches built with different parameters can not be compared"
+    sketch_size = min(first.sketch_size, second.sketch_size)
+    union = np.union1d(first.hashes, second.hashes)[:sketch_size]
+    if len(union) == 0:
+        return 0.0
+    shared = np.intersect1d(first.hashes, second.hashes, assume_unique=True)
+    return int(np.count_nonzero(shared <= union[-1])) / len(union)
+
+
+def estimate_mash_distance(first: MinHashSketch, second: MinHashSketch) -> float:
+    """Estimate the Mash distance, which approximates the per base mutation rate
+    between two sequences, from their estimated Jaccard index ``j`` as
+    ``-1 / k * ln(2j / (1 + j))``, capped at 1
+    >>> first = sketch_sequence("ACGTTGCAAC" * 5, k=4)
+    >>> estimate_mash_distance(first, first)
+    0.0
+    """
+    jaccard = estimate_jaccard(first, second)
+    return float(_jaccard_to_mash_distance(np.array(jaccard), first.k))
+
+
+def _jaccard_to_mash_distance(jaccard: np.ndarray, k: int) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        distances = np.log((1 + jaccard) / (2 * jaccard)) / k
+    return np.where(jaccard > 0, np.minimum(distances, 1.0), 1.0)
+
+
+# state of a distance matrix worker: the sketches, the offsets of each sketch in their
+# concatenated hashes, and for every hash its index among all distinct hashes, its
+# sketch and its rank in the sketch
+_worker_state = ()
+
+
+def _init_worker(sketches: List[MinHashSketch]):
+    global _worker_state
+    lengths = np.array([len(sketch.hashes) for sketch in sketches], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    sketch_indices = np.repeat(np.arange(len(sketches)), lengths)
+    ranks = np.arange(offsets[-1]) - offsets[sketch_indices]
+    all_hashes = np.concatenate(
+        [sketch.hashes for sketch in sketches] + [np.zeros(0, dtype=np.uint64)]
+    )
+    distinct_hashes, hash_indices = np.unique(all_hashes, return_inverse=True)
+    _worker_state = (
+        sketches,
+        len(distinct_hashes),
+        offsets,
+        hash_indices.astype(np.int64),
+        sketch_indices,
+        ranks,
+    )
+
+
+def _get_distance_row(index: int) -> np.ndarray:
+    """Mash distances of a sketch to all sketches after it, computing the same
+    estimate as `estimate_jaccard` for all of them at once: for every hash of the other
+    sketches, its rank in the union with the first sketch tells whether it is among
+    the bottom-k hashes of the union"""
+    sketches, number_of_hashes, offsets, hash_indices, sketch_indices, ranks = (
+        _worker_state
+    )
+    first = sketches[index]
+    others = sketches[index + 1 :]
+    for other in others:
+        assert (first.k, first.seed, first.canonical) == (
+            other.k,
+            other.seed,
+            other.canonical,
+        ), "sketches built with different parameters can not be compared"
+    start = offsets[index + 1]
+    hashes = hash_indices[start:]
+    segments = sketch_indices[start:] - (index + 1)
+    sketch_sizes = np.minimum(
+        [other.sketch_size for other in others], first.sketch_size
+    ).astype(np.int64)
+    element_sizes = sketch_sizes[segments]
+    in_sketch = ranks[start:] < element_sizes
+    # number of hashes of the first sketch up to each hash, found with a prefix sum
+    # over the distinct hashes instead of binary searches
+    in_first = np.zeros(number_of_hashes, dtype=bool)
+    in_first[hash_indices[offsets[index] : start]] = True
+    first_counts = np.cumsum(in_first)[hashes]
+    is_shared = in_sketch & in_first[hashes] & (first_counts <= element_sizes)
+    first_counts = np.minimum(first_counts, element_sizes)
+    shared_counts = np.cumsum(is_shared)
+    segment_starts = offsets[index + 1 : -1] - start
+    shared_counts -= np.concatenate(([0], shared_counts))[segment_starts][segments]
+    union_ranks = first_counts + ranks[start:] + 1 - shared_counts
+    shared_in_union = np.bincount(
+        segments,
+        weights=is_shared & (union_ranks <= element_sizes),
+        minlength=len(others),
+    )
+    union_sizes = (
+        np.minimum(len(first.hashes), sketch_sizes)
+        + np.minimum(np.diff(offsets[index + 1 :]), sketch_sizes)
+        - np.bincount(segments, weights=is_shared, minlength=len(others))
+    )
+    denominators = np.minimum(union_sizes, sketch_sizes)
+    jaccard = np.divide(
+        shared_in_union,
+        denominators,
+        out=np.zeros(len(others)),
+        where=denominators > 0,
+    )
+    return _jaccard_to_mash_distance(jaccard, first.k)
+
+
+def compute_distance_matrix(
+    sketches: Sequence[MinHashSketch], processes: Optional[int] = None
+) -> np.ndarray:
+    """Compute the symmetric matrix of Mash distances between all pairs of sketches.
+    Rows are spread over a pool of `processes` worker processes (all CPUs if None),
+    each of which receives the sketches once and computes a whole row with vectorized
+    operations; with one process no pool is started"""
+    sketches = list(sketches)
+    distances = np.zeros((len(sketches), len(sketches)))
+    if processes == 1 or len(sketches) < 3:
+        _init_worker(sketches)
+        rows = [_get_distance_row(index) for index in range(len(sketches))]
+        _init_worker([])
+    else:
+        with ProcessPoolExecutor(
+            processes, initializer=_init_worker, initargs=(sketches,)
+        ) as executor:
+            rows = list(
+                executor.map(
+                    _get_distance_row,
+                    range(len(sketches)),
+                    chunksize=max(len(sketches) // (4 * (processes or 1)), 1),
+                )
+            )
+    for index, row in enumerate(rows):
+        distances[index, index + 1 :] = row
+        distances[index + 1 :, index] = row
+    return distances
+
+
+def _sketch_genome_file(arguments: Tuple[str, int, int, int, bool]) -> MinHashSketch:
+    filename, k, sketch_size, seed, canonical = arguments
+    name = os.path.basename(filename)
+    return sketch_sequence(read_genome(filename), k, sketch_size, seed, canonical, name)
+
+
+def sketch_genome_files(
+    filenames: Sequence[str],
+    k: int = DEFAULT_KMER_LENGTH,
+    sketch_size: int = DEFAULT_SKETCH_SIZE,
+    seed: int = 0,
+    canonical: bool = True,
+    processes: Optional[int] = None,
+) -> List[MinHashSketch]:
+    """Sketch the genomes of many .fa files in a pool of `processes` worker processes,
+    naming each sketch after its file"""
+    arguments = [(filename, k, sketch_size, seed, canonical) for filename in filenames]
+    if processes == 1:
+        return [_sketch_genome_file(argument) for argument in arguments]
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(_sketch_genome_file, arguments))
+
+
+def write_sketches(sketches: Sequence[MinHashSketch], filename: str):
+    """Write sketches to a compressed .npz file holding the concatenated hashes, the
+    offsets of each sketch and the sketch parameters"""
+    lengths = [len(sketch.hashes) for sketch in sketches]
+    np.savez_compressed(
+        filename,
+        names=np.array([sketch.name for sketch in sketches], dtype=str),
+        parameters=np.array(
+            [
+                (sketch.k, sketch.sketch_size, sketch.seed, sketch.canonical)
+                for sketch in sketches
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 4),
+        offsets=np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+        hashes=np.concatenate(
+            [sketch.hashes for sketch in sketches] + [np.zeros(0, dtype=np.uint64)]
+        ),
+    )
+
+
+def read_sketches(filename: str) -> List[MinHashSketch]:
+    """Read sketches written by `write_sketches`"""
+    with np.load(filename) as data:
+        names, parameters = data["names"], data["parameters"]
+        offsets, hashes = data["offsets"], data["hashes"]
+    return [
+        MinHashSketch(
+            name=str(name),
+            k=int(k),
+            sketch_size=int(sketch_size),
+            seed=int(seed),
+            canonical=bool(canonical),
+            hashes=hashes[offsets[index] : offsets[index + 1]],
+        )
+        for index, (name, (k, sketch_size, seed, canonical)) in enumerate(
+            zip(names, parameters)
+        )
+    ]
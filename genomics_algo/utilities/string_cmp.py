@@ -1,3 +1,8 @@
+import numpy as np
+
+from genomics_algo.utilities import kernels
+
+
 def longest_common_prefix(s1: str, s2: str) -> str:
     """
     Finds the longest common prefix (substring) given two strings
@@ -23,10 +28,9 @@ def longest_common_prefix(s1: str, s2: str) -> str:
     >>> longest_common_prefix("GCCT", "GCCT")
     'GCCT'
     """
+    len_shorter = min(len(s1), len(s2))
     i = 0
-    while i < min(len(s1), len(s2)):
-        if s1[i] != s2[i]:
-            break
+    while i < len_shorter and s1[i] == s2[i]:
         i += 1
     return s1[:i]
 
@@ -56,7 +60,12 @@ def longest_common_suffix(s1: str, s2: str) -> str:
     >>> longest_common_suffix("GCCT", "GCCT")
     'GCCT'
     """
-    return longest_common_prefix(s1[::-1], s2[::-1])[::-1]
+    # compare from the end instead of reversing both strings and the result
+    len_shorter = min(len(s1), len(s2))
+    i = 0
+    while i < len_shorter and s1[-1 - i] == s2[-1 - i]:
+        i += 1
+    return s1[len(s1) - i :]
 
 
 def find_hamming_distance(s1: str, s2: str) -> int:
@@ -75,6 +84,10 @@ def find_hamming_distance(s1: str, s2: str) -> int:
     3
     """
     assert len(s1) == len(s2)
+    if kernels.BACKEND == "numba":
+        return kernels.count_mismatches(
+            kernels.encode_characters(s1), kernels.encode_characters(s2)
+        )
     return sum(1 for i in range(len(s1)) if s1[i] != s2[i])
 
 
@@ -101,6 +114,10 @@ def find_levenshtein_distance(s1: str, s2: str) -> int:
     >>> find_levenshtein_distance("GCGTATGCGGCTAACGC", "GCTATGCGGCTATACGC")
     2
     """
+    if kernels.BACKEND == "numba":
+        return kernels.compute_levenshtein_distance(
+            kernels.encode_characters(s1), kernels.encode_characters(s2)
+        )
     # initializing a matrix for with `len(s1) + 1` rows and `len(s2) + 1` columns
     D = [[0 for x in range(len(s2) + 1)] for y in range(len(s1) + 1)]
 
@@ -123,3 +140,138 @@ def find_levenshtein_distance(s1: str, s2: str) -> int:
 
     # return the last value (i.e., right most bottom value)
     return D[-1][-1]
+
+
+def build_suffix_array(text: str) -> np.ndarray:
+    """Build the suffix array of `text`, i.e. the start indices of all suffixes of `text`
+    in lexicographic order, by prefix doubling: after each round the suffixes are ranked
+    by their first `2 ** round` characters, using one NumPy sort per round
+    >>> build_suffix_array("banana")
+    array([5, 3, 1, 0, 4, 2])
+    >>> build_suffix_array("")
+    array([], dtype=int64)
+    """
+    len_text = len(text)
+    rank = np.frombuffer(text.encode("ascii"), dtype=np.uint8).astype(np.int64)
+    suffix_array = np.argsort(rank, kind="stable")
+    length = 1
+    while len_text > 0:
+        # rank of the suffix `length` characters further, shorter suffixes sort first
+        next_rank = np.full(len_text, -1, dtype=np.int64)
+        next_rank[: len_text - length] = rank[length:]
+        suffix_array = np.lexsort((next_rank, rank))
+        sorted_rank = rank[suffix_array]
+        sorted_next_rank = next_rank[suffix_array]
+        is_new_rank = (sorted_rank[1:] != sorted_rank[:-1]) | (
+            sorted_next_rank[1:] != sorted_next_rank[:-1]
+        )
+        rank = np.empty(len_text, dtype=np.int64)
+        rank[suffix_array] = np.concatenate(([0], np.cumsum(is_new_rank)))
+        if rank[suffix_array[-1]] == len_text - 1:
+            break
+        length *= 2
+    return suffix_array.astype(np.int64)
+
+
+def build_lcp_array(text: str, suffix_array: np.ndarray) -> np.ndarray:
+    """Build the longest common prefix array of `text` with Kasai's algorithm in linear
+    time: entry ``r`` is the length of the longest common prefix of the suffixes at
+    ranks ``r - 1`` and ``r`` of the suffix array (0 for rank 0)
+    >>> build_lcp_array("banana", build_suffix_array("banana"))
+    array([0, 1, 3, 0, 0, 2])
+    """
+    len_text = len(text)
+    suffixes = suffix_array.tolist()
+    rank = [0] * len_text
+    for r, i in enumerate(suffixes):
+        rank[i] = r
+    lcp = [0] * len_text
+    h = 0
+    # the lcp of the suffix starting at i + 1 with its predecessor is at least h - 1
+    for i in range(len_text):
+        r = rank[i]
+        if r == 0:
+            h = 0
+            continue
+        j = suffixes[r - 1]
+        while i + h < len_text and j + h < len_text and text[i + h] == text[j + h]:
+            h += 1
+        lcp[r] = h
+        if h > 0:
+            h -= 1
+    return np.array(lcp, dtype=np.int64)
+
+
+class LongestCommonExtension:
+    """Answers longest common extension queries, i.e. the length of the longest common
+    prefix of the suffixes of `text` starting at two indices, in constant time. The
+    suffix array, Kasai's LCP array and a sparse table for range minimum queries over
+    the LCP array are built once in O(n log n)
+    >>> lce = LongestCommonExtension("GATTACAGATTTC")
+    >>> lce.query(0, 7)
+    4
+    >>> lce.query(1, 4)
+    1
+    >>> lce.query(3, 3)
+    10
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.suffix_array = build_suffix_array(text)
+        self.lcp = build_lcp_array(text, self.suffix_array)
+        self.rank = np.empty(len(text), dtype=np.int64)
+        self.rank[self.suffix_array] = np.arange(len(text))
+        # level k of the sparse table holds the minima of all windows of 2 ** k entries
+        self._sparse_table = [self.lcp]
+        while 2 ** len(self._sparse_table) <= len(text):
+            previous = self._sparse_table[-1]
+            half = 2 ** (len(self._sparse_table) - 1)
+            self._sparse_table.append(np.minimum(previous[:-half], previous[half:]))
+        self._sparse_table = [level.tolist() for level in self._sparse_table]
+        self._rank = self.rank.tolist()
+
+    def query(self, i: int, j: int) -> int:
+        """Length of the longest common prefix of ``text[i:]`` and ``text[j:]``"""
+        if i == j:
+            return len(self.text) - i
+        first, last = sorted((self._rank[i], self._rank[j]))
+        # minimum of lcp[first + 1 : last + 1] from two overlapping windows
+        level = (last - first).bit_length() - 1
+        window_minima = self._sparse_table[level]
+        return min(window_minima[first + 1], window_minima[last - 2**level + 1])
+
+
+def _find_first_mismatches(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Helper function returning the index of the first mismatching column of each row,
+    or the number of columns if the rows are equal"""
+    assert first.shape == second.shape
+    mismatches = first != second
+    return np.where(
+        mismatches.any(axis=-1), mismatches.argmax(axis=-1), first.shape[-1]
+    )
+
+
+def find_common_prefix_lengths(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Compute the length of the longest common prefix of each pair of rows of two
+    equally shaped 2D arrays (e.g. encoded reads) in one vectorized pass
+    >>> from genomics_algo.utilities.sequence_encoding import encode_sequence
+    >>> first = np.array([encode_sequence("ACGT"), encode_sequence("ACGT")])
+    >>> second = np.array([encode_sequence("ACTT"), encode_sequence("ACGT")])
+    >>> find_common_prefix_lengths(first, second)
+    array([2, 4])
+    """
+    return _find_first_mismatches(first, second)
+
+
+def find_common_suffix_lengths(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Compute the length of the longest common suffix of each pair of rows of two
+    equally shaped 2D arrays; the rows are compared through reversed views, so nothing
+    is copied
+    >>> from genomics_algo.utilities.sequence_encoding import encode_sequence
+    >>> first = np.array([encode_sequence("ACGT"), encode_sequence("ACGT")])
+    >>> second = np.array([encode_sequence("ATTT"), encode_sequence("TCGT")])
+    >>> find_common_suffix_lengths(first, second)
+    array([1, 3])
+    """
+    return _find_first_mismatches(first[..., ::-1], second[..., ::-1])
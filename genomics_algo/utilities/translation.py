@@ -0,0 +1,90 @@
+import numpy as np
+
+from itertools import product
+from typing import List
+
+from genomics_algo.utilities.misc_utilities import reverse_complement
+from genomics_algo.utilities.sequence_encoding import (
+    ALPHABET,
+    encode_kmer,
+    encode_kmers,
+    encode_sequence,
+    reverse_complement_kmers,
+)
+
+# standard genetic code, codons in the usual TCAG order
+_STANDARD_CODE = "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"
+NUMBER_OF_CODONS = 64
+# code of the codons with an ``N``, translated to ``X``
+CODON_N = NUMBER_OF_CODONS
+# amino acid of every 2-bit packed codon (see `encode_kmers`), then of `CODON_N`
+CODON_TABLE = (
+    "".join(
+        _STANDARD_CODE[16 * "TCAG".index(a) + 4 * "TCAG".index(b) + "TCAG".index(c)]
+        for a, b, c in product(ALPHABET[:4], repeat=3)
+    )
+    + "X"
+)
+_CODON_TABLE_ASCII = np.frombuffer(CODON_TABLE.encode("ascii"), dtype=np.uint8)
+# code of the reverse complement of every codon, then `CODON_N` for `CODON_N`
+REVERSE_COMPLEMENT_CODONS = np.append(
+    reverse_complement_kmers(np.arange(NUMBER_OF_CODONS, dtype=np.uint64), 3),
+    CODON_N,
+).astype(np.uint8)
+
+START_CODONS = ("ATG",)
+STOP_CODONS = ("TAA", "TAG", "TGA")
+
+
+def encode_codons(sequence: str) -> np.ndarray:
+    """Pack the codon starting at every position of a DNA sequence into its index in
+    `CODON_TABLE`, `CODON_N` for codons with a base other than ACGT, so that the
+    codons of frame ``f`` are ``codons[f::3]``
+    >>> encode_codons("ATGNAA").tolist()
+    [14, 64, 64, 64]
+    """
+    kmers, valid = encode_kmers(encode_sequence(sequence), 3)
+    return np.where(valid, kmers, CODON_N).astype(np.uint8)
+
+
+def get_codon_codes(codons: List[str]) -> np.ndarray:
+    """Indices of codons in `CODON_TABLE`
+    >>> get_codon_codes(STOP_CODONS).tolist()
+    [48, 50, 56]
+    """
+    return np.array([encode_kmer(codon) for codon in codons], dtype=np.uint8)
+
+
+def translate_codons(codons: np.ndarray) -> str:
+    """Translate codon codes into a protein with a single lookup in `CODON_TABLE`
+    >>> translate_codons(encode_codons("ATGGCC")[::3])
+    'MA'
+    """
+    return _CODON_TABLE_ASCII[codons].tobytes().decode("ascii")
+
+
+def translate(sequence: str, frame: int = 0) -> str:
+    """Translate a DNA sequence from its `frame`-th base, stop codons giving ``*`` and
+    incomplete codons being dropped
+    >>> translate("ATGGCCATTGTAATGGGCCGCTGA")
+    'MAIVMGR*'
+    >>> translate("CATGGCCNTT", 1)
+    'MAX'
+    """
+    assert 0 <= frame < 3
+    return translate_codons(encode_codons(sequence)[frame::3])
+
+
+def translate_six_frames(sequence: str) -> List[str]:
+    """Translate the three frames of both strands of a DNA sequence, in the order +1,
+    +2, +3 (from the first three bases of `sequence`) then -1, -2, -3 (from the first
+    three bases of its reverse complement). The codons of each strand are encoded once
+    for its three frames
+    >>> translate_six_frames("ATGGCCTAA")
+    ['MA*', 'WP', 'GL', 'LGH', '*A', 'RP']
+    """
+    frames = []
+    for strand in (sequence, reverse_complement(sequence)):
+        codons = encode_codons(strand)
+        frames += [translate_codons(codons[frame::3]) for frame in range(3)]
+    return frames
@@ -16,6 +16,8 @@ setuptools.setup(
     url="https://github.com/tacitvenom/genomics_algo",
     packages=setuptools.find_packages(),
     install_requires=requirements,
+    extras_require={"numba": ["numba"]},
+    entry_points={"console_scripts": ["genomics-algo=genomics_algo.cli:main"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",